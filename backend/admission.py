@@ -0,0 +1,234 @@
+import asyncio
+import math
+import time
+from collections import OrderedDict, deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Optional, Tuple
+from backend.constants import (
+    CHAT_BURST_PER_IP,
+    CHAT_BURST_PER_SESSION,
+    CHAT_MAX_CONCURRENCY,
+    CHAT_QUEUE_SIZE,
+    CHAT_QUEUE_TIMEOUT,
+    CHAT_RATE_PER_IP,
+    CHAT_RATE_PER_SESSION,
+    CHAT_SESSION_SERIAL,
+)
+
+
+class Rejected(Exception):
+    """Not admitted; the client should retry after retry_after seconds."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+    @property
+    def retry_after_header(self) -> str:
+        return str(max(1, math.ceil(self.retry_after)))
+
+
+class RateLimiter:
+    """
+    Token buckets per key: `rate` tokens a second up to `burst`. The least recently
+    used keys are dropped past max_keys; a dropped key starts again with a full bucket.
+    """
+
+    def __init__(self, rate: float, burst: int, max_keys: int = 10000):
+        self.rate = rate
+        self.burst = burst
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 and self.burst > 0
+
+    def take(self, key: str, now: Optional[float] = None) -> float:
+        """0 if a token was taken, otherwise seconds until the next one."""
+        if not self.enabled:
+            return 0.0
+        now = time.monotonic() if now is None else now
+        tokens, last = self._buckets.pop(key, (float(self.burst), now))
+        tokens = min(float(self.burst), tokens + (now - last) * self.rate)
+        wait = 0.0
+        if tokens >= 1:
+            tokens -= 1
+        else:
+            wait = (1 - tokens) / self.rate
+        self._buckets[key] = (tokens, now)
+        if len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return wait
+
+
+class AdmissionController:
+    """
+    Admission for Gemini-bound requests of one worker, all on the event loop:
+      - token buckets per client IP and per session,
+      - requests of one session run one at a time (a double submit waits its turn),
+      - at most max_concurrency requests run, up to queue_size more wait in FIFO order.
+    A request that would wait longer than queue_timeout is rejected up front, using the
+    moving average of recent service times, instead of timing out in the queue after
+    holding a place other requests could have used. Admitted requests keep a flat
+    latency under overload; the rest get a 429 with Retry-After.
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = CHAT_MAX_CONCURRENCY,
+        queue_size: int = CHAT_QUEUE_SIZE,
+        queue_timeout: float = CHAT_QUEUE_TIMEOUT,
+        ip_limiter: Optional[RateLimiter] = None,
+        session_limiter: Optional[RateLimiter] = None,
+        session_serial: bool = CHAT_SESSION_SERIAL,
+        max_per_session: int = 3,
+    ):
+        self.max_concurrency = max_concurrency
+        self.queue_size = queue_size
+        self.queue_timeout = queue_timeout
+        self.ip_limiter = ip_limiter or RateLimiter(CHAT_RATE_PER_IP, CHAT_BURST_PER_IP)
+        self.session_limiter = session_limiter or RateLimiter(
+            CHAT_RATE_PER_SESSION, CHAT_BURST_PER_SESSION
+        )
+        self.session_serial = session_serial
+        self.max_per_session = max_per_session
+        self._active = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # session id -> [lock, requests holding or waiting for it]
+        self._sessions: Dict[str, list] = {}
+        # seconds a request holds its slot, exponential moving average
+        self._service_time = 1.0
+        self._waits: Deque[float] = deque(maxlen=1024)
+        self._counts: Dict[str, int] = {"admitted": 0}
+
+    def _reject(self, reason: str, retry_after: float) -> Rejected:
+        key = f"rejected_{reason}"
+        self._counts[key] = self._counts.get(key, 0) + 1
+        return Rejected(reason, retry_after)
+
+    def expected_wait(self) -> float:
+        """Seconds a request joining the queue now would wait for a slot."""
+        if self._active < self.max_concurrency and not self._waiters:
+            return 0.0
+        return (len(self._waiters) + 1) / self.max_concurrency * self._service_time
+
+    async def _acquire_slot(self, deadline: float) -> None:
+        if self._active < self.max_concurrency and not self._waiters:
+            self._active += 1
+            return
+        if len(self._waiters) >= self.queue_size:
+            raise self._reject("queue_full", self.expected_wait())
+        expected = self.expected_wait()
+        if time.monotonic() + expected > deadline:
+            raise self._reject("deadline", expected)
+
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(waiter, max(0.0, deadline - time.monotonic()))
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            # timed out or the client went away; a slot handed over meanwhile (wait_for
+            # can time out after the waiter got its result) goes to the next one
+            if waiter.done() and not waiter.cancelled():
+                self._release_slot()
+            self._forget(waiter)
+            if isinstance(e, asyncio.TimeoutError):
+                raise self._reject("timeout", self.expected_wait())
+            raise
+
+    def _forget(self, waiter: asyncio.Future) -> None:
+        try:
+            self._waiters.remove(waiter)
+        except ValueError:
+            pass
+
+    def _release_slot(self) -> None:
+        # the slot passes straight to the oldest waiter, so _active stays the same
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self._active -= 1
+
+    @asynccontextmanager
+    async def _session_turn(self, session_id: str, deadline: float) -> AsyncIterator:
+        if not self.session_serial:
+            yield
+            return
+        entry = self._sessions.setdefault(session_id, [asyncio.Lock(), 0])
+        if entry[1] >= self.max_per_session:
+            raise self._reject("session_busy", self._service_time)
+        entry[1] += 1
+        try:
+            try:
+                await asyncio.wait_for(
+                    entry[0].acquire(), max(0.0, deadline - time.monotonic())
+                )
+            except asyncio.TimeoutError:
+                raise self._reject("timeout", self._service_time)
+            try:
+                yield
+            finally:
+                entry[0].release()
+        finally:
+            entry[1] -= 1
+            if entry[1] == 0:
+                self._sessions.pop(session_id, None)
+
+    @asynccontextmanager
+    async def admit(
+        self, session_id: str, client_ip: Optional[str] = None
+    ) -> AsyncIterator[float]:
+        """
+        Holds a slot for the block and yields the milliseconds waited for it.
+        Raises Rejected when the request should get a 429.
+        """
+        started = time.monotonic()
+        deadline = started + self.queue_timeout
+        if client_ip:
+            wait = self.ip_limiter.take(client_ip)
+            if wait:
+                raise self._reject("rate_ip", wait)
+        wait = self.session_limiter.take(session_id)
+        if wait:
+            raise self._reject("rate_session", wait)
+
+        async with self._session_turn(session_id, deadline):
+            await self._acquire_slot(deadline)
+            admitted = time.monotonic()
+            waited = admitted - started
+            self._waits.append(waited)
+            self._counts["admitted"] += 1
+            try:
+                yield 1000 * waited
+            finally:
+                self._service_time += 0.2 * (
+                    (time.monotonic() - admitted) - self._service_time
+                )
+                self._release_slot()
+
+    def stats(self) -> Dict[str, Any]:
+        waits = sorted(self._waits)
+
+        def percentile(q: float) -> float:
+            if not waits:
+                return 0.0
+            return round(1000 * waits[min(len(waits) - 1, int(q * len(waits)))], 1)
+
+        return {
+            "active": self._active,
+            "queued": len(self._waiters),
+            "max_concurrency": self.max_concurrency,
+            "queue_size": self.queue_size,
+            "sessions": len(self._sessions),
+            "service_ms": round(1000 * self._service_time, 1),
+            "wait_p50_ms": percentile(0.5),
+            "wait_p95_ms": percentile(0.95),
+            **self._counts,
+        }
+
+
+chat_admission = AdmissionController()
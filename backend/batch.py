@@ -0,0 +1,165 @@
+import argparse
+import json
+import os
+import sys
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+from backend.constants import (
+    BatchRequest,
+    CourseSearchFormat,
+    EligibilityRequest,
+    MakeScheduleFormat,
+    UserFulfilled,
+)
+from backend.eligibility import check_prereq_tree, eligibility_index
+from backend.registry import DataVersion, registry
+from backend.schedule import build_schedules
+
+# Only the data layer is imported here: no embedding models, Chroma or Gemini, so
+# workers start in a fraction of a second and fork cheaply from the loaded parent.
+
+
+def resolve_courses(names: Iterable[str], data: DataVersion):
+    resolved, errors = [], []
+    for name in names:
+        course_id = data.prereq_graph.resolve(name)
+        if course_id is None:
+            errors.append({"error_message": f"Unknown course {name}"})
+        else:
+            resolved.append(course_id)
+    return resolved, errors
+
+
+def run_make_schedule(params: Dict[str, Any], data: DataVersion, term: str):
+    """params: courses, max_days and optionally term."""
+    term = params.pop("term", None) or term
+    if not term:
+        raise ValueError("make_schedule needs a term (params.term or --term)")
+    args = MakeScheduleFormat.model_validate(params)
+    courses, errors = resolve_courses(args.courses, data)
+    return build_schedules(courses, args.max_days, term, data, errors)
+
+
+def run_can_take_course(params: Dict[str, Any], data: DataVersion, term: str):
+    """params: course_name and profile; the same answer as the chat tool."""
+    profile = UserFulfilled.model_validate(params.pop("profile", {}))
+    args = CourseSearchFormat.model_validate(params)
+    course_id = data.prereq_graph.resolve(args.course_name)
+    if course_id is None:
+        return {"error_message": f"Unknown course {args.course_name}"}
+    if course_id in profile.courses:
+        return f"You have already completed or are currently taking {course_id}."
+    return check_prereq_tree(data.course_data[course_id].prereq_tree, profile)
+
+
+def run_eligibility(params: Dict[str, Any], data: DataVersion, term: str):
+    """params as POST /eligibility takes them, with the profile inline."""
+    request = EligibilityRequest.model_validate(params)
+    if request.sessionID:
+        raise ValueError("Batch eligibility needs the profile, not a sessionID")
+    profile = request.profile or UserFulfilled()
+    index = eligibility_index(data)
+    course_ids = list(request.courses)
+    if request.department:
+        course_ids += index.by_subject.get(request.department.strip().upper(), [])
+    statuses = index.statuses(profile, course_ids)
+    result = {"statuses": statuses}
+    if request.reasons:
+        result["reasons"] = index.reasons(profile, statuses)
+    return result
+
+
+METHODS: Dict[str, Callable[[Dict[str, Any], DataVersion, str], Any]] = {
+    "make_schedule": run_make_schedule,
+    "can_take_course": run_can_take_course,
+    "eligibility": run_eligibility,
+}
+
+
+def handle(line: str, term: Optional[str] = None) -> str:
+    """One JSONL request line to one JSONL result line; errors are results too."""
+    request_id = None
+    try:
+        request = BatchRequest.model_validate_json(line)
+        request_id = request.id
+        method = METHODS.get(request.method)
+        if method is None:
+            raise ValueError(f"Unknown method {request.method}")
+        result = method(dict(request.params), registry.current(), term)
+        body = {"id": request_id, "method": request.method, "result": result}
+    except ValueError as e:
+        # pydantic's ValidationError included
+        body = {"id": request_id, "error": str(e)}
+    except Exception as e:
+        body = {"id": request_id, "error": f"{type(e).__name__}: {e}"}
+    return json.dumps(body, separators=(",", ":"), default=str)
+
+
+def _handle_chunk(lines: List[str], term: Optional[str]) -> List[str]:
+    return [handle(line, term) for line in lines]
+
+
+def run_batch(
+    lines: Iterable[str],
+    workers: int = 1,
+    term: Optional[str] = None,
+    chunk_size: int = 64,
+) -> Iterator[str]:
+    """
+    Results in input order, streamed: at most a few chunks per worker are in flight,
+    so input and output of any size pass through in bounded memory.
+    """
+    lines = (line for line in lines if line.strip())
+    if workers <= 1:
+        for line in lines:
+            yield handle(line, term)
+        return
+
+    # load before forking, the workers share the parent's copy
+    registry.current()
+    in_flight: Deque[Future] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        chunk: List[str] = []
+        for line in lines:
+            chunk.append(line)
+            if len(chunk) == chunk_size:
+                in_flight.append(pool.submit(_handle_chunk, chunk, term))
+                chunk = []
+                if len(in_flight) >= 4 * workers:
+                    yield from in_flight.popleft().result()
+        if chunk:
+            in_flight.append(pool.submit(_handle_chunk, chunk, term))
+        while in_flight:
+            yield from in_flight.popleft().result()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Run make_schedule, can_take_course and eligibility requests from JSONL "
+            '({"id": ..., "method": ..., "params": {...}} per line) without the chat '
+            "stack, and write one JSONL result per request in input order."
+        )
+    )
+    parser.add_argument("input", type=str, nargs="?", default="-", help="- for stdin")
+    parser.add_argument("--output", "-o", type=str, default="-", help="- for stdout")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument(
+        "--term", type=str, help="term for make_schedule requests without one"
+    )
+    parser.add_argument("--chunk-size", type=int, default=64)
+    args = parser.parse_args()
+
+    source = sys.stdin if args.input == "-" else open(args.input, encoding="utf-8")
+    sink = (
+        sys.stdout if args.output == "-" else open(args.output, "w", encoding="utf-8")
+    )
+    try:
+        for result in run_batch(source, args.workers, args.term, args.chunk_size):
+            sink.write(result + "\n")
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
@@ -0,0 +1,46 @@
+import argparse
+import os
+
+RESULTS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "results.jsonl")
+
+parser = argparse.ArgumentParser(
+    description=(
+        "Benchmark the backend hot paths on synthetic catalogs. "
+        "Runs offline on CPU with the hash inference backend unless --models is given."
+    )
+)
+parser.add_argument(
+    "--scales", nargs="+", type=float, default=[1, 10], help="1 = NJIT size"
+)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument("--repeat", type=int, default=5)
+parser.add_argument("--only", nargs="+", help="benchmark names to run")
+parser.add_argument(
+    "--models",
+    action="store_true",
+    help="use INFERENCE_BACKEND's real models instead of token hashing",
+)
+parser.add_argument("--results", type=str, default=RESULTS_FILE)
+parser.add_argument("--no-save", action="store_true")
+args = parser.parse_args()
+
+# read by backend.constants at import, so set before importing the suite
+if not args.models:
+    os.environ["INFERENCE_BACKEND"] = "hash"
+# cached results would hide the ranking cost, and the suite needs no Redis
+os.environ["QUERY_CACHE_TTL"] = "0"
+os.environ["SEMANTIC_CACHE"] = "0"
+
+from backend.benchmarks.suite import BENCHMARKS, run
+
+unknown = set(args.only or []) - set(BENCHMARKS)
+if unknown:
+    parser.error(f"unknown benchmarks {sorted(unknown)}, expected {BENCHMARKS}")
+
+run(
+    args.scales,
+    seed=args.seed,
+    repeat=args.repeat,
+    only=args.only,
+    results_path=None if args.no_save else args.results,
+)
@@ -0,0 +1,231 @@
+import random
+from typing import Any, Dict, List, Optional, Sequence
+
+# roughly the size of the scraped NJIT catalog, the 1x scale
+NJIT_COURSES = 2400
+
+# (subject, share of the catalog, subjects its courses draw prerequisites from),
+# feeders listed before the subjects that use them
+SUBJECTS = [
+    ("MATH", 0.08, []),
+    ("HUM", 0.05, []),
+    ("MGMT", 0.05, []),
+    ("ARCH", 0.05, []),
+    ("ART", 0.02, []),
+    ("PHYS", 0.05, ["MATH"]),
+    ("CHEM", 0.05, ["MATH"]),
+    ("BIOL", 0.05, ["CHEM"]),
+    ("CS", 0.08, ["MATH"]),
+    ("IT", 0.04, ["CS"]),
+    ("IS", 0.03, ["CS", "MATH"]),
+    ("DS", 0.02, ["CS", "MATH"]),
+    ("ECE", 0.07, ["MATH", "PHYS"]),
+    ("ME", 0.06, ["MATH", "PHYS"]),
+    ("CE", 0.05, ["MATH", "PHYS"]),
+    ("CHE", 0.04, ["CHEM", "MATH"]),
+    ("BME", 0.04, ["BIOL", "PHYS"]),
+    ("IE", 0.03, ["MATH"]),
+    ("FIN", 0.03, ["MGMT", "MATH"]),
+    ("ACCT", 0.02, ["MGMT"]),
+    ("HIST", 0.03, ["HUM"]),
+    ("ENGL", 0.03, ["HUM"]),
+    ("PHIL", 0.02, ["HUM"]),
+    ("ECON", 0.03, ["MATH"]),
+    ("STS", 0.02, ["HUM"]),
+]
+LEVELS = [(100, 0.25), (200, 0.2), (300, 0.2), (400, 0.1), (600, 0.2), (700, 0.05)]
+
+TOPICS = [
+    "algorithms", "data structures", "machine learning", "databases", "networks",
+    "operating systems", "security", "software engineering", "calculus",
+    "linear algebra", "probability", "statistics", "mechanics", "thermodynamics",
+    "electromagnetics", "circuits", "signals", "control systems", "materials",
+    "fluid dynamics", "organic chemistry", "biochemistry", "genetics", "ecology",
+    "accounting", "finance", "marketing", "leadership", "ethics", "writing",
+    "literature", "history of technology", "design studio", "urban planning",
+    "microeconomics", "game theory", "visualization", "robotics", "optimization",
+]  # fmt: skip
+TITLE_FORMS = [
+    "Introduction to {}", "Principles of {}", "{} I", "{} II", "Advanced {}",
+    "Topics in {}", "Applied {}", "{} Laboratory", "Foundations of {}", "{} Seminar",
+]  # fmt: skip
+DESC_SENTENCES = [
+    "Covers the fundamentals of {} with an emphasis on problem solving.",
+    "Students study {} through lectures, projects and weekly assignments.",
+    "Topics include the theory and practice of {} and its applications.",
+    "A project-based course on {} for engineers and scientists.",
+    "Introduces modern tools and methods used in {}.",
+    "Builds on prior coursework to develop depth in {}.",
+]
+# NJIT meeting patterns and time slots
+DAY_PATTERNS = ["MW", "TR", "MW", "TR", "MWF", "F", "W", "R"]
+TIME_SLOTS = [
+    "8:30 AM - 9:50 AM", "10:00 AM - 11:20 AM", "11:30 AM - 12:50 PM",
+    "1:00 PM - 2:20 PM", "2:30 PM - 3:50 PM", "4:00 PM - 5:20 PM",
+    "6:00 PM - 9:05 PM",
+]  # fmt: skip
+BUILDINGS = ["KUPF", "FMH", "CKB", "TIER", "ECEC", "MEC", "CULM", "GITC", "WEST"]
+INSTRUCTORS = [
+    "Smith, Alex", "Patel, Priya", "Chen, Wei", "Garcia, Maria", "Kim, Min",
+    "Johnson, Chris", "Nguyen, Linh", "Okafor, Ada", "Rossi, Marco", "Cohen, Dana",
+]  # fmt: skip
+GRADES = ["C", "C", "C", "C-", "B"]
+
+
+def catalog_terms(years: int = 3, last_year: int = 2026) -> List[str]:
+    """Spring, Summer and Fall of the last `years` years, oldest first."""
+    return [
+        f"{year}{semester}"
+        for year in range(last_year - years + 1, last_year + 1)
+        for semester in ("10", "50", "90")
+    ]
+
+
+def _subject_codes(scale: float) -> List[tuple]:
+    """
+    The real subjects at 1x. Larger catalogs get copies ("CS2", "MATH2"...) with the
+    same shape, so course numbers stay in the usual ranges.
+    """
+    copies = max(1, round(scale))
+    per_copy = scale / copies
+    subjects = []
+    for copy in range(copies):
+        suffix = "" if copy == 0 else str(copy + 1)
+        for code, share, feeders in SUBJECTS:
+            subjects.append(
+                (code + suffix, share * per_copy, [f + suffix for f in feeders])
+            )
+    return subjects
+
+
+def _course_node(rng: random.Random, course_id: str) -> Dict[str, Any]:
+    node: Dict[str, Any] = {"type": "COURSE", "course": course_id}
+    if rng.random() < 0.4:
+        node["min_grade"] = rng.choice(GRADES)
+    return node
+
+
+def _prereq_tree(
+    rng: random.Random, pool: Sequence[str], level: int
+) -> Optional[Dict[str, Any]]:
+    if not pool or (level == 100 and rng.random() < 0.7):
+        return None
+    children: List[Dict[str, Any]] = []
+    for _ in range(rng.choice([1, 1, 2, 2, 3])):
+        if rng.random() < 0.3 and len(pool) > 1:
+            options = rng.sample(list(pool), min(len(pool), rng.randint(2, 3)))
+            children.append(
+                {"type": "OR", "children": [_course_node(rng, c) for c in options]}
+            )
+        else:
+            children.append(_course_node(rng, rng.choice(pool)))
+    roll = rng.random()
+    if roll < 0.05:
+        children.append(
+            {"type": "STANDING", "standing": "Junior", "normalized": "JUNIOR"}
+        )
+    elif roll < 0.08:
+        children.append(
+            {
+                "type": "PLACEMENT",
+                "name": "Math placement",
+                "placement_kind": "SCORE_THRESHOLD",
+            }
+        )
+    elif roll < 0.1:
+        children.append({"type": "PERMISSION", "raw": "Department approval"})
+    return {"type": "AND", "children": children}
+
+
+def _sections(
+    rng: random.Random, level: int, credits: float, terms: List[str]
+) -> Dict[str, Dict[str, List[str]]]:
+    offered = 0.75 if level < 400 else 0.5
+    sections = {}
+    for term in terms:
+        summer = term.endswith("50")
+        if rng.random() > (offered / 3 if summer else offered):
+            continue
+        count = rng.randint(1, 6 if level < 300 else 3)
+        rows = {}
+        for i in range(count):
+            section = f"{i + 1:03}"
+            online = rng.random() < 0.1
+            capacity = rng.choice([20, 25, 30, 35, 40, 60])
+            enrolled = rng.randint(0, capacity)
+            rows[section] = [
+                section,
+                str(rng.randint(10000, 99999)),
+                "" if online else rng.choice(DAY_PATTERNS),
+                "" if online else rng.choice(TIME_SLOTS),
+                "" if online else f"{rng.choice(BUILDINGS)} {rng.randint(100, 499)}",
+                "Closed" if enrolled == capacity else "Open",
+                str(capacity),
+                str(enrolled),
+                rng.choice(INSTRUCTORS),
+                "Online" if online else "Face-to-Face",
+                f"{credits:g}",
+                "",
+                "",
+            ]
+        sections[term] = rows
+    return sections
+
+
+def generate_catalog(
+    scale: float = 1.0, seed: int = 0, terms: Optional[List[str]] = None
+) -> Dict[str, Any]:
+    """
+    A graph.json-shaped catalog of about scale * NJIT_COURSES courses. Prerequisites
+    only point at lower-numbered courses of the same or a feeder subject, with OR
+    branches, minimum grades and some non-course requirements; sections use NJIT
+    meeting patterns. The same scale and seed always give the same catalog.
+    """
+    rng = random.Random(seed)
+    terms = terms or catalog_terms()
+    total = max(1, round(scale * NJIT_COURSES))
+    subjects = _subject_codes(scale)
+    by_subject: Dict[str, List[tuple]] = {code: [] for code, _, _ in subjects}
+    catalog: Dict[str, Any] = {}
+
+    for code, share, feeders in subjects:
+        count = max(1, round(share * NJIT_COURSES))
+        for base, level_share in LEVELS:
+            size = min(100, max(1, round(count * level_share)))
+            lower = [
+                c
+                for subject in [code] + feeders
+                for c, level in by_subject.get(subject, [])
+                if level < base
+            ][-40:]
+            level_courses: List[str] = []
+            for number in sorted(rng.sample(range(base, base + 100), size)):
+                course_id = f"{code} {number}"
+                topic = rng.choice(TOPICS)
+                title = rng.choice(TITLE_FORMS).format(topic.title())
+                credits = rng.choice([3.0, 3.0, 3.0, 4.0]) if base < 600 else 3.0
+                coreq = None
+                if title.endswith("Laboratory") and level_courses:
+                    # labs are taken with the lecture just before them
+                    credits = 1.0
+                    coreq = {
+                        "type": "AND",
+                        "children": [{"type": "COURSE", "course": level_courses[-1]}],
+                    }
+                catalog[course_id] = {
+                    "prereq_tree": _prereq_tree(rng, lower, base),
+                    "coreq_tree": coreq,
+                    "restrictions": [],
+                    "desc": " ".join(
+                        rng.choice(DESC_SENTENCES).format(topic)
+                        for _ in range(rng.randint(2, 4))
+                    ),
+                    "title": title,
+                    "credits": credits,
+                    "sections": _sections(rng, base, credits, terms),
+                }
+                level_courses.append(course_id)
+                if len(catalog) >= total:
+                    return catalog
+            by_subject[code].extend((c, base) for c in level_courses)
+    return catalog
@@ -0,0 +1,127 @@
+import argparse
+import gc
+import json
+import os
+import random
+import time
+from typing import Any, Dict, List
+from backend.benchmarks.catalog import generate_catalog
+from backend.constants import UserFulfilled, validate_course_data
+from backend.eligibility import eligibility_index
+from backend.registry import DataVersion
+from backend.timing import memory_usage
+
+# What forking the server's workers from a loaded master buys: memory per worker
+# (PSS splits shared pages between the processes mapping them) and throughput of the
+# CPU-bound data layer as workers are added. Only the data layer is loaded, so it runs
+# without the embedding models; those add their weights to the shared pages.
+
+
+def sample_profiles(
+    data: DataVersion, count: int, rng: random.Random
+) -> List[UserFulfilled]:
+    lower = sorted(c for c in data.course_data if c.split()[-1][0] in "12")
+    return [
+        UserFulfilled(
+            courses={
+                c: {"name": c, "grade": rng.choice(["A", "B", "C", "F"])}
+                for c in rng.sample(lower, len(lower) // 5)
+            },
+            standing=rng.choice(["SOPHOMORE", "JUNIOR", "SENIOR"]),
+        )
+        for _ in range(count)
+    ]
+
+
+def work(
+    data: DataVersion, profiles: List[UserFulfilled], duration: float, seed: int
+) -> Dict[str, Any]:
+    """One worker: a department's eligibility and a course's subgraph per request."""
+    rng = random.Random(seed)
+    index = eligibility_index(data)
+    subjects = sorted(index.by_subject)
+    courses = sorted(data.course_data)
+    requests = 0
+    deadline = time.perf_counter() + duration
+    while time.perf_counter() < deadline:
+        profile = rng.choice(profiles)
+        index.statuses(profile, index.by_subject[rng.choice(subjects)])
+        data.prereq_graph.subgraph(rng.choice(courses), "ancestors", None)
+        requests += 1
+    gc.collect()
+    return {"requests": requests, **memory_usage()}
+
+
+def run(
+    data: DataVersion,
+    profiles: List[UserFulfilled],
+    workers: int,
+    duration: float,
+    freeze: bool,
+) -> Dict[str, Any]:
+    gc.collect()
+    if freeze:
+        gc.freeze()
+    children = []
+    for slot in range(workers):
+        read_fd, write_fd = os.pipe()
+        pid = os.fork()
+        if pid == 0:
+            os.close(read_fd)
+            try:
+                result = work(data, profiles, duration, slot)
+                with os.fdopen(write_fd, "w") as f:
+                    json.dump(result, f)
+            finally:
+                os._exit(0)
+        os.close(write_fd)
+        children.append((pid, read_fd))
+
+    results = []
+    for pid, read_fd in children:
+        with os.fdopen(read_fd, "r") as f:
+            results.append(json.load(f))
+        os.waitpid(pid, 0)
+    if freeze:
+        gc.unfreeze()
+
+    def total(key: str) -> float:
+        return round(sum(r.get(key) or 0 for r in results), 1)
+
+    return {
+        "workers": workers,
+        "gc_freeze": freeze,
+        "requests_per_s": round(total("requests") / duration, 1),
+        "rss_mb": total("rss_mb"),
+        "pss_mb": total("pss_mb"),
+        "private_mb": total("private_mb"),
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Throughput and memory of forked workers sharing one loaded catalog, "
+            "as serve_forked runs them."
+        )
+    )
+    parser.add_argument("--scale", type=float, default=1.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    parser.add_argument("--duration", type=float, default=5.0)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    raw = generate_catalog(args.scale, args.seed)
+    data = DataVersion(validate_course_data(raw), "prefork")
+    del raw
+    eligibility_index(data)
+    profiles = sample_profiles(data, 50, random.Random(args.seed))
+    print(
+        f"Loaded {len(data.course_data)} courses in "
+        f"{time.perf_counter() - started:.1f}s, master {memory_usage()}"
+    )
+    print(f"{os.cpu_count()} CPUs")
+    for freeze in (True, False):
+        for workers in args.workers:
+            print(json.dumps(run(data, profiles, workers, args.duration, freeze)))
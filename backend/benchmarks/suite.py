@@ -0,0 +1,281 @@
+import json
+import os
+import platform
+import random
+import statistics
+import subprocess
+import tempfile
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from backend.benchmarks.catalog import catalog_terms, generate_catalog
+from backend.constants import (
+    INFERENCE_BACKEND,
+    VECTOR_BACKEND,
+    CourseQueryFormat,
+    MakeScheduleFormat,
+    UserFulfilled,
+    load_course_data_with_version,
+)
+from backend import functions
+from backend.registry import DataVersion
+
+BENCHMARKS = (
+    "load_course_data",
+    "load_course_snapshot",
+    "best_course_matches",
+    "check_prereq_tree",
+    "get_available_courses",
+    "make_schedule",
+    "initialize_database",
+    "course_query",
+)
+QUERIES = [
+    "intro machine learning",
+    "easy writing course",
+    "circuits lab",
+    "probability and statistics for engineers",
+    "advanced algorithms",
+]
+
+
+def measure(fn: Callable[[], Any], repeat: int, warmup: int = 1) -> Dict[str, float]:
+    for _ in range(warmup):
+        fn()
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn()
+        times.append(1000 * (time.perf_counter() - t0))
+    times.sort()
+    return {
+        "runs": repeat,
+        "min_ms": round(times[0], 3),
+        "median_ms": round(statistics.median(times), 3),
+        "p95_ms": round(times[min(len(times) - 1, int(0.95 * len(times)))], 3),
+    }
+
+
+def sample_profile(data: DataVersion, rng: random.Random) -> UserFulfilled:
+    """A student who finished a fifth of the 100 and 200 level courses."""
+    lower = sorted(c for c in data.course_data if c.split()[-1][0] in "12")
+    taken = rng.sample(lower, len(lower) // 5)
+    return UserFulfilled(
+        courses={
+            c: {"name": c, "grade": rng.choice(["A", "B+", "B", "C"])} for c in taken
+        },
+        standing="JUNIOR",
+    )
+
+
+def schedule_courses(data: DataVersion, term: str, count: int = 5) -> List[str]:
+    """The courses with the most sections this term, the worst case for make_schedule."""
+    offered = [
+        (len(info.sections[term]), course_id)
+        for course_id, info in data.course_data.items()
+        if term in info.sections
+    ]
+    return [course_id for _, course_id in sorted(offered, reverse=True)[:count]]
+
+
+def run_scale(
+    scale: float,
+    seed: int = 0,
+    repeat: int = 5,
+    only: Optional[Sequence[str]] = None,
+) -> List[Dict[str, Any]]:
+    selected = [b for b in BENCHMARKS if not only or b in only]
+    rng = random.Random(seed)
+    started = time.perf_counter()
+    raw = generate_catalog(scale, seed)
+    elapsed = time.perf_counter() - started
+    print(f"Generated {len(raw)} courses at {scale:g}x in {elapsed:.1f}s")
+
+    results: List[Dict[str, Any]] = []
+
+    def record(name: str, stats: Dict[str, float]) -> None:
+        results.append({"bench": name, **stats})
+        print(
+            f"  {name:<24}{stats['median_ms']:>12.2f} ms"
+            f"{stats['p95_ms']:>12.2f} p95{stats['runs']:>6} runs"
+        )
+
+    with tempfile.TemporaryDirectory() as work_dir:
+        path = os.path.join(work_dir, "graph.json")
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(raw, f)
+        del raw
+
+        load_repeat = max(1, repeat // 2)
+        if "load_course_data" in selected:
+            record(
+                "load_course_data",
+                measure(
+                    lambda: load_course_data_with_version(path, use_snapshot=False),
+                    load_repeat,
+                    warmup=0,
+                ),
+            )
+        # writes the snapshot the measured loads read
+        courses, version = load_course_data_with_version(path)
+        if "load_course_snapshot" in selected:
+            record(
+                "load_course_snapshot",
+                measure(lambda: load_course_data_with_version(path), load_repeat),
+            )
+
+        data = DataVersion(courses, version)
+        term = catalog_terms()[-1]
+        profile = sample_profile(data, rng)
+        tools = {
+            tool.__name__: tool
+            for tool in functions.get_tools(profile, term, data, traced=False)
+        }
+        course_query, make_schedule = tools["course_query"], tools["make_schedule"]
+
+        if "best_course_matches" in selected:
+            names = rng.sample(sorted(data.course_data), 10)
+            typos = [n.replace(" ", "").lower()[:-1] for n in names]
+            record(
+                "best_course_matches",
+                measure(
+                    lambda: [functions.best_course_matches(q, data) for q in typos],
+                    repeat,
+                ),
+            )
+        if "check_prereq_tree" in selected:
+            trees = [info.prereq_tree for info in data.course_data.values()]
+            record(
+                "check_prereq_tree",
+                measure(
+                    lambda: [functions.check_prereq_tree(t, profile) for t in trees],
+                    repeat,
+                ),
+            )
+        if "get_available_courses" in selected:
+            record(
+                "get_available_courses",
+                measure(
+                    lambda: functions.get_available_courses(
+                        profile, True, True, term, data
+                    ),
+                    repeat,
+                ),
+            )
+        if "make_schedule" in selected:
+            request = MakeScheduleFormat(
+                courses=schedule_courses(data, term), max_days=5
+            )
+            record("make_schedule", measure(lambda: make_schedule(request), repeat))
+
+        # Chroma opens ./chromadb, keep it inside the work dir
+        cwd = os.getcwd()
+        os.chdir(work_dir)
+        try:
+            if "initialize_database" in selected or "course_query" in selected:
+                functions.release_chroma()
+
+                def initialize() -> None:
+                    functions.initialize_database(data)
+                    data.derived["quantized_index"] = functions.build_course_index(data)
+
+                stats = measure(initialize, 1, warmup=0)
+                if "initialize_database" in selected:
+                    record("initialize_database", stats)
+            if "course_query" in selected:
+                requests = [
+                    CourseQueryFormat(
+                        query=q,
+                        top_n=20,
+                        only_prereqs_fulfilled=True,
+                        only_current_semester=True,
+                    )
+                    for q in QUERIES
+                ]
+                record(
+                    "course_query",
+                    measure(lambda: [course_query(r) for r in requests], repeat),
+                )
+        finally:
+            functions.release_chroma()
+            os.chdir(cwd)
+
+    for row in results:
+        row.update(scale=scale, courses=len(data.course_data), seed=seed)
+    return results
+
+
+def environment() -> Dict[str, Any]:
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "commit": commit,
+        "python": platform.python_version(),
+        "machine": platform.machine(),
+        "cpus": os.cpu_count(),
+        "inference_backend": INFERENCE_BACKEND,
+        "vector_backend": VECTOR_BACKEND,
+    }
+
+
+def load_history(path: str) -> List[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return []
+    with open(path, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def compare(rows: List[Dict[str, Any]], history: List[Dict[str, Any]]) -> None:
+    """Median of this run against the last comparable one in the history file."""
+    previous = {}
+    for row in history:
+        key = (
+            row["bench"],
+            row["scale"],
+            row["seed"],
+            row["inference_backend"],
+            row["vector_backend"],
+        )
+        previous[key] = row
+    print(f"\n{'bench':<24}{'scale':>7}{'median ms':>12}{'previous':>12}{'change':>9}")
+    for row in rows:
+        key = (
+            row["bench"],
+            row["scale"],
+            row["seed"],
+            row["inference_backend"],
+            row["vector_backend"],
+        )
+        before = previous.get(key)
+        line = f"{row['bench']:<24}{row['scale']:>6g}x{row['median_ms']:>12.2f}"
+        if before and before["median_ms"]:
+            change = row["median_ms"] / before["median_ms"] - 1
+            line += f"{before['median_ms']:>12.2f}{change:>+9.0%}"
+        print(line)
+
+
+def run(
+    scales: Sequence[float],
+    seed: int = 0,
+    repeat: int = 5,
+    only: Optional[Sequence[str]] = None,
+    results_path: Optional[str] = None,
+) -> List[Dict[str, Any]]:
+    env = environment()
+    rows = []
+    for scale in scales:
+        rows += [{**env, **row} for row in run_scale(scale, seed, repeat, only)]
+    if results_path:
+        compare(rows, load_history(results_path))
+        with open(results_path, "a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps(row) + "\n")
+        print(f"\nAppended {len(rows)} results to {results_path}")
+    return rows
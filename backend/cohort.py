@@ -0,0 +1,368 @@
+import argparse
+import csv
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.constants import STANDINGS, AndOrNodeModel
+from backend.eligibility import (
+    GRADE_VALUES,
+    NEVER,
+    Compiled,
+    compile_tree,
+    eligibility_index,
+)
+from backend.registry import DataVersion, registry
+
+# grade value of a course the student hasn't taken
+NOT_TAKEN = -1.0
+# profile rows with this grade record an equivalent instead of a taken course
+EQUIVALENT_GRADE = "EQ"
+# students per pool task; smaller cohorts run in this process, where 2,000 students
+# against the whole catalog take a fraction of a second and a pool only adds overhead
+CHUNK_SIZE = 4096
+
+
+class Cohort:
+    """
+    Many profiles as arrays:
+    - grades: student x course grade values (NOT_TAKEN if not taken)
+    - equivalents: student x course booleans
+    - standing: the STANDINGS index, -1 if unknown
+    - semesters_left: NaN if unknown
+    """
+
+    def __init__(
+        self,
+        students: List[str],
+        columns: Dict[str, int],
+        grades: np.ndarray,
+        equivalents: np.ndarray,
+        standing: np.ndarray,
+        semesters_left: np.ndarray,
+    ):
+        self.students = students
+        self.columns = columns
+        self.grades = grades
+        self.equivalents = equivalents
+        self.standing = standing
+        self.semesters_left = semesters_left
+
+    def __len__(self) -> int:
+        return len(self.students)
+
+    def slice(self, start: int, stop: int) -> "Cohort":
+        return Cohort(
+            self.students[start:stop],
+            self.columns,
+            self.grades[start:stop],
+            self.equivalents[start:stop],
+            self.standing[start:stop],
+            self.semesters_left[start:stop],
+        )
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[Dict[str, Any]], courses: Sequence[str]):
+        """
+        rows of student_id, course, grade and optionally standing, semesters_left
+        (read from any row of the student). `courses` are the catalog's course ids;
+        courses only the profiles mention get columns after them.
+        """
+        columns = {course_id: i for i, course_id in enumerate(courses)}
+        students: Dict[str, int] = {}
+        taken: List[Tuple[int, int, float]] = []
+        equivalent: List[Tuple[int, int]] = []
+        standing: Dict[int, int] = {}
+        semesters_left: Dict[int, float] = {}
+        for line, row in enumerate(rows, 1):
+            student = students.setdefault(str(row["student_id"]), len(students))
+            if row.get("standing"):
+                if row["standing"] not in STANDINGS:
+                    raise ValueError(f"Row {line}: unknown standing {row['standing']}")
+                standing[student] = STANDINGS.index(row["standing"])
+            if row.get("semesters_left") not in (None, ""):
+                semesters_left[student] = float(row["semesters_left"])
+            course_id = row.get("course")
+            if not course_id:
+                continue
+            column = columns.setdefault(course_id, len(columns))
+            grade = (row.get("grade") or "").strip()
+            if grade == EQUIVALENT_GRADE:
+                equivalent.append((student, column))
+            elif grade in GRADE_VALUES:
+                taken.append((student, column, GRADE_VALUES[grade]))
+            else:
+                raise ValueError(f"Row {line}: unknown grade {grade!r} for {course_id}")
+
+        grades = np.full((len(students), len(columns)), NOT_TAKEN, dtype=np.float32)
+        if taken:
+            s, c, g = zip(*taken)
+            # a course listed twice keeps the best grade
+            np.maximum.at(grades, (np.array(s), np.array(c)), np.array(g))
+        equivalents = np.zeros((len(students), len(columns)), dtype=bool)
+        if equivalent:
+            s, c = zip(*equivalent)
+            equivalents[np.array(s), np.array(c)] = True
+        standing_arr = np.full(len(students), -1, dtype=np.int8)
+        for student, value in standing.items():
+            standing_arr[student] = value
+        semesters_arr = np.full(len(students), np.nan, dtype=np.float32)
+        for student, value in semesters_left.items():
+            semesters_arr[student] = value
+        return cls(
+            list(students),
+            columns,
+            grades,
+            equivalents,
+            standing_arr,
+            semesters_arr,
+        )
+
+
+def read_rows(path: str) -> Iterator[Dict[str, Any]]:
+    """CSV, or Parquet (needs pyarrow) when the file ends in .parquet."""
+    if path.endswith(".parquet"):
+        try:
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise SystemExit("Reading Parquet needs pyarrow: pip install pyarrow")
+        yield from pq.read_table(path).to_pylist()
+        return
+    with open(path, "r", encoding="utf-8", newline="") as f:
+        yield from csv.DictReader(f)
+
+
+def evaluate_cohort(
+    compiled: Compiled, cohort: Cohort, cache: Dict[Tuple, np.ndarray]
+) -> np.ndarray:
+    """
+    One compiled tree for every student at once: leaves are column comparisons,
+    AND/OR are reductions over the children's boolean vectors. Leaves are cached
+    across the trees of one evaluation, most trees share their courses.
+    """
+    size = len(cohort)
+    if compiled is None:
+        return np.ones(size, dtype=bool)
+    kind = compiled[0]
+    if kind in ("AND", "OR"):
+        children = [evaluate_cohort(child, cohort, cache) for child in compiled[1]]
+        reduce = np.logical_and if kind == "AND" else np.logical_or
+        return reduce.reduce(children)
+
+    result = cache.get(compiled)
+    if result is not None:
+        return result
+    if kind == "COURSE":
+        column = cohort.columns.get(compiled[1])
+        if column is None:
+            result = np.zeros(size, dtype=bool)
+        else:
+            min_value = 0.0 if compiled[2] is None else compiled[2]
+            result = cohort.grades[:, column] >= min_value
+    elif kind == "EQUIVALENT":
+        columns = [cohort.columns.get(c) for c in compiled[1]]
+        if None in columns:
+            result = np.zeros(size, dtype=bool)
+        else:
+            result = cohort.equivalents[:, columns].all(axis=1)
+    elif kind == "STANDING":
+        result = cohort.standing >= compiled[1]
+        if compiled[2] is not None:
+            # NaN (unknown) compares False
+            result &= cohort.semesters_left <= compiled[2]
+    else:
+        result = np.zeros(size, dtype=bool)
+    cache[compiled] = result
+    return result
+
+
+def eligibility_matrix(
+    cohort: Cohort, trees: Dict[str, Compiled], targets: Sequence[str]
+) -> np.ndarray:
+    """student x target: prereqs met and not taken yet."""
+    cache: Dict[Tuple, np.ndarray] = {}
+    matrix = np.zeros((len(cohort), len(targets)), dtype=bool)
+    for j, course_id in enumerate(targets):
+        met = evaluate_cohort(trees.get(course_id, NEVER), cohort, cache)
+        column = cohort.columns.get(course_id)
+        if column is not None:
+            met = met & (cohort.grades[:, column] == NOT_TAKEN)
+        matrix[:, j] = met
+    return matrix
+
+
+def _matrix_task(args: Tuple[Cohort, Dict[str, Compiled], Sequence[str]]):
+    return eligibility_matrix(*args)
+
+
+def pooled_matrix(
+    cohort: Cohort,
+    trees: Dict[str, Compiled],
+    targets: Sequence[str],
+    workers: int = 1,
+) -> np.ndarray:
+    """eligibility_matrix over chunks of students in a process pool."""
+    chunks = [
+        cohort.slice(start, start + CHUNK_SIZE)
+        for start in range(0, len(cohort), CHUNK_SIZE)
+    ]
+    if workers <= 1 or len(chunks) <= 1:
+        return eligibility_matrix(cohort, trees, targets)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        parts = list(
+            pool.map(_matrix_task, [(chunk, trees, targets) for chunk in chunks])
+        )
+    return np.vstack(parts)
+
+
+def _retune(compiled: Compiled, min_values: Dict[str, float]) -> Compiled:
+    if compiled is None:
+        return None
+    if compiled[0] in ("AND", "OR"):
+        return (
+            compiled[0],
+            tuple(_retune(child, min_values) for child in compiled[1]),
+        )
+    if compiled[0] == "COURSE" and compiled[1] in min_values:
+        return ("COURSE", compiled[1], min_values[compiled[1]])
+    return compiled
+
+
+def apply_what_if(
+    trees: Dict[str, Compiled], what_if: Dict[str, Any]
+) -> Dict[str, Compiled]:
+    """
+    The trees after a what-if:
+      {"min_grade": {"MATH 112": "B"}}: every prereq on MATH 112 needs a B;
+      {"prereqs": {"CS 350": <prereq tree> or null}}: new trees for some courses.
+    """
+    changed = dict(trees)
+    min_values = {}
+    for course_id, grade in what_if.get("min_grade", {}).items():
+        if grade not in GRADE_VALUES:
+            raise ValueError(f"Unknown grade {grade!r} for {course_id}")
+        min_values[course_id] = GRADE_VALUES[grade]
+    if min_values:
+        changed = {
+            course_id: _retune(tree, min_values) for course_id, tree in changed.items()
+        }
+    for course_id, tree in what_if.get("prereqs", {}).items():
+        changed[course_id] = (
+            compile_tree(AndOrNodeModel.model_validate(tree)) if tree else None
+        )
+    return changed
+
+
+def analyze(
+    cohort: Cohort,
+    targets: Sequence[str],
+    data: Optional[DataVersion] = None,
+    what_if: Optional[Dict[str, Any]] = None,
+    workers: int = 1,
+) -> Dict[str, Any]:
+    """Eligible and taken counts per target, and what a what-if gains or loses."""
+    trees = eligibility_index(data).trees
+    baseline = pooled_matrix(cohort, trees, targets, workers)
+    taken = np.zeros_like(baseline)
+    for j, course_id in enumerate(targets):
+        column = cohort.columns.get(course_id)
+        if column is not None:
+            taken[:, j] = cohort.grades[:, column] != NOT_TAKEN
+
+    summary: Dict[str, Any] = {
+        "students": len(cohort),
+        "courses": {
+            course_id: {
+                "eligible": int(baseline[:, j].sum()),
+                "taken": int(taken[:, j].sum()),
+            }
+            for j, course_id in enumerate(targets)
+        },
+    }
+    if what_if:
+        changed = pooled_matrix(cohort, apply_what_if(trees, what_if), targets, workers)
+        for j, course_id in enumerate(targets):
+            gained = np.flatnonzero(changed[:, j] & ~baseline[:, j])
+            lost = np.flatnonzero(baseline[:, j] & ~changed[:, j])
+            summary["courses"][course_id].update(
+                what_if_eligible=int(changed[:, j].sum()),
+                gained=[cohort.students[i] for i in gained],
+                lost=[cohort.students[i] for i in lost],
+            )
+        summary["what_if"] = what_if
+        summary["what_if_matrix"] = changed
+    summary["matrix"] = baseline
+    return summary
+
+
+def write_matrix(path: str, cohort: Cohort, targets: Sequence[str], matrix) -> None:
+    """student_id and one 0/1 column per target course."""
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.writer(f)
+        writer.writerow(["student_id", *targets])
+        for student, row in zip(cohort.students, matrix):
+            writer.writerow([student, *row.astype(np.uint8).tolist()])
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description=(
+            "Prereq eligibility of a whole cohort for some courses, and how a what-if "
+            "rule change moves it. Profiles are rows of student_id, course, grade "
+            f"(A..F, or {EQUIVALENT_GRADE} for an equivalent), standing, semesters_left."
+        )
+    )
+    parser.add_argument("profiles", type=str, help="CSV or .parquet file")
+    parser.add_argument("--courses", nargs="*", default=[], help="target course ids")
+    parser.add_argument("--department", type=str, help="every course of a subject")
+    parser.add_argument("--term", type=str, help="only targets offered in this term")
+    parser.add_argument(
+        "--what-if", type=str, help='JSON file or string, e.g. {"min_grade": {...}}'
+    )
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--matrix", type=str, help="write the eligibility matrix CSV")
+    parser.add_argument("--json", type=str, help="also write the summary here")
+    args = parser.parse_args()
+
+    data = registry.current()
+    targets = list(args.courses)
+    if args.department:
+        targets += eligibility_index(data).by_subject.get(args.department.upper(), [])
+    if args.term:
+        offered = set(data.term_courses.get(args.term, ()))
+        targets = [t for t in targets if t in offered]
+    if not targets:
+        raise SystemExit("No target courses, pass --courses or --department")
+
+    what_if = None
+    if args.what_if:
+        if os.path.exists(args.what_if):
+            with open(args.what_if, "r", encoding="utf-8") as f:
+                what_if = json.load(f)
+        else:
+            what_if = json.loads(args.what_if)
+
+    cohort = Cohort.from_rows(read_rows(args.profiles), list(data.course_data))
+    summary = analyze(cohort, targets, data, what_if, args.workers)
+    if args.matrix:
+        write_matrix(args.matrix, cohort, targets, summary["matrix"])
+    summary.pop("matrix")
+    summary.pop("what_if_matrix", None)
+
+    print(f"{summary['students']} students, {len(targets)} courses")
+    header = f"{'course':<12}{'eligible':>10}{'taken':>8}"
+    if what_if:
+        header += f"{'what-if':>10}{'gained':>8}{'lost':>8}"
+    print(header)
+    for course_id, row in summary["courses"].items():
+        line = f"{course_id:<12}{row['eligible']:>10}{row['taken']:>8}"
+        if what_if:
+            line += (
+                f"{row['what_if_eligible']:>10}{len(row['gained']):>8}"
+                f"{len(row['lost']):>8}"
+            )
+        print(line)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
@@ -1,28 +1,143 @@
 import json
 import os
-from typing import List, Dict, Union, Optional, Literal, Set, Tuple, Any, Annotated
+import hashlib
+import pickle
+import struct
+import sys
+import gc
+import tempfile
+from typing import List, Dict, Union, Optional, Literal, Tuple, Any, Annotated
 from pydantic import BaseModel, RootModel, ConfigDict, ValidationError, Field
 import dotenv
 import redis
-import contextvars
 
 
 dotenv.load_dotenv("./.env")
 
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
+GEMINI_MODEL = os.getenv("GEMINI_MODEL", "gemini-2.5-flash")
+# another Gemini API endpoint, e.g. the load test's mock (python -m backend.loadtest.mock_gemini)
+GEMINI_BASE_URL = os.getenv("GEMINI_BASE_URL")
 CHROMA_KEY = os.getenv("CHROMA_KEY")
 CHROMA_TENANT = os.getenv("CHROMA_TENANT")
 CHROMA_DB = os.getenv("CHROMA_DB")
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 DATA_FILE = os.path.join(BASE_DIR, "data/graph.json")
-REDIS = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
+# pre-validated pickle of course_data written beside graph.json by the scraper
+SNAPSHOT_FILE = os.path.join(BASE_DIR, "data/graph.snapshot")
+SNAPSHOT_MAGIC = b"FLOWNJIT"
+SNAPSHOT_VERSION = 1
+SCRAPE_WORK_DIR = os.path.join(BASE_DIR, "data/scrape_work")
+EMBEDDING_MODEL = "all-MiniLM-L6-v2"
+CROSS_ENCODER_MODEL = "cross-encoder/ms-marco-MiniLM-L-6-v2"
+# "torch", "torch-int8" (dynamic int8 quantised Linear layers), "onnx"
+# (ONNX Runtime, needs pip install "sentence-transformers[onnx]") or "hash"
+# (no model, token hashing; only for offline benchmarks and load tests)
+INFERENCE_BACKEND = os.getenv("INFERENCE_BACKEND", "torch")
+# the token hashing backend and the size of its vectors
+OFFLINE_BACKEND = "hash"
+HASH_DIMENSIONS = 384
+# intra-op threads per process for both models, 0 keeps the library default
+INFERENCE_THREADS = int(os.getenv("INFERENCE_THREADS", 0))
+# cross-encoder micro-batching: how long a busy reranker waits for more requests to
+# join a batch, and the most (query, doc) pairs it scores in one predict call
+RERANK_MAX_WAIT_MS = float(os.getenv("RERANK_MAX_WAIT_MS", 5))
+RERANK_MAX_BATCH = int(os.getenv("RERANK_MAX_BATCH", 4096))
+# float32 course embeddings + id/hash index, built by the scraper, mmapped by the server
+EMBEDDINGS_FILE = os.path.join(BASE_DIR, "data/course_embeddings.npy")
+EMBEDDINGS_INDEX_FILE = os.path.join(BASE_DIR, "data/course_embeddings.json")
+# "chroma" or "int8" (in-process quantised index built from the embeddings artifact)
+VECTOR_BACKEND = os.getenv("VECTOR_BACKEND", "chroma")
+BANNER_BASE_URL = os.getenv(
+    "BANNER_BASE_URL", "https://generalssb-prod.ec.njit.edu/BannerExtensibility"
+)
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+SERVER_HOST = os.getenv("SERVER_HOST", "127.0.0.1")
+SERVER_PORT = int(os.getenv("SERVER_PORT", 3001))
+# > 1 preloads data and models once, then forks that many workers sharing the port
+SERVER_WORKERS = int(os.getenv("SERVER_WORKERS", 1))
+_redis_clients: Dict[int, redis.Redis] = {}
+
+
+def get_redis() -> redis.Redis:
+    """
+    Redis client for the current process. Created on first use, so forked
+    server workers each open their own connections instead of sharing sockets.
+    """
+    pid = os.getpid()
+    client = _redis_clients.get(pid)
+    if client is None:
+        _redis_clients.clear()
+        client = redis.Redis.from_url(REDIS_URL, decode_responses=True)
+        _redis_clients[pid] = client
+    return client
+
+
 LECTURERS_FILE = os.path.join(BASE_DIR, "data/lecturers.json")
-DESCRIPTION_PROCESS_PROMPT_FILE = (
-    r"d:\Projects\NJIT_Course_FLOWCHART\backend\prompts\description_process_prompt.txt"
+RMP_PROXY_URL = os.getenv(
+    "RMP_PROXY_URL", "https://backend-server-black-phi.vercel.app/prof"
 )
-CHATBOT_PROMPT_FILE = (
-    r"d:\Projects\NJIT_Course_FLOWCHART\backend\prompts\chatbot_prompt.txt"
+# seconds before a stored lecturer rating is fetched again
+LECTURER_RATING_TTL = int(os.getenv("LECTURER_RATING_TTL", 7 * 24 * 60 * 60))
+# live seat refresh for one term, empty disables it
+SEAT_REFRESH_TERM = os.getenv("SEAT_REFRESH_TERM", "")
+SEAT_REFRESH_INTERVAL = int(os.getenv("SEAT_REFRESH_INTERVAL", 180))
+# "memory" for a single process, "redis" to share the change feed between workers
+SEAT_FEED = os.getenv("SEAT_FEED", "memory")
+# seconds between checks of graph.json for a new scrape, 0 disables the watcher
+DATA_WATCH_INTERVAL = float(os.getenv("DATA_WATCH_INTERVAL", 30))
+# seconds a worker's claim on syncing Chroma for a new graph.json lasts without renewal
+DATA_SYNC_LOCK_TTL = int(os.getenv("DATA_SYNC_LOCK_TTL", 60))
+# required in X-Admin-Token by admin endpoints, unset disables them
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+# seconds a ranked course_query result stays in the shared cache, 0 disables it
+QUERY_CACHE_TTL = int(os.getenv("QUERY_CACHE_TTL", 24 * 60 * 60))
+# opt-in: answer near-duplicate first chat messages from earlier answers given to
+# users with the same profile, term and data version
+SEMANTIC_CACHE = os.getenv("SEMANTIC_CACHE", "0") == "1"
+# cosine similarity of the MiniLM query embeddings needed for a hit
+SEMANTIC_CACHE_THRESHOLD = float(os.getenv("SEMANTIC_CACHE_THRESHOLD", 0.92))
+SEMANTIC_CACHE_TTL = int(os.getenv("SEMANTIC_CACHE_TTL", 24 * 60 * 60))
+# answers kept per (profile, term, data version), oldest evicted first
+SEMANTIC_CACHE_MAX_ENTRIES = int(os.getenv("SEMANTIC_CACHE_MAX_ENTRIES", 200))
+# seconds an on-demand request profile (X-Profile header) is kept in Redis
+PROFILE_TTL = int(os.getenv("PROFILE_TTL", 24 * 60 * 60))
+# always-on stack sampler of in-flight requests, 0 disables it
+SLOW_SAMPLE_INTERVAL_MS = float(os.getenv("SLOW_SAMPLE_INTERVAL_MS", 20))
+# the slowest requests of every window keep their sampled stacks
+SLOW_TOP_N = int(os.getenv("SLOW_TOP_N", 5))
+SLOW_WINDOW_SECONDS = float(os.getenv("SLOW_WINDOW_SECONDS", 60))
+# append-only JSONL of every tool call (python -m backend.replay), empty disables it
+TOOL_TRACE_FILE = os.getenv("TOOL_TRACE_FILE", "")
+# also keep full tool results in the trace, so replays can show what changed
+TOOL_TRACE_RESULTS = os.getenv("TOOL_TRACE_RESULTS", "0") == "1"
+# /chat requests running at once per worker, the rest wait in a bounded queue
+CHAT_MAX_CONCURRENCY = int(os.getenv("CHAT_MAX_CONCURRENCY", 8))
+CHAT_QUEUE_SIZE = int(os.getenv("CHAT_QUEUE_SIZE", 32))
+# seconds a /chat request may wait for a slot before it gets a 429
+CHAT_QUEUE_TIMEOUT = float(os.getenv("CHAT_QUEUE_TIMEOUT", 10))
+# token buckets per client IP and per session: refill per second and burst, 0 disables
+CHAT_RATE_PER_IP = float(os.getenv("CHAT_RATE_PER_IP", 1))
+CHAT_BURST_PER_IP = int(os.getenv("CHAT_BURST_PER_IP", 10))
+CHAT_RATE_PER_SESSION = float(os.getenv("CHAT_RATE_PER_SESSION", 0.5))
+CHAT_BURST_PER_SESSION = int(os.getenv("CHAT_BURST_PER_SESSION", 4))
+# requests of one session run one after another in a worker; optional, overlapping
+# turns of a session are merged when they are saved
+CHAT_SESSION_SERIAL = os.getenv("CHAT_SESSION_SERIAL", "1") == "1"
+# times a chat turn's save is retried when other saves of the session keep racing it
+SESSION_SAVE_RETRIES = int(os.getenv("SESSION_SAVE_RETRIES", 5))
+# "compact" trims tool results before they go into the model context, "full" doesn't
+TOOL_RESULT_SHAPING = os.getenv("TOOL_RESULT_SHAPING", "compact")
+# characters of a course description in search results, the rest via get_course_details
+TOOL_DESC_CHARS = int(os.getenv("TOOL_DESC_CHARS", 160))
+# schedules make_schedule shows, out of all the valid ones
+TOOL_MAX_SCHEDULES = int(os.getenv("TOOL_MAX_SCHEDULES", 5))
+# bytes of JSON a tool result may take, list items past it are dropped
+TOOL_RESULT_BUDGET = int(os.getenv("TOOL_RESULT_BUDGET", 6000))
+DESCRIPTION_PROCESS_PROMPT_FILE = os.path.join(
+    BASE_DIR, "prompts/description_process_prompt.txt"
 )
+CHATBOT_PROMPT_FILE = os.path.join(BASE_DIR, "prompts/chatbot_prompt.txt")
 
 
 # SectionsEntries = Section	    CRN	    Days	Times	Location	Status	Max	Now	Instructor	Delivery Mode	Credits	Info	Comments
@@ -30,6 +145,8 @@ SectionEntries = Tuple[str, str, str, str, str, str, str, str, str, str, str, st
 SectionInfo = Dict[str, SectionEntries]
 
 TERMS = Literal["202610", "202595", "202590", "202550", "202510"]
+# any term code, past or future: year + semester suffix from SEMESTERS
+TermCode = Annotated[str, Field(pattern=r"^\d{4}(10|50|90|95)$")]
 STANDINGS = ["FRESHMAN", "SOPHOMORE", "JUNIOR", "SENIOR", "GRAD"]
 StandingsLiteral = Literal["FRESHMAN", "SOPHOMORE", "JUNIOR", "SENIOR", "GRAD"]
 SEMESTERS = {
@@ -306,6 +423,22 @@ class CourseSearchFormat(BaseModel):
     course_name: str
 
 
+CourseDetailField = Literal[
+    "title", "desc", "credits", "prereqs", "coreqs", "restrictions", "sections"
+]
+
+
+class CourseDetailsFormat(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    courses: List[str] = Field(
+        max_length=10, description="Names of the courses to get details for."
+    )
+    fields: List[CourseDetailField] = Field(
+        default=["title", "desc", "credits", "prereqs"],
+        description="Details to return for each course.",
+    )
+
+
 class MakeScheduleFormat(BaseModel):
     model_config = ConfigDict(extra="forbid")
     courses: List[str] = Field(
@@ -318,12 +451,56 @@ class MakeScheduleFormat(BaseModel):
     )
 
 
+class PlanDegreeFormat(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    targets: List[str] = Field(
+        description="Courses the user wants to have completed by the end of the plan."
+    )
+    start_term: Optional[TermCode] = Field(
+        default=None,
+        description="First term of the plan as a term code (e.g. 202690 for Fall 2026). Defaults to the current term.",
+    )
+    max_terms: int = Field(
+        default=8, ge=1, le=12, description="Maximum number of terms to plan."
+    )
+    max_credits: float = Field(
+        default=18, ge=1, le=30, description="Maximum credits per term."
+    )
+    include_summer: bool = Field(
+        default=False, description="Whether summer terms can be used."
+    )
+    include_winter: bool = Field(
+        default=False, description="Whether winter terms can be used."
+    )
+
+
+class PlanRequest(PlanDegreeFormat):
+    profile: UserFulfilled = Field(default_factory=UserFulfilled)
+    time_budget_ms: int = Field(default=1000, ge=10, le=5000)
+
+
+class EligibilityRequest(BaseModel):
+    model_config = ConfigDict(extra="forbid")
+    # the profile itself, or the chat session whose profile to use
+    profile: Optional[UserFulfilled] = None
+    sessionID: Optional[str] = None
+    courses: List[str] = Field(default_factory=list, max_length=5000)
+    # every course of a subject, e.g. "CS"
+    department: Optional[str] = None
+    reasons: bool = False
+
+
 class RPCRequest(BaseModel):
     model_config = ConfigDict(extra="forbid")
     method: str
     params: Dict[str, Any] = {}
 
 
+class BatchRequest(RPCRequest):
+    # echoed back with the result, results come out in input order either way
+    id: Optional[Union[str, int]] = None
+
+
 class ChatRequest(BaseModel):
     sessionID: str
     query: str
@@ -334,17 +511,141 @@ class ChatResponse(BaseModel):
     response: str
 
 
-def load_course_data(path: str) -> Dict[str, CourseInfoModel]:
-    with open(path, "r", encoding="utf-8") as f:
-        raw = json.load(f)
+def file_digest(path: str) -> str:
+    """sha1 of a file's bytes, used as the data version of graph.json."""
+    digest = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def snapshot_path_for(path: str) -> str:
+    return os.path.splitext(path)[0] + ".snapshot"
+
+
+def schema_fingerprint() -> str:
+    """Changes whenever the course data models change, which invalidates old snapshots."""
+    schema = json.dumps(CourseStructureModel.model_json_schema(), sort_keys=True)
+    return hashlib.md5(schema.encode("utf-8")).hexdigest()
+
+
+def write_course_snapshot(
+    data: Dict[str, CourseInfoModel], source_digest: str, snapshot_path: str
+) -> None:
+    """
+    Writes already validated course data as:
+    MAGIC | uint32 header length | JSON header | pickle of the model objects
+    """
+    # section rows repeat the same strings ("Open", "MW", instructors...),
+    # interned strings are pickled once and shared again on load
+    for info in data.values():
+        for term_sections in info.sections.values():
+            for section_id, row in term_sections.items():
+                term_sections[section_id] = tuple(sys.intern(v) for v in row)
+
+    header = json.dumps(
+        {
+            "version": SNAPSHOT_VERSION,
+            "schema": schema_fingerprint(),
+            "source": source_digest,
+        }
+    ).encode("utf-8")
+
+    directory = os.path.dirname(snapshot_path) or "."
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "wb") as f:
+            f.write(SNAPSHOT_MAGIC)
+            f.write(struct.pack("<I", len(header)))
+            f.write(header)
+            pickle.dump(data, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, snapshot_path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def load_course_snapshot(
+    snapshot_path: str, source_digest: str
+) -> Optional[Dict[str, CourseInfoModel]]:
+    """
+    Loads a snapshot without re-validating it (the scraper validated it on write).
+    Returns None if it is missing or was built from a different graph.json or schema.
+    Snapshots are pickles, only load ones this project wrote.
+    """
+    if not os.path.exists(snapshot_path):
+        return None
+    with open(snapshot_path, "rb") as f:
+        if f.read(len(SNAPSHOT_MAGIC)) != SNAPSHOT_MAGIC:
+            return None
+        (header_len,) = struct.unpack("<I", f.read(4))
+        header = json.loads(f.read(header_len))
+        if (
+            header.get("version") != SNAPSHOT_VERSION
+            or header.get("source") != source_digest
+            or header.get("schema") != schema_fingerprint()
+        ):
+            return None
+        # the loaded objects all survive, so collector passes during the load are wasted work
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            return pickle.load(f)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+
+def validate_course_data(raw: Dict[str, Any]) -> Dict[str, CourseInfoModel]:
     parsed = CourseStructureModel.model_validate(raw)
     return parsed.root
 
 
+def load_course_data_with_version(
+    path: str, use_snapshot: bool = True
+) -> Tuple[Dict[str, CourseInfoModel], str]:
+    """
+    Returns (course_data, data_version) for a graph.json.
+    Uses the snapshot beside it when it matches the file, otherwise falls back to
+    json.load + full validation and refreshes the snapshot for the next start.
+    """
+    version = file_digest(path)
+    snapshot_path = snapshot_path_for(path)
+
+    if use_snapshot:
+        try:
+            data = load_course_snapshot(snapshot_path, version)
+            if data is not None:
+                return data, version
+        except Exception as e:
+            print(f"Could not load snapshot {snapshot_path}: {e}")
+
+    with open(path, "r", encoding="utf-8") as f:
+        raw = json.load(f)
+    data = validate_course_data(raw)
+
+    if use_snapshot:
+        try:
+            write_course_snapshot(data, version, snapshot_path)
+        except OSError as e:
+            print(f"Could not write snapshot {snapshot_path}: {e}")
+    return data, version
+
+
+def load_course_data(
+    path: str, use_snapshot: bool = True
+) -> Dict[str, CourseInfoModel]:
+    return load_course_data_with_version(path, use_snapshot)[0]
+
+
 course_data: Dict[str, CourseInfoModel] = {}
+# sha1 of the loaded graph.json, empty when no data is loaded
+DATA_VERSION = ""
 
 try:
-    course_data = load_course_data(DATA_FILE)
+    course_data, DATA_VERSION = load_course_data_with_version(DATA_FILE)
 except FileNotFoundError:
     print(f"Warning: {DATA_FILE} not found. course_data will be empty.")
 except ValidationError as e:
@@ -352,14 +653,4 @@ except ValidationError as e:
     print(e)
     course_data = {}
 
-term_courses = {}
 CHAT_N = 5
-VALID_COURSES = set(course_data.keys())
-
-
-for course, course_info in course_data.items():
-    for term in course_info.sections.keys():
-        if term not in term_courses:
-            term_courses[term] = list()
-        else:
-            term_courses[term].append(course)
@@ -0,0 +1,242 @@
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Tuple
+from backend.constants import STANDINGS, UserFulfilled
+from backend.registry import DataVersion, registry
+
+GRADE_VALUES = {"A": 4.0, "B+": 3.5, "B": 3.0, "C+": 2.5, "C": 2.0, "F": 0.0}
+
+
+def is_grade_sufficient(user_grade: str, min_grade: Optional[str]) -> bool:
+    """
+    Checks if user_grade >= min_grade based on fixed set of grades.
+    """
+    # If user grade unknown, assume fail/invalid
+    val_user = GRADE_VALUES.get(user_grade, 0.0)
+
+    # If no min_grade specified, assume 'C' (passing) is required
+    # (Or just that any non-F grade is sufficient, but F=0 so C>=F check works if min=C)
+    if not min_grade:
+        return val_user >= 2.0
+
+    val_min = GRADE_VALUES.get(
+        min_grade, 2.0
+    )  # Default to C if min_grade str is unknown
+    return val_user >= val_min
+
+
+def check_prereq_tree(node: Any, user_prereqs: UserFulfilled) -> bool | str:
+    """
+    Recursively checks if a prereq tree node is satisfied by user_prereqs.
+    Returns True if satisfied, or a string description of the missing requirements.
+    """
+    if node is None:
+        return True
+
+    if not hasattr(node, "type"):
+        return "Internal error: Malformed prerequisite node."
+
+    node_type = node.type
+
+    if node_type == "AND":
+        errors = []
+        for child in node.children:
+            res = check_prereq_tree(child, user_prereqs)
+            if res is not True:
+                errors.append(res)
+        if not errors:
+            return True
+        if len(errors) == 1:
+            return errors[0]
+        return "All of the following must be met: (" + "; ".join(errors) + ")"
+
+    elif node_type == "OR":
+        errors = []
+        for child in node.children:
+            res = check_prereq_tree(child, user_prereqs)
+            if res is True:
+                return True
+            errors.append(res)
+        if not node.children:
+            return True
+        return "At least one of these must be met: (" + " OR ".join(errors) + ")"
+
+    elif node_type == "COURSE":
+        c_name = node.course
+        if c_name not in user_prereqs.courses:
+            return f"Missing course {c_name}"
+
+        u_info = user_prereqs.courses[c_name]
+        if node.min_grade and not is_grade_sufficient(u_info.grade, node.min_grade):
+            needed = node.min_grade or "C"
+            return f"User has {u_info.grade} in {c_name} suggests {u_info.grade}, but {needed} or better is required."
+        return True
+
+    elif node_type == "EQUIVALENT":
+        missing = [c for c in node.courses if c not in user_prereqs.equivalents]
+        if not missing:
+            return True
+        return f"Missing equivalent(s) for: {', '.join(missing)}"
+
+    elif node_type == "STANDING":
+        if not user_prereqs.standing:
+            return f"Required academic standing: {node.normalized}"
+
+        user_standing = user_prereqs.standing
+        required_standing = node.normalized
+
+        try:
+            user_index = STANDINGS.index(user_standing)
+            req_index = STANDINGS.index(required_standing)
+        except ValueError:
+            return f"Internal error: Invalid standing '{user_standing}' or '{required_standing}'."
+
+        if user_index < req_index:
+            return f"Standing is {user_standing}, but {required_standing} or higher is required."
+
+        if node.semesters_left is not None:
+            if user_prereqs.semesters_left is None:
+                return (
+                    f"Missing 'semesters left' info (required: {node.semesters_left})"
+                )
+            if user_prereqs.semesters_left > node.semesters_left:
+                return f"Requires {node.semesters_left} or fewer semesters left, but you have {user_prereqs.semesters_left}."
+
+        return True
+
+    name = getattr(node, "name", getattr(node, "raw", node_type))
+    return f"Special requirement needed: {node_type} ({name})"
+
+
+# A compiled tree is None (always met) or a tuple:
+#   ("AND" | "OR", children), ("COURSE", course, min grade value or None),
+#   ("EQUIVALENT", courses), ("STANDING", required index, semesters_left), ("FALSE",)
+Compiled = Optional[Tuple[Any, ...]]
+NEVER: Tuple[str] = ("FALSE",)
+
+
+def compile_tree(node: Any) -> Compiled:
+    """The prereq tree as plain tuples, with the same outcome as check_prereq_tree."""
+    if node is None:
+        return None
+    node_type = getattr(node, "type", None)
+    if node_type in ("AND", "OR"):
+        children = [compile_tree(child) for child in node.children]
+        if node_type == "OR" and (not children or None in children):
+            return None
+        children = [child for child in children if child is not None]
+        if not children:
+            return None
+        if len(children) == 1:
+            return children[0]
+        return (node_type, tuple(children))
+    if node_type == "COURSE":
+        min_value = GRADE_VALUES.get(node.min_grade, 2.0) if node.min_grade else None
+        return ("COURSE", node.course, min_value)
+    if node_type == "EQUIVALENT":
+        return ("EQUIVALENT", frozenset(node.courses))
+    if node_type == "STANDING" and node.normalized in STANDINGS:
+        return ("STANDING", STANDINGS.index(node.normalized), node.semesters_left)
+    # placements, permissions, skills: never met from a profile
+    return NEVER
+
+
+class ProfileView:
+    """What compiled trees read from a profile, flattened once per request."""
+
+    def __init__(self, profile: UserFulfilled):
+        self.grades: Dict[str, float] = {
+            name: GRADE_VALUES.get(info.grade, 0.0)
+            for name, info in profile.courses.items()
+        }
+        self.equivalents: FrozenSet[str] = frozenset(profile.equivalents)
+        self.standing: Optional[int] = (
+            STANDINGS.index(profile.standing) if profile.standing in STANDINGS else None
+        )
+        self.semesters_left = profile.semesters_left
+
+
+def evaluate(compiled: Compiled, view: ProfileView) -> bool:
+    if compiled is None:
+        return True
+    kind = compiled[0]
+    if kind == "COURSE":
+        grade = view.grades.get(compiled[1])
+        if grade is None:
+            return False
+        return compiled[2] is None or grade >= compiled[2]
+    if kind == "AND":
+        return all(evaluate(child, view) for child in compiled[1])
+    if kind == "OR":
+        return any(evaluate(child, view) for child in compiled[1])
+    if kind == "EQUIVALENT":
+        return compiled[1] <= view.equivalents
+    if kind == "STANDING":
+        if view.standing is None or view.standing < compiled[1]:
+            return False
+        if compiled[2] is not None:
+            return (
+                view.semesters_left is not None and view.semesters_left <= compiled[2]
+            )
+        return True
+    return False
+
+
+class EligibilityIndex:
+    """
+    Every course's prereq tree compiled once per data version, and course ids by
+    subject, so a whole department can be checked against a profile in one pass.
+    """
+
+    def __init__(self, data: DataVersion):
+        self.course_data = data.course_data
+        self.trees: Dict[str, Compiled] = {
+            course_id: compile_tree(info.prereq_tree)
+            for course_id, info in data.course_data.items()
+        }
+        self.by_subject: Dict[str, List[str]] = {}
+        for course_id in sorted(data.course_data):
+            subject = course_id.split(" ", 1)[0]
+            self.by_subject.setdefault(subject, []).append(course_id)
+
+    def is_eligible(self, course_id: str, view: ProfileView) -> bool:
+        return evaluate(self.trees[course_id], view)
+
+    def statuses(
+        self, profile: UserFulfilled, course_ids: Iterable[str]
+    ) -> Dict[str, str]:
+        """taken, eligible or blocked per known course id, unknown for the rest."""
+        view = ProfileView(profile)
+        result = {}
+        for course_id in course_ids:
+            if course_id not in self.trees:
+                result[course_id] = "unknown"
+            elif course_id in view.grades:
+                result[course_id] = "taken"
+            elif evaluate(self.trees[course_id], view):
+                result[course_id] = "eligible"
+            else:
+                result[course_id] = "blocked"
+        return result
+
+    def reasons(
+        self, profile: UserFulfilled, statuses: Dict[str, str]
+    ) -> Dict[str, str]:
+        """Why each blocked course is blocked, worded by check_prereq_tree."""
+        return {
+            course_id: check_prereq_tree(
+                self.course_data[course_id].prereq_tree, profile
+            )
+            for course_id, status in statuses.items()
+            if status == "blocked"
+        }
+
+
+def eligibility_index(data: Optional[DataVersion] = None) -> EligibilityIndex:
+    """The version's index; built here for versions made outside the registry."""
+    data = data or registry.current()
+    index = data.derived.get("eligibility")
+    if index is None:
+        index = data.derived.setdefault("eligibility", EligibilityIndex(data))
+    return index
+
+
+registry.add_builder("eligibility", EligibilityIndex)
@@ -0,0 +1,223 @@
+import argparse
+import glob
+import hashlib
+import json
+import os
+import tempfile
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import numpy as np
+from backend.constants import (
+    DATA_FILE,
+    EMBEDDING_MODEL,
+    EMBEDDINGS_FILE,
+    EMBEDDINGS_INDEX_FILE,
+    HASH_DIMENSIONS,
+    INFERENCE_BACKEND,
+    OFFLINE_BACKEND,
+)
+
+
+def generate_hash(title: str, description: str) -> Tuple[str, str]:
+    """
+    generates an md5 hash of the given text.
+    returns (hash, combined_text).
+    """
+    # handle none
+    t = title if title else ""
+    d = description if description else ""
+
+    combined_text = f"{t} {d}".strip()
+    return (hashlib.md5(combined_text.encode("utf-8")).hexdigest(), combined_text)
+
+
+def embedder_id(
+    model_name: str = EMBEDDING_MODEL, backend: str = INFERENCE_BACKEND
+) -> str:
+    """
+    What the query embeddings of this process are computed with. The model backends
+    all produce the model's vectors; token hashing lives in a different vector space.
+    """
+    if backend == OFFLINE_BACKEND:
+        return f"{OFFLINE_BACKEND}-{HASH_DIMENSIONS}"
+    return model_name
+
+
+class CourseEmbeddings:
+    """
+    A float32 (n_courses, dim) matrix memory-mapped from the file the index names,
+    plus the index: the course id and content hash of every row, and the model that
+    produced them. Every process that maps the same file shares one page-cached copy.
+    """
+
+    def __init__(self, matrix: np.ndarray, index: Dict[str, Any]):
+        self.matrix = matrix
+        self.model: str = index["model"]
+        self.ids: List[str] = index["ids"]
+        self.hashes: List[str] = index["hashes"]
+        self.rows: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def get(self, course_id: str, content_hash: str) -> Optional[np.ndarray]:
+        """Returns the stored embedding if it was computed from the same title + description."""
+        row = self.rows.get(course_id)
+        if row is None or self.hashes[row] != content_hash:
+            return None
+        return self.matrix[row]
+
+
+def _matrix_path(path: str, matrix: np.ndarray) -> str:
+    """`path` with the matrix's digest in the name, e.g. x.3f2a9c01d4e7.npy."""
+    digest = hashlib.sha256(np.ascontiguousarray(matrix).tobytes()).hexdigest()
+    root, ext = os.path.splitext(path)
+    return f"{root}.{digest[:12]}{ext}"
+
+
+def load_course_embeddings(
+    path: str = EMBEDDINGS_FILE,
+    index_path: str = EMBEDDINGS_INDEX_FILE,
+    embedder: Optional[str] = None,
+) -> Optional[CourseEmbeddings]:
+    """
+    Memory-maps the embeddings artifact. Returns None if missing or built with
+    another embedder than `embedder` (by default this process's, see embedder_id).
+    """
+    # a rebuild may delete the matrix the index we read names, read the new index then
+    for _ in range(2):
+        if not os.path.exists(index_path):
+            return None
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        # artifacts from before the embedder field were all built with the model
+        if index.get("embedder", index.get("model")) != (embedder or embedder_id()):
+            return None
+        # older artifacts have no matrix field and sit at `path` itself
+        matrix_path = (
+            os.path.join(os.path.dirname(index_path), index["matrix"])
+            if "matrix" in index
+            else path
+        )
+        try:
+            matrix = np.load(matrix_path, mmap_mode="r")
+            break
+        except FileNotFoundError:
+            continue
+    else:
+        return None
+    if matrix.shape[0] != len(index["ids"]):
+        print(f"Warning: {path} does not match {index_path}, ignoring it.")
+        return None
+    return CourseEmbeddings(matrix, index)
+
+
+def _embed(texts: List[str], model_name: str, batch_size: int) -> np.ndarray:
+    # only the build step needs the model, keep it out of the import path
+    from sentence_transformers import SentenceTransformer
+    from torch.cuda import is_available
+
+    model = SentenceTransformer(model_name, device="cuda" if is_available() else "cpu")
+    return model.encode(
+        texts, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=True
+    ).astype(np.float32)
+
+
+def build_course_embeddings(
+    courses: Iterable[Tuple[str, str, str]],
+    path: str = EMBEDDINGS_FILE,
+    index_path: str = EMBEDDINGS_INDEX_FILE,
+    model_name: str = EMBEDDING_MODEL,
+    batch_size: int = 64,
+) -> int:
+    """
+    Writes the embeddings artifact for (course_id, title, description) entries.
+    Rows whose title + description hash is unchanged are copied from the previous
+    artifact, only new or changed courses are embedded. Returns how many were embedded.
+    """
+    ids, hashes, texts = [], [], []
+    for course_id, title, description in courses:
+        content_hash, combined_text = generate_hash(title, description)
+        ids.append(course_id)
+        hashes.append(content_hash)
+        texts.append(combined_text)
+
+    # always embedded with the model, whatever backend this process queries with
+    previous = load_course_embeddings(path, index_path, model_name)
+    reused = {}
+    to_embed = []
+    for i, (course_id, content_hash) in enumerate(zip(ids, hashes)):
+        vector = previous.get(course_id, content_hash) if previous else None
+        if vector is not None:
+            reused[i] = np.array(vector)
+        else:
+            to_embed.append(i)
+
+    if to_embed:
+        print(f"Embedding {len(to_embed)} courses with {model_name}...")
+        fresh = _embed([texts[i] for i in to_embed], model_name, batch_size)
+        dim = fresh.shape[1]
+    elif reused:
+        dim = next(iter(reused.values())).shape[0]
+    else:
+        dim = 0
+
+    matrix = np.zeros((len(ids), dim), dtype=np.float32)
+    for i, vector in reused.items():
+        matrix[i] = vector
+    for j, i in enumerate(to_embed):
+        matrix[i] = fresh[j]
+    del previous
+
+    # The matrix goes to a new file named after its content, and the index naming it
+    # replaces the old one last: a concurrent load reads either the old index and
+    # matrix or the new ones, never the new matrix with the old ids and hashes.
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    matrix_path = _matrix_path(path, matrix)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".npy")
+    with os.fdopen(fd, "wb") as f:
+        np.save(f, matrix)
+    os.replace(tmp_path, matrix_path)
+
+    index = {
+        "model": model_name,
+        "embedder": model_name,
+        "dim": dim,
+        "matrix": os.path.relpath(matrix_path, os.path.dirname(index_path) or "."),
+        "ids": ids,
+        "hashes": hashes,
+    }
+    fd, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(index_path) or ".", suffix=".json"
+    )
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        json.dump(index, f)
+    os.replace(tmp_path, index_path)
+
+    # earlier matrices, processes still mapping one keep their pages until they unmap
+    root, ext = os.path.splitext(path)
+    for old in glob.glob(f"{glob.escape(root)}.*{ext}") + [path]:
+        if old != matrix_path and os.path.exists(old):
+            os.remove(old)
+
+    print(
+        f"✓ Saved {len(ids)} embeddings to {matrix_path} "
+        f"({len(to_embed)} embedded, {len(reused)} reused)"
+    )
+    return len(to_embed)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the course embeddings artifact loaded by the server."
+    )
+    parser.add_argument("--input", type=str, default=DATA_FILE)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    with open(args.input, "r", encoding="utf-8") as f:
+        graph = json.load(f)
+    build_course_embeddings(
+        ((cid, info.get("title"), info.get("desc")) for cid, info in graph.items()),
+        batch_size=args.batch_size,
+    )
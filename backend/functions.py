@@ -1,52 +1,104 @@
 from backend.constants import CHATBOT_PROMPT_FILE
-from backend.constants import term_courses
 from backend.constants import TERMS
 from backend.constants import (
     CourseQueryFormat,
     RPCRequest,
-    course_data,
     COLLECTION_NAME,
     CourseMetadata,
     GEMINI_API_KEY,
+    GEMINI_BASE_URL,
+    GEMINI_MODEL,
     UserFulfilled,
     CHAT_N,
     UpdateUserProfile,
     CHROMA_KEY,
     CHROMA_TENANT,
     CHROMA_DB,
-    REDIS,
-    STANDINGS,
-    VALID_COURSES,
     CourseSearchFormat,
+    CourseDetailsFormat,
     MakeScheduleFormat,
+    PlanDegreeFormat,
+    VECTOR_BACKEND,
 )
-import hashlib
+from backend.inference import (
+    configure_threads,
+    load_cross_encoder,
+    load_embedding_function,
+)
+from backend.reranker import BatchingReranker
+from backend.planner import plan_degree as plan_courses
+from backend.registry import DataVersion, registry
+from backend.query_cache import query_cache
+from backend.semantic_cache import SemanticCache
+from backend.sessions import session_store
+from backend.shaping import shape_tool, shaping_stats
+from backend.timing import stage, timed
+from backend.tracing import tool_trace
+from backend.eligibility import (
+    ProfileView,
+    check_prereq_tree,
+    eligibility_index,
+    is_grade_sufficient,
+)
+from backend.schedule import (
+    build_schedules,
+    has_time_conflict,
+    parse_section_times,
+    parse_time_str,
+)
+from backend.embeddings import generate_hash, load_course_embeddings
+from backend.vector_index import QuantizedIndex, build_quantized_index
+import numpy as np
 import chromadb
 from typing import List, Tuple, Dict, Any, Optional
-from chromadb.utils import embedding_functions
-from sentence_transformers import CrossEncoder
 import time
 from google import genai
 from google.genai import types
 import json
-from torch.cuda import is_available
-import itertools
+import os
 
 
-device = "cpu"
-if is_available:
-    device = "cuda"
-ef = embedding_functions.SentenceTransformerEmbeddingFunction(
-    model_name="all-MiniLM-L6-v2", device=device
-)
+configure_threads()
+ef = load_embedding_function()
 
-cross_encoder = CrossEncoder("cross-encoder/ms-marco-MiniLM-L-6-v2", device=device)
+cross_encoder = load_cross_encoder()
+# concurrent course_query calls share cross-encoder batches
+reranker = BatchingReranker(cross_encoder)
 
-chroma_client = chromadb.PersistentClient(path="./chromadb")
+# Fetch significantly more candidates for the cross-encoder to re-rank
+# This ensures we don't miss relevant items that have lower vector scores
+RANK_FETCH_K = 500
 
-collection = chroma_client.get_or_create_collection(
-    name=COLLECTION_NAME, embedding_function=ef
-)
+# earlier answers to near-duplicate questions, opt-in with SEMANTIC_CACHE=1
+response_cache = SemanticCache(lambda texts: np.asarray(ef(texts), dtype=np.float32))
+
+# per-process Chroma client and collection, see get_collection
+_chroma: Dict[str, Any] = {}
+
+
+def get_collection():
+    """
+    The course collection, opened lazily per process. The Chroma client keeps sqlite
+    connections and threads that must not cross a fork, so every worker opens its own.
+    """
+    if _chroma.get("pid") != os.getpid():
+        client = chromadb.PersistentClient(path="./chromadb")
+        _chroma.update(
+            pid=os.getpid(),
+            client=client,
+            collection=client.get_or_create_collection(
+                name=COLLECTION_NAME, embedding_function=ef
+            ),
+        )
+    return _chroma["collection"]
+
+
+def release_chroma() -> None:
+    """Closes this process's Chroma client. The server master calls it before forking."""
+    client = _chroma.get("client")
+    _chroma.clear()
+    if client is not None:
+        client.clear_system_cache()
 
 
 def lcs_length(a: str, b: str) -> int:
@@ -68,11 +120,11 @@ def lcs_length(a: str, b: str) -> int:
     return dp[-1]
 
 
-def best_course_matches(query: str) -> List[str]:
+def best_course_matches(query: str, data: Optional[DataVersion] = None) -> List[str]:
     scores = []
     max_score = 0
 
-    for s in VALID_COURSES:
+    for s in (data or registry.current()).valid_courses:
         score = lcs_length(query, s)
         scores.append((s, score))
         max_score = max(max_score, score)
@@ -80,21 +132,26 @@ def best_course_matches(query: str) -> List[str]:
     return [s for s, score in scores if score == max_score]
 
 
-def is_valid_course(course_name: str) -> None | List[str]:
-    valid_course = course_name in VALID_COURSES
+def is_valid_course(
+    course_name: str, data: Optional[DataVersion] = None
+) -> None | List[str]:
+    data = data or registry.current()
+    valid_course = course_name in data.valid_courses
     if valid_course:
         return None
     else:
-        return best_course_matches(course_name)
+        return best_course_matches(course_name, data)
 
 
-def normalize_course(course_name: str) -> str | dict:
+def normalize_course(
+    course_name: str, data: Optional[DataVersion] = None
+) -> str | dict:
     """
     Validates and normalizes course names (e.g., CS101 -> CS 101).
     Returns the valid/fixed course name, or a dictionary with an error message and suggestions.
     """
     course_name = course_name.upper()
-    similar_courses = is_valid_course(course_name)
+    similar_courses = is_valid_course(course_name, data)
 
     if not similar_courses:
         return course_name
@@ -119,27 +176,19 @@ def FunctionResult(method: str, response: Any, message_to_ai: str):
     }
 
 
-def generate_hash(title: str, description: str) -> Tuple[str, str]:
-    """
-    generates an md5 hash of the given text.
-    returns (hash, combined_text).
-    """
-    # handle none
-    t = title if title else ""
-    d = description if description else ""
-
-    combined_text = f"{t} {d}".strip()
-    return (hashlib.md5(combined_text.encode("utf-8")).hexdigest(), combined_text)
-
-
-def initialize_database() -> None:
+def initialize_database(data: DataVersion) -> None:
     """
     initializes chromadb and populates it with course data.
+    courses whose title + description hash matches the precomputed embeddings
+    artifact are upserted with those vectors, only the rest are embedded here.
+    A shared builder (see registry): with several workers, one of them syncs each
+    data version.
     """
     print("Initializing ChromaClient...")
 
     try:
-        heartbeat = chroma_client.heartbeat()
+        collection = get_collection()
+        heartbeat = _chroma["client"].heartbeat()
         print("ChromaDB Heartbeat:", heartbeat)
     except Exception as e:
         print("Could not initialize ChromaDB PersistentClient at ./chromadb")
@@ -147,167 +196,171 @@ def initialize_database() -> None:
 
     print(f"Getting or creating collection '{COLLECTION_NAME}'...")
 
-    ids_to_upsert: List[str] = []
-    documents_to_upsert: List[str] = []
-    metadatas_to_upsert: List[CourseMetadata] = []
-
     print("Checking for updates in graph data...")
 
-    for course_id, info in course_data.items():
+    # one round trip for every stored hash instead of one get per course
+    existing = collection.get(include=["metadatas"])
+    existing_hashes = {
+        cid: (meta or {}).get("hash")
+        for cid, meta in zip(existing["ids"], existing["metadatas"] or [])
+    }
+    artifact = load_course_embeddings()
+    if artifact is None:
+        print("No embeddings artifact found, changed courses will be embedded locally.")
+
+    # upserts with precomputed vectors and upserts that need the model are sent separately
+    batches = {True: ([], [], [], []), False: ([], [], [], [])}
+
+    def flush(precomputed: bool) -> None:
+        ids, documents, metadatas, embeddings = batches[precomputed]
+        if not ids:
+            return
+        collection.upsert(
+            ids=ids,
+            documents=documents,
+            metadatas=metadatas,  # type: ignore
+            embeddings=embeddings if precomputed else None,
+        )
+        print(
+            f"Upserted {len(ids)} courses"
+            f"{' from embeddings artifact' if precomputed else ''}..."
+        )
+        for values in batches[precomputed]:
+            values.clear()
+
+    for course_id, info in data.course_data.items():
         title = info.title
         description = info.desc
 
         computed_hash, combined_text = generate_hash(title, description)
 
-        # retrieve specific item to check hash
-        result = collection.get(ids=[course_id], include=["metadatas"])
-
-        needs_upsert = False
-        if not result["ids"]:
-            needs_upsert = True
-        else:
-            existing_metas = result.get("metadatas")
-            existing_meta = existing_metas[0] if existing_metas else None
-
-            if not existing_meta or existing_meta.get("hash") != computed_hash:
-                print(f"Course {course_id} changed, re-indexing...")
-                needs_upsert = True
-
-        if needs_upsert:
-            ids_to_upsert.append(course_id)
-            documents_to_upsert.append(combined_text)
-            metadata: CourseMetadata = {
-                "title": title,
-                "description": description,
-                "hash": computed_hash,
-            }
-            metadatas_to_upsert.append(metadata)
+        if course_id in existing_hashes:
+            if existing_hashes[course_id] == computed_hash:
+                continue
+            print(f"Course {course_id} changed, re-indexing...")
+
+        vector = artifact.get(course_id, computed_hash) if artifact else None
+        precomputed = vector is not None
+        ids, documents, metadatas, embeddings = batches[precomputed]
+        ids.append(course_id)
+        documents.append(combined_text)
+        metadata: CourseMetadata = {
+            "title": title,
+            "description": description,
+            "hash": computed_hash,
+        }
+        metadatas.append(metadata)
+        if precomputed:
+            embeddings.append(vector.tolist())
 
         # batch upsert
-        if len(ids_to_upsert) >= 100:
-            collection.upsert(
-                ids=ids_to_upsert,
-                documents=documents_to_upsert,
-                metadatas=metadatas_to_upsert,
-            )
-            print(f"Upserted {len(ids_to_upsert)} courses...")
-            ids_to_upsert = []
-            documents_to_upsert = []
-            metadatas_to_upsert = []
+        if len(ids) >= 100:
+            flush(precomputed)
 
-    # final batch
-    if len(ids_to_upsert) > 0:
-        collection.upsert(
-            ids=ids_to_upsert,
-            documents=documents_to_upsert,
-            metadatas=metadatas_to_upsert,  # type: ignore
-        )
-        print(f"Final update for {len(ids_to_upsert)} courses complete.")
+    # final batches
+    flush(True)
+    flush(False)
 
     print("Database synchronization complete.")
 
 
-def is_grade_sufficient(user_grade: str, min_grade: Optional[str]) -> bool:
-    """
-    Checks if user_grade >= min_grade based on fixed set of grades.
-    """
-    grade_values = {"A": 4.0, "B+": 3.5, "B": 3.0, "C+": 2.5, "C": 2.0, "F": 0.0}
-
-    # If user grade unknown, assume fail/invalid
-    val_user = grade_values.get(user_grade, 0.0)
+def build_course_index(data: DataVersion) -> Optional[QuantizedIndex]:
+    """The version's int8 index if enabled, built in every process from the artifact."""
+    if VECTOR_BACKEND != "int8":
+        return None
+    quantized_index = build_quantized_index(
+        {cid: (info.title, info.desc) for cid, info in data.course_data.items()},
+        load_course_embeddings(),
+        lambda texts: np.asarray(ef(texts), dtype=np.float32),
+    )
+    print(f"Built int8 course index ({quantized_index.nbytes / (1 << 20):.1f} MiB).")
+    return quantized_index
 
-    # If no min_grade specified, assume 'C' (passing) is required
-    # (Or just that any non-F grade is sufficient, but F=0 so C>=F check works if min=C)
-    if not min_grade:
-        return val_user >= 2.0
 
-    val_min = grade_values.get(
-        min_grade, 2.0
-    )  # Default to C if min_grade str is unknown
-    return val_user >= val_min
+registry.add_builder("chroma", initialize_database, shared=True)
+registry.add_builder("quantized_index", build_course_index)
 
 
-def check_prereq_tree(node: Any, user_prereqs: UserFulfilled) -> bool | str:
+def vector_search(
+    query_text: str,
+    candidate_ids: List[str],
+    fetch_k: int,
+    data: Optional[DataVersion] = None,
+) -> List[Dict[str, Any]]:
     """
-    Recursively checks if a prereq tree node is satisfied by user_prereqs.
-    Returns True if satisfied, or a string description of the missing requirements.
+    Nearest courses to the query among candidate_ids, as dicts with
+    id, document and init_distance (squared L2), nearest first.
     """
-    if node is None:
-        return True
+    data = data or registry.current()
+    quantized_index = data.derived.get("quantized_index")
+    if quantized_index is not None:
+        course_data = data.course_data
+        query = np.asarray(ef([query_text])[0], dtype=np.float32)
+        return [
+            {
+                "id": cid,
+                "document": generate_hash(
+                    course_data[cid].title, course_data[cid].desc
+                )[1],
+                "init_distance": distance,
+            }
+            for cid, distance in quantized_index.search(query, fetch_k, candidate_ids)
+        ]
 
-    if not hasattr(node, "type"):
-        return "Internal error: Malformed prerequisite node."
+    results = get_collection().query(
+        ids=candidate_ids,
+        query_texts=[query_text],
+        n_results=fetch_k,
+    )
 
-    node_type = node.type
+    if not results["ids"]:
+        return []
 
-    if node_type == "AND":
-        errors = []
-        for child in node.children:
-            res = check_prereq_tree(child, user_prereqs)
-            if res is not True:
-                errors.append(res)
-        if not errors:
-            return True
-        if len(errors) == 1:
-            return errors[0]
-        return "All of the following must be met: (" + "; ".join(errors) + ")"
-
-    elif node_type == "OR":
-        errors = []
-        for child in node.children:
-            res = check_prereq_tree(child, user_prereqs)
-            if res is True:
-                return True
-            errors.append(res)
-        if not node.children:
-            return True
-        return "At least one of these must be met: (" + " OR ".join(errors) + ")"
-
-    elif node_type == "COURSE":
-        c_name = node.course
-        if c_name not in user_prereqs.courses:
-            return f"Missing course {c_name}"
-
-        u_info = user_prereqs.courses[c_name]
-        if node.min_grade and not is_grade_sufficient(u_info.grade, node.min_grade):
-            needed = node.min_grade or "C"
-            return f"User has {u_info.grade} in {c_name} suggests {u_info.grade}, but {needed} or better is required."
-        return True
-
-    elif node_type == "EQUIVALENT":
-        missing = [c for c in node.courses if c not in user_prereqs.equivalents]
-        if not missing:
-            return True
-        return f"Missing equivalent(s) for: {', '.join(missing)}"
-
-    elif node_type == "STANDING":
-        if not user_prereqs.standing:
-            return f"Required academic standing: {node.normalized}"
-
-        user_standing = user_prereqs.standing
-        required_standing = node.normalized
+    flat_results: List[Dict[str, Any]] = []
+    ids_list = results["ids"][0]
+    distances_list = (
+        results["distances"][0] if results["distances"] else [None] * len(ids_list)
+    )
+    documents_list = (
+        results["documents"][0] if results["documents"] else [None] * len(ids_list)
+    )
 
-        try:
-            user_index = STANDINGS.index(user_standing)
-            req_index = STANDINGS.index(required_standing)
-        except ValueError:
-            return f"Internal error: Invalid standing '{user_standing}' or '{required_standing}'."
-
-        if user_index < req_index:
-            return f"Standing is {user_standing}, but {required_standing} or higher is required."
-
-        if node.semesters_left is not None:
-            if user_prereqs.semesters_left is None:
-                return (
-                    f"Missing 'semesters left' info (required: {node.semesters_left})"
-                )
-            if user_prereqs.semesters_left > node.semesters_left:
-                return f"Requires {node.semesters_left} or fewer semesters left, but you have {user_prereqs.semesters_left}."
+    for i, cid in enumerate(ids_list):
+        flat_results.append(
+            {
+                "id": cid,
+                "document": documents_list[i],
+                "init_distance": distances_list[i],
+            }
+        )
+    return flat_results
 
-        return True
 
-    name = getattr(node, "name", getattr(node, "raw", node_type))
-    return f"Special requirement needed: {node_type} ({name})"
+def rank_courses(
+    query_text: str, candidate_ids: List[str], data: DataVersion
+) -> List[Dict[str, Any]]:
+    """
+    The RANK_FETCH_K nearest candidates, reranked by the cross encoder, best first,
+    as dicts with id, init_distance and score.
+    """
+    flat_results = vector_search(query_text, candidate_ids, RANK_FETCH_K, data)
+
+    # rerank with cross encoder
+    if flat_results:
+        pairs = [[query_text, item["document"]] for item in flat_results]
+        scores = reranker.predict(pairs)
+        for i, item in enumerate(flat_results):
+            item["score"] = float(scores[i])
+
+        flat_results.sort(key=lambda x: x["score"], reverse=True)
+    return [
+        {
+            "id": item["id"],
+            "init_distance": item["init_distance"],
+            "score": item["score"],
+        }
+        for item in flat_results
+    ]
 
 
 def get_available_courses(
@@ -315,102 +368,40 @@ def get_available_courses(
     only_prereqs_fulfilled: bool,
     only_current_term: bool,
     term: str,
+    data: Optional[DataVersion] = None,
 ) -> List[str]:
     """
     Returns all course_names from course_data where prereq_tree is satisfied.
     """
+    data = data or registry.current()
+    course_data = data.course_data
     if only_current_term:
-        course_names = term_courses[term]
+        course_names = list(data.term_courses.get(term, ()))
     else:
         course_names = list(course_data.keys())
 
     if only_prereqs_fulfilled:
-        satisfied_courses = []
-
-        for course_name in course_names:
-            if course_name in user_prereqs.courses.keys():
-                continue
-
-            if (
-                check_prereq_tree(course_data[course_name].prereq_tree, user_prereqs)
-                is True
-            ):
-                satisfied_courses.append(course_name)
-        return satisfied_courses
+        index = eligibility_index(data)
+        view = ProfileView(user_prereqs)
+        return [
+            course_name
+            for course_name in course_names
+            if course_name not in view.grades and index.is_eligible(course_name, view)
+        ]
     else:
         return course_names
 
 
-def parse_time_str(time_str: str) -> Tuple[int, int]:
-    """Parse time string like '11:30 AM - 12:50 PM' into (start_minutes, end_minutes)."""
-    try:
-        parts = time_str.strip().split(" - ")
-        if len(parts) != 2:
-            return None
-
-        start_str, end_str = parts
-
-        def time_to_minutes(t: str) -> int:
-            t = t.strip()
-            time_part, period = t.rsplit(" ", 1)
-            hour, minute = map(int, time_part.split(":"))
-
-            if period == "PM" and hour != 12:
-                hour += 12
-            elif period == "AM" and hour == 12:
-                hour = 0
-
-            return hour * 60 + minute
-
-        return (time_to_minutes(start_str), time_to_minutes(end_str))
-    except Exception:
-        return None
-
-
-def parse_section_times(
-    times_str: str, days_str: str
-) -> Dict[str, List[Tuple[int, int]]]:
-    """Map times to days. Returns dict of day -> [(start, end), ...]."""
-    if not times_str or not days_str:
-        return {}
-
-    day_to_times = {}
-    time_slots = [slot.strip() for slot in times_str.split(",")]
-
-    # If single time slot, apply to all days
-    if len(time_slots) == 1:
-        parsed = parse_time_str(time_slots[0])
-        if parsed:
-            for day in days_str:
-                day_to_times[day] = [parsed]
-    else:
-        # Multiple time slots - map to days in order
-        for i, day in enumerate(days_str):
-            if i < len(time_slots):
-                parsed = parse_time_str(time_slots[i])
-                if parsed:
-                    day_to_times[day] = [parsed]
-
-    return day_to_times
-
-
-def has_time_conflict(section1_times: Dict, section2_times: Dict) -> bool:
-    """Check if two sections have overlapping times on any shared day."""
-    for day in section1_times:
-        if day not in section2_times:
-            continue
-
-        # Check all time slot pairs for this day
-        for start1, end1 in section1_times[day]:
-            for start2, end2 in section2_times[day]:
-                # Check for overlap: ranges overlap if start1 < end2 and start2 < end1
-                if start1 < end2 and start2 < end1:
-                    return True
-
-    return False
-
+def get_tools(
+    user_prereqs: UserFulfilled,
+    term: TERMS,
+    data: Optional[DataVersion] = None,
+    traced: bool = True,
+):
+    # every tool call of one chat turn sees the same data version
+    data = data or registry.current()
+    course_data = data.course_data
 
-def get_tools(user_prereqs: UserFulfilled, term: TERMS):
     def course_query(args: CourseQueryFormat) -> List[Dict[str, Any]]:
         """
         Queries the course database for semantic similarities.
@@ -426,74 +417,65 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
         Returns:
             Top_n matching courses based on query and only_prereqs_fulfilled.
         """
-        print("DEBUG:", args.model_dump())
         query_text = args.query
         n = args.top_n
 
-        # Fetch significantly more candidates for the cross-encoder to re-rank
-        # This ensures we don't miss relevant items that have lower vector scores
-        fetch_k = 500
-
         try:
-            results = collection.query(
-                ids=get_available_courses(
-                    user_prereqs,
-                    args.only_prereqs_fulfilled,
-                    args.only_current_semester,
-                    term,
-                ),
-                query_texts=[query_text],
-                n_results=fetch_k,
+            # the ranking doesn't depend on the user, it's shared through the cache
+            # and the prereq filter runs on the ranked list afterwards
+            term_filter = term if args.only_current_semester else None
+            candidates = get_available_courses(
+                user_prereqs, False, args.only_current_semester, term, data
             )
-
-            if not results["ids"]:
-                return []
-
-            flat_results: List[Dict[str, Any]] = []
-            ids_list = results["ids"][0]
-            distances_list = (
-                results["distances"][0]
-                if results["distances"]
-                else [None] * len(ids_list)
-            )
-            metadatas_list = (
-                results["metadatas"][0]
-                if results["metadatas"]
-                else [None] * len(ids_list)
+            eligible = (
+                get_available_courses(
+                    user_prereqs, True, args.only_current_semester, term, data
+                )
+                if args.only_prereqs_fulfilled
+                else None
             )
-            documents_list = (
-                results["documents"][0]
-                if results["documents"]
-                else [None] * len(ids_list)
+            # the shared list only holds the top RANK_FETCH_K candidates, so with
+            # fewer eligible courses than asked for the filtered fallback below is
+            # certain; rank the eligible ones directly instead of both
+            fallback_certain = (
+                eligible is not None
+                and len(eligible) < n
+                and len(candidates) > RANK_FETCH_K
             )
-
-            for i, cid in enumerate(ids_list):
-                flat_results.append(
-                    {
-                        "id": cid,
-                        "document": documents_list[i],
-                        "init_distance": distances_list[i],
-                    }
-                )
-
-            # rerank with cross encoder
-            if flat_results:
-                pairs = [[query_text, item["document"]] for item in flat_results]
-                scores = cross_encoder.predict(pairs)
-                for i, item in enumerate(flat_results):
-                    item["score"] = float(scores[i])
-
-                flat_results.sort(key=lambda x: x["score"], reverse=True)
+            if fallback_certain:
+                ranked = rank_courses(query_text, eligible, data)
+            else:
+                ranked = query_cache.get(query_text, term_filter, data.version)
+                if ranked is None:
+                    ranked = rank_courses(query_text, candidates, data)
+                    query_cache.set(query_text, term_filter, data.version, ranked)
+
+            if eligible is not None and not fallback_certain:
+                eligible_ids = set(eligible)
+                ranked = [item for item in ranked if item["id"] in eligible_ids]
+                if len(ranked) < n and len(candidates) > RANK_FETCH_K:
+                    # too few eligible courses among the shared top results
+                    ranked = rank_courses(query_text, eligible, data)
+
+            flat_results = [
+                {
+                    **item,
+                    "document": generate_hash(
+                        course_data[item["id"]].title, course_data[item["id"]].desc
+                    )[1],
+                }
+                for item in ranked[:n]
+            ]
 
             return {
-                "search_result": flat_results[:n],
+                "search_result": flat_results,
                 "message_to_relay_to_user": "Configuration: Results restricted to current term."
                 if args.only_current_semester
                 else "Configuration: Results not restricted to current term.",
             }
 
         except Exception as e:
-            print("Error querying ChromaDB:", e)
+            print("Error querying course index:", e)
             return []
 
     def update_user_profile(args: UpdateUserProfile):
@@ -519,10 +501,9 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
         Returns:
             All user fullfilments after current update and errors if any.
         """
-        print("DEBUG:", args.model_dump())
         errors = []
         for course in args.courses:
-            course_name = normalize_course(course.name)
+            course_name = normalize_course(course.name, data)
             # TODO: make it so that the valid ones are added.
             if isinstance(course_name, dict):
                 errors.append(course_name)
@@ -530,7 +511,7 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
             user_prereqs.courses[course_name] = course
 
         for eq in args.equivalents:
-            course_name = normalize_course(eq)
+            course_name = normalize_course(eq, data)
             if isinstance(course_name, dict):
                 errors.append(course_name)
                 continue
@@ -581,14 +562,70 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
         Returns:
             description of the course
         """
-        print("DEBUG:", args.model_dump())
-        res = normalize_course(args.course_name)
+        res = normalize_course(args.course_name, data)
         if isinstance(res, dict):
             return res
         course_name = res
 
         return course_data[course_name].desc
 
+    def get_course_details(args: CourseDetailsFormat) -> Dict[str, Any]:
+        """
+        Gets details of one or more courses that other results only summarize.
+
+        Args:
+            {
+            "courses": "Names of the courses to get details for.",
+            "fields": "Details to return for each course: title, desc, credits, prereqs, coreqs, restrictions, sections (current term)."
+            }
+
+        Returns:
+            The requested details per course and errors if any.
+        """
+        errors = []
+        details = {}
+        for course_name in args.courses:
+            normalized = normalize_course(course_name, data)
+            if isinstance(normalized, dict):
+                errors.append(normalized)
+                continue
+            course_info = course_data[normalized]
+            entry: Dict[str, Any] = {}
+            for field in args.fields:
+                if field == "title":
+                    entry["title"] = course_info.title
+                elif field == "desc":
+                    entry["desc"] = course_info.desc
+                elif field == "credits":
+                    entry["credits"] = course_info.credits
+                elif field == "prereqs":
+                    entry["prereqs"] = (
+                        course_info.prereq_tree.model_dump(exclude_none=True)
+                        if course_info.prereq_tree
+                        else None
+                    )
+                elif field == "coreqs":
+                    entry["coreqs"] = (
+                        course_info.coreq_tree.model_dump(exclude_none=True)
+                        if course_info.coreq_tree
+                        else None
+                    )
+                elif field == "restrictions":
+                    entry["restrictions"] = [
+                        r.model_dump(exclude_none=True)
+                        for r in course_info.restrictions
+                    ]
+                elif field == "sections":
+                    entry["sections"] = [
+                        f"{section_id} #{section[1]} {section[2]} {section[3]}, "
+                        f"{section[8]} ({section[7]}/{section[6]} seats taken)"
+                        for section_id, section in course_info.sections.get(
+                            term, {}
+                        ).items()
+                    ]
+            details[normalized] = entry
+        return {"courses": details, "errors": errors if errors else None}
+
     def can_take_course(args: CourseSearchFormat) -> bool | str:
         """
         Checks if user can take a course.
@@ -601,8 +638,7 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
         Returns:
             True or explanation of why user can't take it
         """
-        print("DEBUG:", args.model_dump())
-        res = normalize_course(args.course_name)
+        res = normalize_course(args.course_name, data)
         if isinstance(res, dict):
             return res
         course_name = res
@@ -627,131 +663,74 @@ def get_tools(user_prereqs: UserFulfilled, term: TERMS):
             A list of valid schedules (each is a list of section selections) and any errors encountered.
         """
 
-        print("DEBUG:", args.model_dump())
         errors = []
         valid_courses = []
 
         for course_name in args.courses:
-            normalized = normalize_course(course_name)
+            normalized = normalize_course(course_name, data)
             if isinstance(normalized, dict):
                 errors.append(normalized)
             else:
                 valid_courses.append(normalized)
 
-        if not valid_courses:
-            return {
-                "errors": errors,
-                "schedules": [],
-                "message": "No valid courses provided.",
-            }
+        return build_schedules(valid_courses, args.max_days, term, data, errors)
 
-        course_sections_list = []
-        for course_name in valid_courses:
-            course_info = course_data[course_name]
-            if not course_info:
-                errors.append(
-                    {"error_message": f"Course data not found for {course_name}"}
-                )
-                continue
-
-            term_sections = course_info.sections.get(term)
-            if not term_sections:
-                errors.append(
-                    {
-                        "error_message": f"No sections available for {course_name} in term {term}"
-                    }
-                )
-                continue
-
-            sections_for_course = []
-            for section_id, section_data in term_sections.items():
-                days = section_data[2]
-                times = section_data[3]
-
-                section_info = {
-                    "course": course_name,
-                    "section_id": section_id,
-                    "days": days,
-                    "crn": section_data[1],
-                    "times": times,
-                    "location": section_data[4],
-                    "instructor": section_data[8],
-                }
-
-                # Parse and store time mappings
-                section_info["parsed_times"] = parse_section_times(times, days)
-                sections_for_course.append(section_info)
-
-            if sections_for_course:
-                course_sections_list.append(sections_for_course)
-            else:
-                errors.append(
-                    {"error_message": f"No sections with day info for {course_name}"}
-                )
+    def plan_degree(args: PlanDegreeFormat) -> Dict[str, Any]:
+        """
+        Plans which terms the user should take courses in to complete the target courses,
+        including every missing prerequisite, in one call.
 
-        if not course_sections_list:
-            return {
-                "errors": errors,
-                "schedules": [],
-                "message": "No sections available for any valid course.",
+        Args:
+            {
+            "targets": "Courses the user wants to have completed by the end of the plan.",
+            "start_term": "First term of the plan as a term code. Defaults to the current term.",
+            "max_terms": "Maximum number of terms to plan.",
+            "max_credits": "Maximum credits per term.",
+            "include_summer": "Whether summer terms can be used.",
+            "include_winter": "Whether winter terms can be used."
             }
 
-        all_combinations = list(itertools.product(*course_sections_list))
-
-        valid_schedules = []
-        for combo in all_combinations:
-            unique_days = set()
-            for section in combo:
-                for day_char in section["days"]:
-                    unique_days.add(day_char)
-
-            # Check day constraint
-            if len(unique_days) > args.max_days:
-                continue
-
-            # Check for time conflicts
-            has_conflict = False
-            for i in range(len(combo)):
-                for j in range(i + 1, len(combo)):
-                    if has_time_conflict(
-                        combo[i]["parsed_times"], combo[j]["parsed_times"]
-                    ):
-                        has_conflict = True
-                        break
-                if has_conflict:
-                    break
-
-            if not has_conflict:
-                # Remove parsed_times from output (internal use only)
-                clean_sections = []
-                for section in combo:
-                    clean_section = {
-                        k: v for k, v in section.items() if k != "parsed_times"
-                    }
-                    clean_sections.append(clean_section)
-
-                valid_schedules.append(
-                    {
-                        "sections": clean_sections,
-                        "days_used": sorted(list(unique_days)),
-                        "num_days": len(unique_days),
-                    }
-                )
-
-        return {
-            "errors": errors if errors else None,
-            "schedules": valid_schedules,
-            "total_valid_schedules": len(valid_schedules),
-            "message": f"Found {len(valid_schedules)} schedule(s) fitting within {args.max_days} day(s) with no time conflicts.",
-        }
-
-    return [
-        course_query,
-        update_user_profile,
-        get_course_description,
-        can_take_course,
-        make_schedule,
+        Returns:
+            A term-by-term plan, courses that could not be planned and why, and
+            non-course requirements (placements, permissions, standing) to check.
+        """
+        errors = []
+        targets = []
+        for course_name in args.targets:
+            normalized = normalize_course(course_name, data)
+            if isinstance(normalized, dict):
+                errors.append(normalized)
+            else:
+                targets.append(normalized)
+
+        plan = plan_courses(
+            user_prereqs,
+            targets,
+            args.start_term or term,
+            max_terms=args.max_terms,
+            max_credits=args.max_credits,
+            include_summer=args.include_summer,
+            include_winter=args.include_winter,
+            data=data,
+        )
+        plan["errors"] = errors if errors else None
+        return plan
+
+    tools = [
+        shape_tool(tool, data, term)
+        for tool in (
+            course_query,
+            update_user_profile,
+            get_course_description,
+            get_course_details,
+            can_take_course,
+            make_schedule,
+            plan_degree,
+        )
     ]
+    if not traced:
+        return tools
+    return [tool_trace.wrap(tool, user_prereqs, term, data.version) for tool in tools]
 
 
 def dump_history(history):
@@ -807,14 +786,48 @@ def load_prereqs(prereqs_str: str) -> UserFulfilled:
         return UserFulfilled(courses={})
 
 
+def gemini_client() -> genai.Client:
+    """Points at GEMINI_BASE_URL (e.g. the load test's mock server) when it is set."""
+    if GEMINI_BASE_URL:
+        return genai.Client(http_options=types.HttpOptions(base_url=GEMINI_BASE_URL))
+    return genai.Client()
+
+
 def gemini_call(input_text: str, session_id: str, term: TERMS):
-    client = genai.Client()
+    client = gemini_client()
 
-    history_raw = REDIS.get(f"{session_id}:history")
-    prereqs_raw = REDIS.get(f"{session_id}:prereqs")
+    with stage("redis_load"):
+        session = session_store.load(session_id)
+    history_raw = session["history"]
+    prereqs_raw = session["prereqs"]
     history = load_history(history_raw)
     parsed_userprereqs = load_prereqs(prereqs_raw)
-    tools = get_tools(parsed_userprereqs, term)
+    profile_before = parsed_userprereqs.model_dump(mode="json")
+    data = registry.current()
+
+    cache_key = response_cache.key(data.version, term, parsed_userprereqs)
+    with stage("semantic_cache"):
+        cached, query_vector = response_cache.lookup(
+            cache_key, input_text, bool(history)
+        )
+    if cached is not None:
+        turn = [
+            types.Content(role="user", parts=[types.Part(text=input_text)]),
+            types.Content(role="model", parts=[types.Part(text=cached)]),
+        ]
+        with stage("redis_save"):
+            session_store.save(
+                session_id,
+                session,
+                json.loads(dump_history(turn)),
+                profile_before,
+                profile_before,
+            )
+        return cached
+
+    tools = [
+        timed(tool.__name__)(tool) for tool in get_tools(parsed_userprereqs, term, data)
+    ]
 
     # move to constants as global var
     with open(CHATBOT_PROMPT_FILE, "r", encoding="utf-8") as f:
@@ -823,7 +836,7 @@ def gemini_call(input_text: str, session_id: str, term: TERMS):
     sys_instruction = f"User's current profile: {prereqs_raw}." + prompt
 
     chat = client.chats.create(
-        model="gemini-2.5-flash",
+        model=GEMINI_MODEL,
         config=types.GenerateContentConfig(
             system_instruction=sys_instruction,
             tools=tools,
@@ -834,8 +847,21 @@ def gemini_call(input_text: str, session_id: str, term: TERMS):
         history=history,
     )
 
-    response = chat.send_message(input_text)
-
-    REDIS.set(f"{session_id}:history", dump_history(chat._curated_history))
-    REDIS.set(f"{session_id}:prereqs", dump_prereqs(parsed_userprereqs))
+    # the whole turn: every model round trip plus the tools it called
+    with stage("chat_turn"):
+        response = chat.send_message(input_text)
+    # the last model call's prompt holds the history and every tool result of the turn
+    if response.usage_metadata:
+        shaping_stats.record_turn(response.usage_metadata.prompt_token_count)
+
+    profile_after = parsed_userprereqs.model_dump(mode="json")
+    # only this turn's messages, they go after whatever the session has by now
+    new_messages = json.loads(dump_history(chat._curated_history[len(history) :]))
+    with stage("redis_save"):
+        session_store.save(
+            session_id, session, new_messages, profile_before, profile_after
+        )
+    # answers that changed the profile were about this user, not the question
+    if query_vector is not None and response.text and profile_after == profile_before:
+        response_cache.store(cache_key, input_text, query_vector, response.text)
     return response.text
@@ -0,0 +1,208 @@
+import hashlib
+from collections import deque
+from typing import Any, Dict, Iterator, List, Literal, Optional, Set, Tuple
+from backend.constants import CourseInfoModel
+
+Direction = Literal["ancestors", "descendants"]
+
+
+def tree_course_refs(node: Any) -> Iterator[str]:
+    """Course ids referenced by COURSE and EQUIVALENT nodes of a prereq/coreq tree."""
+    stack = [node] if node is not None else []
+    while stack:
+        node = stack.pop()
+        node_type = getattr(node, "type", None)
+        if node_type in ("AND", "OR"):
+            stack.extend(node.children)
+        elif node_type == "COURSE":
+            yield node.course
+        elif node_type == "EQUIVALENT":
+            yield from node.courses
+
+
+def _bits(mask: int) -> Iterator[int]:
+    while mask:
+        low = mask & -mask
+        yield low.bit_length() - 1
+        mask ^= low
+
+
+class PrereqGraph:
+    """
+    Course dependency graph over the COURSE/EQUIVALENT nodes of every prereq_tree and
+    coreq_tree. An edge u -> v means u is needed for v. Transitive closures are
+    precomputed once as Python int bitsets indexed by course position, so "everything
+    CS 490 depends on" is a single lookup.
+    Courses only referenced by other courses' trees are nodes too, without info.
+    """
+
+    def __init__(self, courses: Dict[str, CourseInfoModel]):
+        self.courses = courses
+        edges: Dict[Tuple[str, str], str] = {}
+        ids: Dict[str, None] = dict.fromkeys(courses)
+        for course_id, info in courses.items():
+            for kind, tree in (
+                ("coreq", info.coreq_tree),
+                ("prereq", info.prereq_tree),
+            ):
+                for ref in tree_course_refs(tree):
+                    if ref != course_id:
+                        ids.setdefault(ref, None)
+                        edges[(ref, course_id)] = kind
+
+        self.ids: List[str] = list(ids)
+        self.pos: Dict[str, int] = {cid: i for i, cid in enumerate(self.ids)}
+        self._compact: Dict[str, str] = {cid.replace(" ", ""): cid for cid in self.ids}
+        self.edge_kinds = edges
+        self.parents: List[List[int]] = [[] for _ in self.ids]
+        self.children: List[List[int]] = [[] for _ in self.ids]
+        for src, dst in edges:
+            self.parents[self.pos[dst]].append(self.pos[src])
+            self.children[self.pos[src]].append(self.pos[dst])
+
+        self.ancestors = self._closure(self.parents)
+        self.descendants = self._closure(self.children)
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def _closure(self, adjacency: List[List[int]]) -> List[int]:
+        """
+        Reachability bitsets (excluding the node itself unless it's on a cycle).
+        Strongly connected components are found with an iterative Tarjan, which emits
+        them sinks first, so each component's closure is built from finished ones.
+        """
+        n = len(adjacency)
+        index = [-1] * n
+        low = [0] * n
+        on_stack = [False] * n
+        stack: List[int] = []
+        reach = [0] * n
+        counter = 0
+
+        for root in range(n):
+            if index[root] != -1:
+                continue
+            work = [(root, 0)]
+            while work:
+                node, child_i = work.pop()
+                if child_i == 0:
+                    index[node] = low[node] = counter
+                    counter += 1
+                    stack.append(node)
+                    on_stack[node] = True
+                recurse = False
+                children = adjacency[node]
+                while child_i < len(children):
+                    child = children[child_i]
+                    child_i += 1
+                    if index[child] == -1:
+                        work.append((node, child_i))
+                        work.append((child, 0))
+                        recurse = True
+                        break
+                    if on_stack[child]:
+                        low[node] = min(low[node], index[child])
+                if recurse:
+                    continue
+                if work and low[node] < low[work[-1][0]]:
+                    low[work[-1][0]] = low[node]
+                if low[node] == index[node]:
+                    members = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        members.append(member)
+                        if member == node:
+                            break
+                    mask = 0
+                    for member in members:
+                        for child in adjacency[member]:
+                            mask |= reach[child] | (1 << child)
+                    for member in members:
+                        reach[member] = mask
+        return reach
+
+    def resolve(self, course_id: str) -> Optional[str]:
+        """Exact id, or the id matching ignoring case and spaces ("cs280" -> "CS 280")."""
+        course_id = course_id.strip().upper()
+        if course_id in self.pos:
+            return course_id
+        return self._compact.get(course_id.replace(" ", ""))
+
+    def closure(self, course_id: str, direction: Direction) -> Set[str]:
+        table = self.ancestors if direction == "ancestors" else self.descendants
+        return {self.ids[i] for i in _bits(table[self.pos[course_id]])}
+
+    def subgraph(
+        self, course_id: str, direction: Direction, depth: Optional[int] = None
+    ) -> Dict[str, Any]:
+        """
+        The course plus everything within `depth` edges in one direction (all of the
+        closure when depth is None), with the edges between those courses and each
+        course's trees, title and credits. Sections are left out.
+        """
+        start = self.pos[course_id]
+        if depth is None:
+            table = self.ancestors if direction == "ancestors" else self.descendants
+            members = set(_bits(table[start])) | {start}
+        else:
+            adjacency = self.parents if direction == "ancestors" else self.children
+            members = {start}
+            frontier = deque([(start, 0)])
+            while frontier:
+                node, dist = frontier.popleft()
+                if dist == depth:
+                    continue
+                for nxt in adjacency[node]:
+                    if nxt not in members:
+                        members.add(nxt)
+                        frontier.append((nxt, dist + 1))
+
+        nodes = {}
+        for i in sorted(members):
+            cid = self.ids[i]
+            info = self.courses.get(cid)
+            nodes[cid] = (
+                {
+                    "title": info.title,
+                    "credits": info.credits,
+                    "prereq_tree": (
+                        info.prereq_tree.model_dump(exclude_none=True)
+                        if info.prereq_tree
+                        else None
+                    ),
+                    "coreq_tree": (
+                        info.coreq_tree.model_dump(exclude_none=True)
+                        if info.coreq_tree
+                        else None
+                    ),
+                }
+                if info
+                else None
+            )
+        edges = [
+            {
+                "from": self.ids[i],
+                "to": self.ids[j],
+                "kind": self.edge_kinds[(self.ids[i], self.ids[j])],
+            }
+            for j in sorted(members)
+            for i in self.parents[j]
+            if i in members
+        ]
+        return {
+            "course": course_id,
+            "direction": direction,
+            "depth": depth,
+            "courses": nodes,
+            "edges": edges,
+        }
+
+
+def graph_etag(
+    version: str, course_id: str, direction: str, depth: Optional[int]
+) -> str:
+    """Changes whenever graph.json does, so clients can revalidate cheaply."""
+    key = f"{version}|{course_id}|{direction}|{depth}"
+    return '"' + hashlib.sha1(key.encode("utf-8")).hexdigest()[:20] + '"'
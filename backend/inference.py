@@ -0,0 +1,278 @@
+import argparse
+import hashlib
+import re
+import statistics
+import time
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from chromadb import Documents, EmbeddingFunction, Embeddings
+from chromadb.utils import embedding_functions
+from sentence_transformers import CrossEncoder, SentenceTransformer
+from backend.constants import (
+    CROSS_ENCODER_MODEL,
+    EMBEDDING_MODEL,
+    HASH_DIMENSIONS,
+    INFERENCE_BACKEND,
+    INFERENCE_THREADS,
+    OFFLINE_BACKEND,
+)
+
+BACKENDS = ("torch", "torch-int8", "onnx")
+
+
+def inference_device(backend: str = INFERENCE_BACKEND) -> str:
+    """The quantised, ONNX and hash backends are CPU only, torch uses the GPU when there is one."""
+    if backend != "torch":
+        return "cpu"
+    from torch.cuda import is_available
+
+    return "cuda" if is_available() else "cpu"
+
+
+def configure_threads(threads: int = INFERENCE_THREADS) -> None:
+    """
+    Sizes torch's intra-op pool for this process. With several workers per host,
+    set INFERENCE_THREADS to cores / workers so their forward passes don't oversubscribe.
+    """
+    if threads <= 0 or INFERENCE_BACKEND == OFFLINE_BACKEND:
+        return
+    import torch
+
+    torch.set_num_threads(threads)
+    try:
+        torch.set_num_interop_threads(1)
+    except RuntimeError:
+        # can only be set before the first parallel op, keep whatever is there
+        pass
+
+
+def _onnx_model_kwargs(threads: int) -> Dict[str, Any]:
+    import onnxruntime
+
+    options = onnxruntime.SessionOptions()
+    if threads > 0:
+        options.intra_op_num_threads = threads
+        options.inter_op_num_threads = 1
+    options.graph_optimization_level = onnxruntime.GraphOptimizationLevel.ORT_ENABLE_ALL
+    return {"provider": "CPUExecutionProvider", "session_options": options}
+
+
+def _quantize_dynamic(module):
+    """int8 weights for every Linear layer, activations quantised on the fly."""
+    import torch
+
+    return torch.quantization.quantize_dynamic(
+        module, {torch.nn.Linear}, dtype=torch.qint8
+    )
+
+
+def load_sentence_transformer(
+    model_name: str = EMBEDDING_MODEL,
+    backend: str = INFERENCE_BACKEND,
+    threads: int = INFERENCE_THREADS,
+) -> SentenceTransformer:
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected {BACKENDS}")
+    device = inference_device(backend)
+    if backend == "onnx":
+        return SentenceTransformer(
+            model_name,
+            device=device,
+            backend="onnx",
+            model_kwargs=_onnx_model_kwargs(threads),
+        )
+    model = SentenceTransformer(model_name, device=device)
+    if backend == "torch-int8":
+        model = _quantize_dynamic(model)
+    return model
+
+
+def load_cross_encoder(
+    model_name: str = CROSS_ENCODER_MODEL,
+    backend: str = INFERENCE_BACKEND,
+    threads: int = INFERENCE_THREADS,
+) -> CrossEncoder:
+    """Same .predict(pairs) API whatever the backend."""
+    if backend == OFFLINE_BACKEND:
+        return HashCrossEncoder()
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown inference backend {backend!r}, expected {BACKENDS}")
+    device = inference_device(backend)
+    if backend == "onnx":
+        return CrossEncoder(
+            model_name,
+            device=device,
+            backend="onnx",
+            model_kwargs=_onnx_model_kwargs(threads),
+        )
+    cross_encoder = CrossEncoder(model_name, device=device)
+    if backend == "torch-int8":
+        cross_encoder.model = _quantize_dynamic(cross_encoder.model)
+    return cross_encoder
+
+
+def _tokens(text: str) -> List[str]:
+    return re.findall(r"[a-z0-9]+", text.lower())
+
+
+def _token_slot(token: str, dimensions: int) -> Tuple[int, float]:
+    digest = hashlib.blake2b(token.encode("utf-8"), digest_size=8).digest()
+    value = int.from_bytes(digest, "little")
+    return value % dimensions, 1.0 if value >> 63 else -1.0
+
+
+class HashEmbeddingFunction(EmbeddingFunction[Documents]):
+    """
+    Signed feature hashing of word tokens, L2 normalised. Deterministic and needs no
+    model download, so only useful where the timing, not the ranking, matters.
+    """
+
+    def __init__(self, dimensions: int = HASH_DIMENSIONS):
+        self.dimensions = dimensions
+
+    def __call__(self, input: Documents) -> Embeddings:
+        vectors = np.zeros((len(input), self.dimensions), dtype=np.float32)
+        for row, text in enumerate(input):
+            for token in _tokens(text):
+                slot, sign = _token_slot(token, self.dimensions)
+                vectors[row, slot] += sign
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors /= np.where(norms == 0, 1, norms)
+        return vectors.tolist()
+
+
+class HashCrossEncoder:
+    """CrossEncoder stand-in for the hash backend: share of query tokens in the doc."""
+
+    def predict(self, pairs: Sequence[Sequence[str]], **kwargs) -> np.ndarray:
+        scores = np.empty(len(pairs), dtype=np.float32)
+        for i, (query, doc) in enumerate(pairs):
+            query_tokens = set(_tokens(query))
+            doc_tokens = set(_tokens(doc))
+            scores[i] = len(query_tokens & doc_tokens) / max(len(query_tokens), 1)
+        return scores
+
+
+class CourseEmbeddingFunction(EmbeddingFunction[Documents]):
+    """Chroma embedding function backed by an already loaded SentenceTransformer."""
+
+    def __init__(self, model: SentenceTransformer):
+        self.model = model
+
+    def __call__(self, input: Documents) -> Embeddings:
+        return self.model.encode(list(input), convert_to_numpy=True).tolist()
+
+
+def load_embedding_function(
+    model_name: str = EMBEDDING_MODEL,
+    backend: str = INFERENCE_BACKEND,
+    threads: int = INFERENCE_THREADS,
+):
+    if backend == OFFLINE_BACKEND:
+        return HashEmbeddingFunction()
+    if backend == "torch":
+        # keeps the embedding function stored with existing collections unchanged
+        return embedding_functions.SentenceTransformerEmbeddingFunction(
+            model_name=model_name, device=inference_device(backend)
+        )
+    return CourseEmbeddingFunction(
+        load_sentence_transformer(model_name, backend, threads)
+    )
+
+
+def bench_pairs(n_pairs: int) -> List[Tuple[str, str]]:
+    """Real course descriptions when graph.json is loaded, placeholder text otherwise."""
+    from backend.constants import course_data
+
+    docs = [
+        f"{cid}: {info.title} {info.desc}"
+        for cid, info in course_data.items()
+        if info.desc
+    ][:n_pairs]
+    if not docs:
+        docs = [
+            f"COURSE {i}: Topics in computing, part {i}. Lectures and projects."
+            for i in range(n_pairs)
+        ]
+    queries = [
+        "intro to machine learning",
+        "data structures and algorithms",
+        "organic chemistry lab",
+        "technical writing for engineers",
+    ]
+    return [(queries[i % len(queries)], docs[i % len(docs)]) for i in range(n_pairs)]
+
+
+def _rank(scores: np.ndarray) -> np.ndarray:
+    ranks = np.empty(len(scores))
+    ranks[np.argsort(scores)] = np.arange(len(scores))
+    return ranks
+
+
+def bench(
+    backends: Sequence[str] = BACKENDS,
+    n_pairs: int = 500,
+    repeat: int = 20,
+    threads: int = INFERENCE_THREADS,
+    top_k: int = 20,
+) -> Dict[str, Dict[str, float]]:
+    """
+    p50/p99 latency of one n_pairs rerank per backend, and how far each backend's scores
+    drift from torch fp32: max absolute difference, Spearman correlation and top-k overlap.
+    """
+    configure_threads(threads)
+    pairs = bench_pairs(n_pairs)
+    reference: Optional[np.ndarray] = None
+    results = {}
+    for backend in ("torch",) + tuple(b for b in backends if b != "torch"):
+        try:
+            model = load_cross_encoder(backend=backend, threads=threads)
+        except Exception as e:
+            print(f"Skipping {backend}: {e}")
+            continue
+        scores = np.asarray(model.predict(pairs), dtype=np.float32)  # warm up
+        times = []
+        for _ in range(repeat):
+            t0 = time.perf_counter()
+            model.predict(pairs)
+            times.append(time.perf_counter() - t0)
+        times.sort()
+        row = {
+            "p50_ms": 1000 * statistics.median(times),
+            "p99_ms": 1000 * times[min(len(times) - 1, int(0.99 * len(times)))],
+        }
+        if reference is None:
+            reference = scores
+        row["max_abs_diff"] = float(np.abs(scores - reference).max())
+        row["spearman"] = float(np.corrcoef(_rank(scores), _rank(reference))[0, 1])
+        k = min(top_k, len(scores))
+        row[f"top{top_k}_overlap"] = (
+            len(set(np.argsort(-scores)[:k]) & set(np.argsort(-reference)[:k])) / k
+        )
+        results[backend] = row
+
+    print(f"{len(pairs)} pairs, {repeat} runs, threads={threads or 'default'}")
+    print(
+        f"{'backend':<12}{'p50 ms':>10}{'p99 ms':>10}{'max |d|':>10}"
+        f"{'spearman':>10}{f'top{top_k}':>8}"
+    )
+    for backend, row in results.items():
+        print(
+            f"{backend:<12}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+            f"{row['max_abs_diff']:>10.4f}{row['spearman']:>10.4f}"
+            f"{row[f'top{top_k}_overlap']:>8.2f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Rerank latency and score drift of each inference backend against torch fp32."
+    )
+    parser.add_argument("--backends", nargs="+", default=list(BACKENDS))
+    parser.add_argument("--pairs", type=int, default=500)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--threads", type=int, default=INFERENCE_THREADS)
+    args = parser.parse_args()
+
+    bench(args.backends, args.pairs, args.repeat, args.threads)
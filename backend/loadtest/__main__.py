@@ -0,0 +1,90 @@
+import argparse
+import asyncio
+import json
+import os
+import threading
+import time
+
+parser = argparse.ArgumentParser(
+    description=(
+        "Drive multi-turn /chat sessions and report throughput, latency percentiles "
+        "and the per-stage breakdown from the Server-Timing header."
+    )
+)
+parser.add_argument(
+    "--url", type=str, help="running server; without it the app runs in-process"
+)
+parser.add_argument("--users", type=int, default=20, help="concurrent sessions")
+parser.add_argument("--sessions", type=int, default=1, help="sessions per user")
+parser.add_argument("--term", type=str, default="202610")
+parser.add_argument("--think-ms", type=float, default=0)
+parser.add_argument("--seed", type=int, default=0)
+parser.add_argument(
+    "--mock-port",
+    type=int,
+    default=0,
+    help="start the mock Gemini server on this port (in-process runs use it)",
+)
+parser.add_argument("--mock-latency-ms", type=float, default=800)
+parser.add_argument("--mock-jitter-ms", type=float, default=200)
+parser.add_argument("--scenarios", type=str, help="mock scenarios JSON file")
+parser.add_argument(
+    "--fakeredis", action="store_true", help="in-process runs only, needs fakeredis"
+)
+parser.add_argument("--json", type=str, help="also write the summary here")
+args = parser.parse_args()
+
+if args.mock_port:
+    import uvicorn
+    from backend.loadtest.mock_gemini import MockGemini, create_app, load_scenarios
+
+    mock = MockGemini(
+        load_scenarios(args.scenarios), args.mock_latency_ms, args.mock_jitter_ms
+    )
+    mock_server = uvicorn.Server(
+        uvicorn.Config(create_app(mock), port=args.mock_port, log_level="warning")
+    )
+    threading.Thread(target=mock_server.run, daemon=True).start()
+    while not mock_server.started:
+        time.sleep(0.05)
+    # read by backend.constants, so before the app is imported
+    os.environ["GEMINI_BASE_URL"] = f"http://127.0.0.1:{args.mock_port}"
+    os.environ.setdefault("GEMINI_API_KEY", "mock")
+
+import httpx
+from backend.loadtest.driver import report, run_load
+
+if args.url:
+    client = httpx.AsyncClient(base_url=args.url, timeout=300)
+else:
+    from backend import constants
+    from backend.server import app
+
+    if args.fakeredis:
+        import fakeredis
+
+        constants._redis_clients[os.getpid()] = fakeredis.FakeRedis(
+            decode_responses=True
+        )
+    client = httpx.AsyncClient(
+        transport=httpx.ASGITransport(app=app), base_url="http://app", timeout=300
+    )
+
+
+async def main():
+    async with client:
+        return await run_load(
+            client,
+            args.users,
+            args.sessions,
+            term=args.term,
+            think_ms=args.think_ms,
+            seed=args.seed,
+        )
+
+
+summary = asyncio.run(main())
+report(summary)
+if args.json:
+    with open(args.json, "w", encoding="utf-8") as f:
+        json.dump(summary, f, indent=2)
@@ -0,0 +1,176 @@
+import asyncio
+import random
+import statistics
+import time
+import uuid
+from typing import Any, Dict, List, Optional, Sequence
+import httpx
+
+# multi-turn sessions the virtual users pick from, each turn waits for the previous one
+CONVERSATIONS: List[List[str]] = [
+    [
+        "What intro machine learning courses are there?",
+        "I took CS 100 and passed with a B",
+        "Can I take CS 280 next semester?",
+        "Make me a schedule with CS 280 and MATH 112",
+    ],
+    [
+        "Any easy humanities gen-eds this spring?",
+        "Tell me about HUM 211",
+        "What should I take to graduate with CS 490 done?",
+    ],
+    [
+        "I'm looking for a databases course",
+        "What are the prereqs for CS 431?",
+        "Plan my path to CS 490 in four semesters",
+    ],
+    [
+        "Which courses cover probability and statistics?",
+        "I completed MATH 111 and MATH 112",
+        "Build a schedule with MATH 333 and CS 241 on two days",
+    ],
+]
+
+# Server-Timing stages of /chat that are not tool calls
+NON_TOOL_STAGES = (
+    "admission",
+    "chat_turn",
+    "redis_load",
+    "redis_save",
+    "semantic_cache",
+)
+
+
+def parse_server_timing(header: Optional[str]) -> Dict[str, float]:
+    """`a;dur=1.5, b;dur=2` -> {"a": 1.5, "b": 2.0}"""
+    stages: Dict[str, float] = {}
+    for metric in (header or "").split(","):
+        name, _, params = metric.strip().partition(";")
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if name and key == "dur":
+                stages[name] = float(value)
+    return stages
+
+
+def percentile(values: Sequence[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_session(
+    client: httpx.AsyncClient,
+    turns: List[str],
+    term: str,
+    think_ms: float,
+    rng: random.Random,
+    results: List[Dict[str, Any]],
+) -> None:
+    session_id = f"loadtest-{uuid.uuid4().hex[:12]}"
+    for turn, query in enumerate(turns):
+        t0 = time.perf_counter()
+        try:
+            response = await client.post(
+                "/chat", json={"sessionID": session_id, "query": query, "term": term}
+            )
+            status = response.status_code
+            stages = parse_server_timing(response.headers.get("server-timing"))
+        except httpx.HTTPError as e:
+            status, stages = type(e).__name__, {}
+        results.append(
+            {
+                "turn": turn,
+                "status": status,
+                "latency_ms": 1000 * (time.perf_counter() - t0),
+                "stages": stages,
+            }
+        )
+        if think_ms:
+            await asyncio.sleep(rng.uniform(0.5, 1.5) * think_ms / 1000)
+
+
+async def run_load(
+    client: httpx.AsyncClient,
+    users: int,
+    sessions_per_user: int = 1,
+    term: str = "202610",
+    think_ms: float = 0,
+    conversations: Sequence[List[str]] = CONVERSATIONS,
+    seed: int = 0,
+) -> Dict[str, Any]:
+    """`users` concurrent virtual users, each running sessions_per_user conversations."""
+    rng = random.Random(seed)
+    results: List[Dict[str, Any]] = []
+
+    async def user() -> None:
+        for _ in range(sessions_per_user):
+            turns = rng.choice(conversations)
+            await run_session(client, turns, term, think_ms, rng, results)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(user() for _ in range(users)))
+    return summarize(results, time.perf_counter() - started, users)
+
+
+def summarize(
+    results: List[Dict[str, Any]], elapsed: float, users: int
+) -> Dict[str, Any]:
+    ok = [r for r in results if r["status"] == 200]
+    latencies = [r["latency_ms"] for r in ok]
+    stage_names = sorted({name for r in ok for name in r["stages"]})
+    stages = {}
+    for name in stage_names:
+        values = [r["stages"].get(name, 0.0) for r in ok]
+        stages[name] = {
+            "mean_ms": statistics.fmean(values),
+            "p95_ms": percentile(values, 0.95),
+        }
+    # time in chat_turn not spent in our tools is the model's (and the network's)
+    tool_stages = [n for n in stage_names if n not in NON_TOOL_STAGES]
+    if "chat_turn" in stage_names:
+        values = [
+            r["stages"].get("chat_turn", 0.0)
+            - sum(r["stages"].get(n, 0.0) for n in tool_stages)
+            for r in ok
+        ]
+        stages["llm"] = {
+            "mean_ms": statistics.fmean(values),
+            "p95_ms": percentile(values, 0.95),
+        }
+    errors: Dict[str, int] = {}
+    for r in results:
+        if r["status"] != 200:
+            errors[str(r["status"])] = errors.get(str(r["status"]), 0) + 1
+    return {
+        "users": users,
+        "requests": len(results),
+        "errors": errors,
+        "elapsed_s": elapsed,
+        "throughput_rps": len(ok) / elapsed if elapsed else 0.0,
+        "latency_ms": {
+            "p50": percentile(latencies, 0.5),
+            "p90": percentile(latencies, 0.9),
+            "p99": percentile(latencies, 0.99),
+            "max": max(latencies, default=0.0),
+        },
+        "stages": stages,
+    }
+
+
+def report(summary: Dict[str, Any]) -> None:
+    latency = summary["latency_ms"]
+    print(
+        f"{summary['users']} users, {summary['requests']} requests "
+        f"in {summary['elapsed_s']:.1f}s: {summary['throughput_rps']:.2f} req/s"
+    )
+    if summary["errors"]:
+        print(f"errors: {summary['errors']}")
+    print(
+        f"latency ms  p50 {latency['p50']:.0f}  p90 {latency['p90']:.0f}  "
+        f"p99 {latency['p99']:.0f}  max {latency['max']:.0f}"
+    )
+    print(f"\n{'stage':<24}{'mean ms':>10}{'p95 ms':>10}")
+    for name, row in summary["stages"].items():
+        print(f"{name:<24}{row['mean_ms']:>10.1f}{row['p95_ms']:>10.1f}")
@@ -0,0 +1,264 @@
+import argparse
+import asyncio
+import json
+import random
+import re
+from typing import Any, Dict, List, Optional
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import uvicorn
+
+# What the mock "model" does for a user message: the first scenario whose pattern
+# matches picks the tool calls to make, one per round trip, then the text reply.
+# "{message}" in string arguments is replaced by the user's message.
+DEFAULT_SCENARIOS: List[Dict[str, Any]] = [
+    {
+        "match": r"\b(?:took|passed|completed|finished)\b",
+        "calls": [
+            {
+                "name": "update_user_profile",
+                "args": {"args": {"courses": [{"name": "CS 100", "grade": "B"}]}},
+            }
+        ],
+        "reply": "Got it, I've added that to your profile.",
+    },
+    {
+        "match": r"\bschedule\b",
+        "calls": [
+            {
+                "name": "make_schedule",
+                "args": {"args": {"courses": ["CS 280", "MATH 112"], "max_days": 4}},
+            }
+        ],
+        "reply": "Here are schedules that fit in four days.",
+    },
+    {
+        "match": r"\b(?:plan|graduate|path)\b",
+        "calls": [{"name": "plan_degree", "args": {"args": {"targets": ["CS 490"]}}}],
+        "reply": "Here is a term-by-term plan.",
+    },
+    {
+        "match": r"\b(?:can i take|prereq)",
+        "calls": [
+            {"name": "can_take_course", "args": {"args": {"course_name": "CS 280"}}}
+        ],
+        "reply": "Here is whether you can take it.",
+    },
+    {
+        "match": r"\b(?:about|describe|what is)\b",
+        "calls": [
+            {
+                "name": "get_course_description",
+                "args": {"args": {"course_name": "CS 280"}},
+            }
+        ],
+        "reply": "Here is the course description.",
+    },
+    {
+        "match": r".",
+        "calls": [
+            {
+                "name": "course_query",
+                "args": {
+                    "args": {
+                        "query": "{message}",
+                        "top_n": 10,
+                        "only_prereqs_fulfilled": True,
+                        "only_current_semester": True,
+                    }
+                },
+            }
+        ],
+        "reply": "These courses match what you're looking for.",
+    },
+]
+
+
+def _fill(value: Any, message: str) -> Any:
+    if isinstance(value, str):
+        return value.replace("{message}", message)
+    if isinstance(value, list):
+        return [_fill(v, message) for v in value]
+    if isinstance(value, dict):
+        return {k: _fill(v, message) for k, v in value.items()}
+    return value
+
+
+def _conversation_state(contents: List[Dict[str, Any]]) -> tuple:
+    """(last user text, tool call rounds the model made since it)."""
+    rounds = 0
+    for content in reversed(contents):
+        parts = content.get("parts", [])
+        if content.get("role") == "model" and any("functionCall" in p for p in parts):
+            rounds += 1
+        elif content.get("role") == "user":
+            texts = [p["text"] for p in parts if "text" in p]
+            if texts:
+                return " ".join(texts), rounds
+    return "", rounds
+
+
+def _tokens(text: str) -> int:
+    return max(1, len(text) // 4)
+
+
+class MockGemini:
+    """
+    Answers generateContent / streamGenerateContent like the Gemini API: scripted
+    function calls first (the SDK's automatic function calling runs the real tools and
+    sends their results back), then a text reply. Each round trip waits latency_ms
+    plus or minus jitter_ms.
+    """
+
+    def __init__(
+        self,
+        scenarios: Optional[List[Dict[str, Any]]] = None,
+        latency_ms: float = 800,
+        jitter_ms: float = 200,
+        stream_chunks: int = 4,
+        seed: Optional[int] = None,
+    ):
+        self.scenarios = [
+            {**s, "pattern": re.compile(s["match"], re.IGNORECASE)}
+            for s in (scenarios or DEFAULT_SCENARIOS)
+        ]
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.stream_chunks = stream_chunks
+        self.rng = random.Random(seed)
+        self.stats = {"requests": 0, "function_calls": 0, "replies": 0}
+
+    def respond(self, body: Dict[str, Any], model: str) -> Dict[str, Any]:
+        contents = body.get("contents", [])
+        message, rounds = _conversation_state(contents)
+        declared = {
+            f["name"]
+            for tool in body.get("tools", [])
+            for f in tool.get("functionDeclarations", [])
+        }
+        scenario = next(
+            (s for s in self.scenarios if s["pattern"].search(message)), None
+        )
+        calls = [
+            c for c in (scenario["calls"] if scenario else []) if c["name"] in declared
+        ]
+        if rounds < len(calls):
+            call = calls[rounds]
+            part = {
+                "functionCall": {
+                    "name": call["name"],
+                    "args": _fill(call.get("args", {}), message),
+                }
+            }
+            self.stats["function_calls"] += 1
+        else:
+            reply = scenario["reply"] if scenario else "OK."
+            part = {"text": reply}
+            self.stats["replies"] += 1
+
+        prompt_tokens = _tokens(json.dumps(contents))
+        output_tokens = _tokens(json.dumps(part))
+        return {
+            "candidates": [
+                {
+                    "content": {"role": "model", "parts": [part]},
+                    "finishReason": "STOP",
+                    "index": 0,
+                }
+            ],
+            "usageMetadata": {
+                "promptTokenCount": prompt_tokens,
+                "candidatesTokenCount": output_tokens,
+                "totalTokenCount": prompt_tokens + output_tokens,
+            },
+            "modelVersion": model,
+        }
+
+    def delay(self) -> float:
+        jitter = self.rng.uniform(-self.jitter_ms, self.jitter_ms)
+        return max(0.0, self.latency_ms + jitter) / 1000
+
+    def chunks(self, response: Dict[str, Any]) -> List[Dict[str, Any]]:
+        """A text reply split over several stream chunks, function calls in one."""
+        part = response["candidates"][0]["content"]["parts"][0]
+        if "text" not in part:
+            return [response]
+        words = part["text"].split(" ")
+        size = max(1, -(-len(words) // self.stream_chunks))
+        pieces = [
+            " ".join(words[i : i + size]) + (" " if i + size < len(words) else "")
+            for i in range(0, len(words), size)
+        ]
+        chunks = []
+        for i, piece in enumerate(pieces):
+            candidate = {
+                "content": {"role": "model", "parts": [{"text": piece}]},
+                "index": 0,
+            }
+            chunk = {
+                "candidates": [candidate],
+                "modelVersion": response["modelVersion"],
+            }
+            if i == len(pieces) - 1:
+                candidate["finishReason"] = "STOP"
+                chunk["usageMetadata"] = response["usageMetadata"]
+            chunks.append(chunk)
+        return chunks
+
+
+def create_app(mock: MockGemini) -> FastAPI:
+    app = FastAPI()
+
+    @app.post("/{version}/models/{model_action}")
+    async def generate(version: str, model_action: str, request: Request):
+        model, _, action = model_action.partition(":")
+        body = await request.json()
+        mock.stats["requests"] += 1
+        response = mock.respond(body, model)
+        if action == "streamGenerateContent":
+            chunks = mock.chunks(response)
+            delay = mock.delay()
+
+            async def stream():
+                for chunk in chunks:
+                    await asyncio.sleep(delay / len(chunks))
+                    yield f"data: {json.dumps(chunk)}\r\n\r\n"
+
+            return StreamingResponse(stream(), media_type="text/event-stream")
+        if action != "generateContent":
+            return JSONResponse(
+                {"error": {"code": 404, "message": f"Unsupported {action}"}},
+                status_code=404,
+            )
+        await asyncio.sleep(mock.delay())
+        return response
+
+    @app.get("/stats")
+    async def stats():
+        return mock.stats
+
+    return app
+
+
+def load_scenarios(path: Optional[str]) -> Optional[List[Dict[str, Any]]]:
+    if not path:
+        return None
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Local stand-in for the Gemini API. Point the backend at it with GEMINI_BASE_URL."
+    )
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8089)
+    parser.add_argument("--latency-ms", type=float, default=800)
+    parser.add_argument("--jitter-ms", type=float, default=200)
+    parser.add_argument(
+        "--scenarios", type=str, help="JSON list of {match, calls, reply}"
+    )
+    args = parser.parse_args()
+
+    mock = MockGemini(load_scenarios(args.scenarios), args.latency_ms, args.jitter_ms)
+    uvicorn.run(create_app(mock), host=args.host, port=args.port, log_level="warning")
@@ -0,0 +1,118 @@
+import statistics
+from typing import Any, Dict, List, Set
+from backend.constants import SEMESTERS, CourseInfoModel
+
+
+class OfferingIndex:
+    """
+    Which terms every course had sections in, precomputed from course_data.
+    Each course gets a bitmask over the published terms (bit i = self.terms[i]) and
+    each semester suffix ("10", "90"...) a mask of its terms, so offered-in checks and
+    per-semester frequencies are a bit test and a popcount.
+    """
+
+    def __init__(self, courses: Dict[str, CourseInfoModel]):
+        self.terms: List[str] = sorted(
+            {term for info in courses.values() for term in info.sections}
+        )
+        self.bit: Dict[str, int] = {term: 1 << i for i, term in enumerate(self.terms)}
+        self.semester_masks: Dict[str, int] = {}
+        for term, bit in self.bit.items():
+            self.semester_masks[term[4:]] = self.semester_masks.get(term[4:], 0) | bit
+
+        self.masks: Dict[str, int] = {}
+        self.section_counts: Dict[str, Dict[str, int]] = {}
+        self.term_courses: Dict[str, Set[str]] = {term: set() for term in self.terms}
+        for course_id, info in courses.items():
+            mask = 0
+            for term, sections in info.sections.items():
+                mask |= self.bit[term]
+                self.term_courses[term].add(course_id)
+            self.masks[course_id] = mask
+            self.section_counts[course_id] = {
+                term: len(sections) for term, sections in info.sections.items()
+            }
+
+    def set_sections(self, course_id: str, term: str, count: int) -> None:
+        """
+        Records that a course has `count` sections in a term now, for the seat
+        refresher. The term's course set is replaced rather than changed in place, so
+        readers iterating it never see it change size.
+        """
+        if term not in self.bit:
+            if not count:
+                return
+            self.bit[term] = 1 << len(self.terms)
+            self.terms = sorted(self.terms + [term])
+            self.semester_masks[term[4:]] = (
+                self.semester_masks.get(term[4:], 0) | self.bit[term]
+            )
+            self.term_courses[term] = set()
+        offered = self.term_courses[term]
+        if count and course_id not in offered:
+            self.term_courses[term] = offered | {course_id}
+        elif not count and course_id in offered:
+            self.term_courses[term] = offered - {course_id}
+
+        mask = self.masks.get(course_id, 0)
+        self.masks[course_id] = (
+            mask | self.bit[term] if count else mask & ~self.bit[term]
+        )
+        counts = dict(self.section_counts.get(course_id, {}))
+        if count:
+            counts[term] = count
+        else:
+            counts.pop(term, None)
+        self.section_counts[course_id] = counts
+
+    def offered_in(self, course_id: str, term: str) -> bool:
+        return bool(self.masks.get(course_id, 0) & self.bit.get(term, 0))
+
+    def offered_terms(self, course_id: str) -> List[str]:
+        mask = self.masks.get(course_id, 0)
+        return [term for term in self.terms if mask & self.bit[term]]
+
+    def frequency(self, course_id: str, semester: str) -> float:
+        """Share of published terms of this semester type the course was offered in."""
+        semester_mask = self.semester_masks.get(semester, 0)
+        if not semester_mask:
+            return 0.0
+        offered = self.masks.get(course_id, 0) & semester_mask
+        return offered.bit_count() / semester_mask.bit_count()
+
+    def typical_sections(self, course_id: str, semester: str) -> int:
+        """Median number of sections in the terms of this semester type it ran in."""
+        counts = [
+            count
+            for term, count in self.section_counts.get(course_id, {}).items()
+            if term[4:] == semester
+        ]
+        return int(statistics.median(counts)) if counts else 0
+
+    def predict(self, course_id: str, term: str) -> float:
+        """
+        Chance that a course runs in a term. Published terms are known exactly; for future
+        terms it's the course's frequency for that semester type. Courses with no history
+        at all get even odds in Fall and Spring and none in Summer and Winter.
+        """
+        if course_id not in self.masks:
+            return 0.0
+        if term in self.bit:
+            return 1.0 if self.offered_in(course_id, term) else 0.0
+        if not self.masks[course_id]:
+            return 0.5 if term[4:] in ("10", "90") else 0.0
+        return self.frequency(course_id, term[4:])
+
+    def summary(self, course_id: str) -> Dict[str, Any]:
+        return {
+            "course": course_id,
+            "offered_terms": self.offered_terms(course_id),
+            "semesters": {
+                name: {
+                    "frequency": round(self.frequency(course_id, semester), 2),
+                    "typical_sections": self.typical_sections(course_id, semester),
+                }
+                for semester, name in SEMESTERS.items()
+                if semester in self.semester_masks
+            },
+        }
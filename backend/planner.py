@@ -0,0 +1,376 @@
+import math
+import random
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Set, Tuple
+from backend.constants import SEMESTERS, CourseInfoModel, UserFulfilled
+from backend.eligibility import is_grade_sufficient
+from backend.registry import DataVersion, registry
+
+# calendar order of the term suffixes within a year, see SEMESTERS
+TERM_ORDER = ["10", "50", "90", "95"]
+DEFAULT_CREDITS = 3.0
+# cost of satisfying an OR branch with something other than a course
+NON_COURSE_COST = 1000
+# randomised restarts tried within the time budget
+MAX_ITERATIONS = 200
+
+OfferProbability = Callable[[str, str], float]
+
+
+def next_term(term: str) -> str:
+    year, semester = int(term[:4]), term[4:]
+    i = TERM_ORDER.index(semester)
+    if i + 1 < len(TERM_ORDER):
+        return f"{year}{TERM_ORDER[i + 1]}"
+    return f"{year + 1}{TERM_ORDER[0]}"
+
+
+def term_label(term: str) -> str:
+    return f"{SEMESTERS.get(term[4:], term[4:])} {term[:4]}"
+
+
+def upcoming_terms(start_term: str, count: int, semesters: Sequence[str]) -> List[str]:
+    """The next `count` terms from start_term (inclusive) whose suffix is in semesters."""
+    terms = []
+    term = start_term
+    while len(terms) < count:
+        if term[4:] in semesters:
+            terms.append(term)
+        term = next_term(term)
+    return terms
+
+
+def course_credits(course_id: str, courses: Dict[str, CourseInfoModel]) -> float:
+    info = courses.get(course_id)
+    if info is None or not info.credits:
+        return DEFAULT_CREDITS
+    return float(info.credits)
+
+
+class DegreePlanner:
+    """
+    Plans the courses needed to reach `targets` over upcoming terms.
+
+    The prerequisite closure of the targets is expanded first (for OR nodes, the
+    cheapest branch by prerequisite closure size). A taken course counts as completed
+    only when passed (is_grade_sufficient), and satisfies a prerequisite only with its
+    minimum grade; otherwise it is planned again as a retake, so the plan never relies
+    on a course check_prereq_tree would refuse. Courses are then list-scheduled term
+    by term, taking the longest remaining prerequisite chain first, only into terms
+    where they are predicted to be offered, corequisites in the same term, within the
+    credit cap. Randomised tie-breaks are retried until the time budget runs out or
+    the plan reaches the lower bound (longest chain or total credits / cap terms,
+    whichever is larger).
+    """
+
+    def __init__(
+        self,
+        profile: UserFulfilled,
+        offer_probability: Optional[OfferProbability] = None,
+        min_probability: float = 0.5,
+        data: Optional[DataVersion] = None,
+    ):
+        self.data = data or registry.current()
+        self.courses = self.data.course_data
+        self.grades: Dict[str, str] = {
+            name: info.grade for name, info in profile.courses.items()
+        }
+        self.completed: Set[str] = {
+            name
+            for name, grade in self.grades.items()
+            if is_grade_sufficient(grade, None)
+        }
+        self.equivalents: Set[str] = set(profile.equivalents)
+        self.offer_probability = offer_probability or self.data.offering_index.predict
+        self.min_probability = min_probability
+        self.notes: List[str] = []
+        self.unscheduled: Dict[str, str] = {}
+        self.required: Set[str] = set()
+        self.prereqs: Dict[str, Set[str]] = {}
+        self.coreqs: Dict[str, Set[str]] = {}
+
+    def credits(self, course_id: str) -> float:
+        return course_credits(course_id, self.courses)
+
+    def _cost(self, courses: Set[str]) -> int:
+        needed = set(courses)
+        for course in courses:
+            if course in self.data.prereq_graph.pos:
+                needed |= self.data.prereq_graph.closure(course, "ancestors")
+        return len(needed - self.completed)
+
+    def _pick(self, node: Any) -> Tuple[Set[str], List[str], int]:
+        """(courses to take, non-course requirements, cost) satisfying a tree node."""
+        if node is None:
+            return set(), [], 0
+        node_type = node.type
+        if node_type == "AND":
+            courses, notes, cost = set(), [], 0
+            for child in node.children:
+                c, n, k = self._pick(child)
+                courses |= c
+                notes += n
+                cost += k
+            return courses, notes, cost
+        if node_type == "OR":
+            if not node.children:
+                return set(), [], 0
+            options = [self._pick(child) for child in node.children]
+            return min(options, key=lambda option: option[2])
+        if node_type == "COURSE":
+            grade = self.grades.get(node.course)
+            if grade is not None and is_grade_sufficient(grade, node.min_grade):
+                return set(), [], 0
+            return {node.course}, [], self._cost({node.course})
+        if node_type == "EQUIVALENT":
+            missing = {
+                c
+                for c in node.courses
+                if c not in self.completed and c not in self.equivalents
+            }
+            takeable = {c for c in missing if c in self.courses}
+            notes = [f"Needs an equivalent for {c}" for c in sorted(missing - takeable)]
+            return takeable, notes, self._cost(takeable) + NON_COURSE_COST * len(notes)
+        name = getattr(node, "normalized", None) or getattr(
+            node, "name", getattr(node, "raw", node_type)
+        )
+        return set(), [f"{node_type}: {name}"], NON_COURSE_COST
+
+    def expand(self, targets: Sequence[str], max_credits: float) -> None:
+        stack = [t for t in targets if t not in self.completed]
+        while stack:
+            course = stack.pop()
+            if course in self.required or course in self.unscheduled:
+                continue
+            info = self.courses.get(course)
+            if info is None:
+                self.unscheduled[course] = "Unknown course"
+                continue
+            if self.credits(course) > max_credits:
+                self.unscheduled[course] = f"More than {max_credits:g} credits"
+                continue
+            self.required.add(course)
+            prereqs, prereq_notes, _ = self._pick(info.prereq_tree)
+            coreqs, coreq_notes, _ = self._pick(info.coreq_tree)
+            self.prereqs[course] = prereqs - {course}
+            self.coreqs[course] = coreqs - {course} - prereqs
+            for note in prereq_notes + coreq_notes:
+                self.notes.append(f"{course}: {note}")
+            stack.extend(prereqs | coreqs)
+
+        # drop anything that depends on a course that can't be planned
+        changed = True
+        while changed:
+            changed = False
+            for course in list(self.required):
+                blocked = (self.prereqs[course] | self.coreqs[course]) & set(
+                    self.unscheduled
+                )
+                if blocked:
+                    self.required.discard(course)
+                    self.unscheduled[course] = (
+                        f"Depends on {', '.join(sorted(blocked))}, which can't be planned"
+                    )
+                    changed = True
+
+    def chain_lengths(self) -> Dict[str, int]:
+        """Terms needed from each course to the end of its longest dependent chain."""
+        dependents: Dict[str, List[str]] = {c: [] for c in self.required}
+        for course in self.required:
+            for prereq in self.prereqs[course]:
+                if prereq in dependents:
+                    dependents[prereq].append(course)
+
+        lengths: Dict[str, int] = {}
+        for root in self.required:
+            stack = [(root, False)]
+            on_path: Set[str] = set()
+            while stack:
+                course, expanded = stack.pop()
+                if course in lengths:
+                    continue
+                if expanded:
+                    on_path.discard(course)
+                    lengths[course] = 1 + max(
+                        (lengths.get(d, 0) for d in dependents[course]), default=0
+                    )
+                    continue
+                if course in on_path:
+                    # prerequisite cycle in the data, don't recurse into it again
+                    continue
+                on_path.add(course)
+                stack.append((course, True))
+                stack.extend((d, False) for d in dependents[course] if d not in lengths)
+        return lengths
+
+    def schedule(
+        self,
+        terms: List[str],
+        max_credits: float,
+        priority: Dict[str, Tuple],
+    ) -> Tuple[List[List[str]], Set[str]]:
+        remaining = set(self.required)
+        done: Set[str] = set()
+        plan: List[List[str]] = []
+        for term in terms:
+            if not remaining:
+                break
+            chosen: List[str] = []
+            load = 0.0
+
+            def takeable(course: str) -> bool:
+                return (
+                    course in remaining
+                    and course not in chosen
+                    and self.prereqs[course] <= done
+                    and self.offer_probability(course, term) >= self.min_probability
+                )
+
+            for course in sorted(
+                (c for c in remaining if takeable(c)), key=priority.__getitem__
+            ):
+                if course in chosen:
+                    continue
+                group = [course] + sorted(
+                    c for c in self.coreqs[course] if c in remaining and c not in chosen
+                )
+                if not all(takeable(c) for c in group):
+                    continue
+                credits = sum(self.credits(c) for c in group)
+                if load + credits > max_credits:
+                    continue
+                chosen += group
+                load += credits
+            plan.append(chosen)
+            done |= set(chosen)
+            remaining -= set(chosen)
+        while plan and not plan[-1]:
+            plan.pop()
+        return plan, remaining
+
+    def plan(
+        self,
+        targets: Sequence[str],
+        start_term: str,
+        max_terms: int = 8,
+        max_credits: float = 18.0,
+        semesters: Sequence[str] = ("10", "90"),
+        time_budget: float = 1.0,
+        seed: int = 0,
+    ) -> Dict[str, Any]:
+        started = time.perf_counter()
+        self.expand(targets, max_credits)
+        terms = upcoming_terms(start_term, max_terms, semesters)
+        lengths = self.chain_lengths()
+
+        rarity = {
+            c: sum(self.offer_probability(c, t) for t in terms) for c in self.required
+        }
+        total_credits = sum(self.credits(c) for c in self.required)
+        lower_bound = max(
+            max(lengths.values(), default=0),
+            math.ceil(total_credits / max_credits) if self.required else 0,
+        )
+
+        def score(result: Tuple[List[List[str]], Set[str]]) -> Tuple:
+            plan, remaining = result
+            loads = [sum(self.credits(c) for c in t) for t in plan]
+            return (len(remaining), len(plan), max(loads, default=0))
+
+        rng = random.Random(seed)
+        priority = {
+            c: (-lengths.get(c, 1), rarity[c], -self.credits(c), c)
+            for c in self.required
+        }
+        best = self.schedule(terms, max_credits, priority)
+        iterations = 1
+        while (
+            self.required
+            and score(best)[:2] != (0, lower_bound)
+            and iterations < MAX_ITERATIONS
+            and time.perf_counter() - started < time_budget
+        ):
+            priority = {
+                c: (-lengths.get(c, 1) - rng.random() * 0.99, rng.random(), c)
+                for c in self.required
+            }
+            candidate = self.schedule(terms, max_credits, priority)
+            if score(candidate) < score(best):
+                best = candidate
+            iterations += 1
+
+        plan, remaining = best
+        for course in remaining:
+            self.unscheduled[course] = (
+                "Not predicted to be offered in time"
+                if not any(
+                    self.offer_probability(course, t) >= self.min_probability
+                    for t in terms
+                )
+                else f"Doesn't fit in {max_terms} terms"
+            )
+
+        return {
+            "terms": [
+                {
+                    "term": term,
+                    "semester": term_label(term),
+                    "credits": sum(self.credits(c) for c in courses),
+                    "courses": [
+                        {
+                            "course": c,
+                            "title": self.courses[c].title,
+                            "credits": self.credits(c),
+                            "offer_probability": round(
+                                self.offer_probability(c, term), 2
+                            ),
+                        }
+                        for c in courses
+                    ],
+                }
+                for term, courses in zip(terms, plan)
+            ],
+            "already_completed": [t for t in targets if t in self.completed],
+            "unscheduled": [
+                {"course": c, "reason": reason}
+                for c, reason in sorted(self.unscheduled.items())
+            ],
+            "requirements_to_check": sorted(set(self.notes)),
+            "terms_used": len(plan),
+            "lower_bound_terms": lower_bound,
+            "optimal": not remaining
+            and not self.unscheduled
+            and len(plan) == lower_bound,
+            "search": {
+                "iterations": iterations,
+                "elapsed_ms": round(1000 * (time.perf_counter() - started), 1),
+            },
+        }
+
+
+def plan_degree(
+    profile: UserFulfilled,
+    targets: Sequence[str],
+    start_term: str,
+    max_terms: int = 8,
+    max_credits: float = 18.0,
+    include_summer: bool = False,
+    include_winter: bool = False,
+    time_budget: float = 1.0,
+    offer_probability: Optional[OfferProbability] = None,
+    data: Optional[DataVersion] = None,
+) -> Dict[str, Any]:
+    semesters = ["10", "90"]
+    if include_summer:
+        semesters.append("50")
+    if include_winter:
+        semesters.append("95")
+    planner = DegreePlanner(profile, offer_probability, data=data)
+    return planner.plan(
+        targets,
+        start_term,
+        max_terms=max_terms,
+        max_credits=max_credits,
+        semesters=semesters,
+        time_budget=time_budget,
+    )
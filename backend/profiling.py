@@ -0,0 +1,210 @@
+import cProfile
+import heapq
+import io
+import json
+import os
+import pstats
+import sys
+import threading
+import time
+import uuid
+from collections import Counter
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+from backend.constants import (
+    PROFILE_TTL,
+    SLOW_SAMPLE_INTERVAL_MS,
+    SLOW_TOP_N,
+    SLOW_WINDOW_SECONDS,
+    get_redis,
+)
+
+
+def profile_call(fn: Callable, *args, **kwargs) -> Tuple[Any, Dict[str, Any]]:
+    """
+    Runs fn in this thread under pyinstrument when it's installed, cProfile otherwise.
+    Tool calls made by Gemini's automatic function calling run in the same thread,
+    so they show up inside the chat turn.
+    """
+    started = time.time()
+    try:
+        from pyinstrument import Profiler
+    except ImportError:
+        Profiler = None
+
+    if Profiler is not None:
+        profiler = Profiler(interval=0.001, async_mode="disabled")
+        profiler.start()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.stop()
+        profile = {
+            "format": "pyinstrument",
+            "text": profiler.output_text(unicode=False, color=False),
+            "html": profiler.output_html(),
+        }
+    else:
+        profiler = cProfile.Profile()
+        profiler.enable()
+        try:
+            result = fn(*args, **kwargs)
+        finally:
+            profiler.disable()
+        out = io.StringIO()
+        pstats.Stats(profiler, stream=out).sort_stats("cumulative").print_stats(60)
+        profile = {"format": "cprofile", "text": out.getvalue()}
+    profile.update(created=started, duration_ms=1000 * (time.time() - started))
+    return result, profile
+
+
+def store_profile(profile: Dict[str, Any], ttl: int = PROFILE_TTL) -> str:
+    profile_id = profile.get("id") or uuid.uuid4().hex[:16]
+    profile["id"] = profile_id
+    get_redis().set(f"profile:{profile_id}", json.dumps(profile), ex=ttl)
+    return profile_id
+
+
+def load_profile(profile_id: str) -> Optional[Dict[str, Any]]:
+    raw = get_redis().get(f"profile:{profile_id}")
+    return json.loads(raw) if raw else None
+
+
+def collapse(frame) -> str:
+    """A frame's stack root first, in the collapsed format flamegraph tools read."""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(
+            f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+        )
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+class SlowRequestSampler:
+    """
+    Always-on, low-overhead sampler: every interval_ms one background thread reads
+    sys._current_frames() for the threads currently serving a tracked request and
+    counts their collapsed stacks. When a request ends, its stacks are kept only if
+    it is among the top_n slowest of the current window; at the end of each window
+    those are stored as profiles (format "collapsed") and listed by recent().
+    """
+
+    def __init__(
+        self,
+        interval_ms: float = SLOW_SAMPLE_INTERVAL_MS,
+        top_n: int = SLOW_TOP_N,
+        window_seconds: float = SLOW_WINDOW_SECONDS,
+        store: Optional[Callable[[Dict[str, Any]], str]] = store_profile,
+    ):
+        self.interval = interval_ms / 1000
+        self.top_n = top_n
+        self.window_seconds = window_seconds
+        self.store = store
+        self._active: Dict[int, Dict[str, Any]] = {}
+        # min-heap of (duration_ms, seq, record) for the current window
+        self._window: List[Tuple[float, int, Dict[str, Any]]] = []
+        self._window_started = time.monotonic()
+        self._seq = 0
+        self._last: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.interval > 0 and self.top_n > 0
+
+    def _ensure_thread(self) -> None:
+        # threads don't survive fork, each worker starts its own sampler
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._active.clear()
+            self._pid = os.getpid()
+            threading.Thread(target=self._run, daemon=True, name="slow-sampler").start()
+
+    def _run(self) -> None:
+        me = threading.get_ident()
+        while True:
+            time.sleep(self.interval)
+            active = list(self._active.items())
+            if active:
+                frames = sys._current_frames()
+                for ident, record in active:
+                    frame = frames.get(ident)
+                    if frame is not None and ident != me:
+                        record["stacks"][collapse(frame)] += 1
+            if time.monotonic() - self._window_started >= self.window_seconds:
+                self.flush()
+
+    @contextmanager
+    def track(self, label: str) -> Iterator[None]:
+        """Samples this thread while the block runs."""
+        if not self.enabled:
+            yield
+            return
+        self._ensure_thread()
+        ident = threading.get_ident()
+        record = {"label": label, "started": time.time(), "stacks": Counter()}
+        self._active[ident] = record
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._active.pop(ident, None)
+            record["duration_ms"] = 1000 * (time.perf_counter() - t0)
+            self._offer(record)
+
+    def wrap(self, label: str, fn: Callable) -> Callable:
+        def call(*args, **kwargs):
+            with self.track(label):
+                return fn(*args, **kwargs)
+
+        return call
+
+    def _offer(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self._seq += 1
+            item = (record["duration_ms"], self._seq, record)
+            if len(self._window) < self.top_n:
+                heapq.heappush(self._window, item)
+            elif item[0] > self._window[0][0]:
+                heapq.heapreplace(self._window, item)
+
+    def flush(self) -> List[Dict[str, Any]]:
+        """Ends the window: stores its slowest requests and starts a new one."""
+        with self._lock:
+            window, self._window = self._window, []
+            self._window_started = time.monotonic()
+        profiles = []
+        for duration, _, record in sorted(window, key=lambda item: -item[0]):
+            profile = {
+                "format": "collapsed",
+                "path": record["label"],
+                "created": record["started"],
+                "duration_ms": round(duration, 1),
+                "samples": sum(record["stacks"].values()),
+                "text": "\n".join(
+                    f"{stack} {count}" for stack, count in record["stacks"].items()
+                ),
+            }
+            if self.store is not None:
+                try:
+                    self.store(profile)
+                except Exception as e:
+                    print(f"Could not store slow request profile: {e}")
+            profiles.append(profile)
+        self._last = profiles
+        return profiles
+
+    def recent(self) -> List[Dict[str, Any]]:
+        """The previous window's slowest requests, without their stacks."""
+        return [
+            {k: v for k, v in profile.items() if k != "text"} for profile in self._last
+        ]
+
+
+slow_sampler = SlowRequestSampler()
@@ -0,0 +1,76 @@
+import hashlib
+import json
+import re
+from typing import Any, Dict, List, Optional
+from backend.constants import QUERY_CACHE_TTL, get_redis
+
+STATS_KEY = "course_query:stats"
+
+
+def normalize_query(query: str) -> str:
+    """Lowercase, punctuation dropped, whitespace collapsed: "Intro ML?" == "intro  ml"."""
+    return " ".join(re.sub(r"[^\w\s+#]", " ", query.lower()).split())
+
+
+class QueryResultCache:
+    """
+    Ranked course_query candidates shared by every user and worker, in Redis.
+    Only the profile-independent part is cached: the reranked list for a query over
+    all courses or the term's courses. Keys include the data version, so a reload
+    makes every old entry unreachable and they expire with their TTL.
+    Redis errors are logged and treated as misses.
+    """
+
+    def __init__(self, ttl: int = QUERY_CACHE_TTL, prefix: str = "course_query"):
+        self.ttl = ttl
+        self.prefix = prefix
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl > 0
+
+    def key(self, query: str, term: Optional[str], version: str) -> str:
+        digest = hashlib.sha1(normalize_query(query).encode("utf-8")).hexdigest()
+        return f"{self.prefix}:{version[:16]}:{term or 'all'}:{digest}"
+
+    def get(
+        self, query: str, term: Optional[str], version: str
+    ) -> Optional[List[Dict[str, Any]]]:
+        if not self.enabled:
+            return None
+        try:
+            redis_client = get_redis()
+            raw = redis_client.get(self.key(query, term, version))
+            redis_client.hincrby(STATS_KEY, "hits" if raw else "misses", 1)
+        except Exception as e:
+            print(f"Query cache unavailable: {e}")
+            return None
+        return json.loads(raw) if raw else None
+
+    def set(
+        self,
+        query: str,
+        term: Optional[str],
+        version: str,
+        ranked: List[Dict[str, Any]],
+    ) -> None:
+        if not self.enabled:
+            return
+        try:
+            get_redis().set(
+                self.key(query, term, version),
+                json.dumps(ranked, separators=(",", ":")),
+                ex=self.ttl,
+            )
+        except Exception as e:
+            print(f"Query cache unavailable: {e}")
+
+    def stats(self) -> Dict[str, int]:
+        try:
+            counts = get_redis().hgetall(STATS_KEY)
+        except Exception:
+            return {}
+        return {name: int(count) for name, count in counts.items()}
+
+
+query_cache = QueryResultCache()
@@ -0,0 +1,242 @@
+import os
+import socket
+import threading
+import time
+import uuid
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from backend.constants import (
+    DATA_FILE,
+    DATA_SYNC_LOCK_TTL,
+    DATA_VERSION,
+    DATA_WATCH_INTERVAL,
+    CourseInfoModel,
+    course_data,
+    file_digest,
+    get_redis,
+    load_course_data_with_version,
+)
+from backend.graph_index import PrereqGraph
+from backend.offerings import OfferingIndex
+
+
+class DataVersion:
+    """
+    One loaded graph.json and everything derived from it. Never mutated after it is
+    published (the seat refresher's section swaps and offering index updates aside),
+    so a request that grabbed a version keeps a consistent view even if a reload swaps
+    in a newer one meanwhile.
+    `derived` holds indexes built by registered builders (e.g. the int8 vector index).
+    """
+
+    def __init__(self, courses: Dict[str, CourseInfoModel], version: str):
+        self.version = version
+        self.course_data = courses
+        self.valid_courses: Set[str] = set(courses)
+        self.prereq_graph = PrereqGraph(courses)
+        self.offering_index = OfferingIndex(courses)
+        self.term_courses = self.offering_index.term_courses
+        self.derived: Dict[str, Any] = {}
+        self.loaded_at = time.time()
+
+    def __repr__(self) -> str:
+        return f"DataVersion({self.version[:12]}, {len(self.course_data)} courses)"
+
+
+Builder = Callable[[DataVersion], Any]
+
+
+class SharedBuildLock:
+    """
+    Makes one process per data version run the shared builders (the ones writing
+    state every worker shares, like the Chroma collection): the first worker to see a
+    new graph.json takes a Redis key with a TTL, which it keeps extending while it
+    builds, and marks the version synced when it's done. The other workers build only
+    their in-memory indexes and wait for the mark before swapping the version in. If
+    the holder dies, its key expires and a waiting worker takes over.
+    """
+
+    def __init__(self, ttl: int = DATA_SYNC_LOCK_TTL, poll_interval: float = 1.0):
+        self.ttl = ttl
+        self.poll_interval = poll_interval
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    @staticmethod
+    def _keys(version: str) -> Tuple[str, str]:
+        return f"data:sync:{version}", f"data:synced:{version}"
+
+    def acquire(self, version: str, force: bool = False) -> bool:
+        """True if this process should run the shared builders for `version`."""
+        lock_key, synced_key = self._keys(version)
+        redis_client = get_redis()
+        if not force and redis_client.exists(synced_key):
+            return False
+        return bool(redis_client.set(lock_key, self.token, nx=True, ex=self.ttl))
+
+    def hold(self, version: str) -> Callable[[], None]:
+        """Keeps the lock alive in a background thread, returns the function to stop it."""
+        lock_key, _ = self._keys(version)
+        stop = threading.Event()
+
+        def run() -> None:
+            while not stop.wait(self.ttl / 3):
+                get_redis().expire(lock_key, self.ttl)
+
+        threading.Thread(target=run, daemon=True, name="data-sync-lock").start()
+        return stop.set
+
+    def release(self, version: str, synced: bool) -> None:
+        lock_key, synced_key = self._keys(version)
+        pipe = get_redis().pipeline()
+        if synced:
+            pipe.set(synced_key, self.token, ex=7 * 24 * 60 * 60)
+        pipe.delete(lock_key)
+        pipe.execute()
+
+    def wait(self, version: str) -> bool:
+        """Blocks until `version` is synced (True) or nobody holds its lock (False)."""
+        lock_key, synced_key = self._keys(version)
+        redis_client = get_redis()
+        while True:
+            if redis_client.exists(synced_key):
+                return True
+            if not redis_client.exists(lock_key):
+                return False
+            time.sleep(self.poll_interval)
+
+
+class DataRegistry:
+    """
+    Holds the current DataVersion. reload() builds a new version off to the side,
+    course data, closures, offering index and every registered builder, and only then
+    swaps the reference, so in-flight requests finish on the version they started with.
+    Anything cached per data version (keyed by DataVersion.version) goes stale with it.
+    """
+
+    def __init__(self, path: str = DATA_FILE):
+        self.path = path
+        self._current: Optional[DataVersion] = None
+        self._builders: List[Tuple[str, Builder, bool]] = []
+        self._listeners: List[Callable[[DataVersion], None]] = []
+        self._lock = threading.Lock()
+        self._watcher: Optional[threading.Thread] = None
+        # set by the pre-fork server, None runs shared builders in this process
+        self.shared_lock: Optional[SharedBuildLock] = None
+
+    def add_builder(self, name: str, builder: Builder, shared: bool = False) -> None:
+        """
+        builder(version) runs for every new version, its result lands in
+        version.derived[name]. shared builders write state shared between processes
+        and run in only one of them per version, see SharedBuildLock.
+        """
+        self._builders.append((name, builder, shared))
+
+    def on_swap(self, listener: Callable[[DataVersion], None]) -> None:
+        self._listeners.append(listener)
+
+    def _run_builders(self, data: DataVersion, shared: bool) -> None:
+        for name, builder, is_shared in self._builders:
+            if is_shared == shared:
+                data.derived[name] = builder(data)
+
+    def _build(
+        self, courses: Dict[str, CourseInfoModel], version: str, force: bool = False
+    ) -> DataVersion:
+        data = DataVersion(courses, version)
+        shared_lock = self.shared_lock
+        if shared_lock is None:
+            self._run_builders(data, shared=True)
+            self._run_builders(data, shared=False)
+            return data
+
+        local_built = False
+        while True:
+            if shared_lock.acquire(version, force):
+                stop = shared_lock.hold(version)
+                synced = False
+                try:
+                    self._run_builders(data, shared=True)
+                    synced = True
+                finally:
+                    stop()
+                    shared_lock.release(version, synced)
+                break
+            if not local_built:
+                # in-memory indexes meanwhile, the version is swapped in after the sync
+                self._run_builders(data, shared=False)
+                local_built = True
+            if shared_lock.wait(version):
+                break
+            # the holder died before finishing, try to take over
+        if not local_built:
+            self._run_builders(data, shared=False)
+        return data
+
+    def load(self) -> DataVersion:
+        """The first version, from the data constants already loaded at import."""
+        with self._lock:
+            if self._current is None:
+                self._current = self._build(course_data, DATA_VERSION)
+            return self._current
+
+    def current(self) -> DataVersion:
+        data = self._current
+        return data if data is not None else self.load()
+
+    def reload(self, force: bool = False) -> Optional[DataVersion]:
+        """
+        Loads graph.json again if its content changed (or force). Returns the new
+        version, or None if nothing changed. A failed load keeps the current version.
+        """
+        with self._lock:
+            current = self._current
+            if not force and current is not None and os.path.exists(self.path):
+                if file_digest(self.path) == current.version:
+                    return None
+            started = time.perf_counter()
+            courses, version = load_course_data_with_version(self.path)
+            data = self._build(courses, version, force)
+            self._current = data
+        print(
+            f"Reloaded course data {version[:12]}: {len(courses)} courses "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        for listener in self._listeners:
+            try:
+                listener(data)
+            except Exception as e:
+                print(f"Error in data reload listener: {e}")
+        return data
+
+    def watch(self, interval: float = DATA_WATCH_INTERVAL) -> None:
+        """Polls graph.json's size and mtime in a background thread, reloading on change."""
+        if interval <= 0 or self._watcher is not None:
+            return
+
+        def stat() -> Optional[Tuple[int, int]]:
+            try:
+                st = os.stat(self.path)
+            except OSError:
+                return None
+            return st.st_mtime_ns, st.st_size
+
+        def run() -> None:
+            # no baseline: a worker forked after the file changed catches up on the
+            # first round, reload() compares the content digest anyway
+            last = None
+            while True:
+                time.sleep(interval)
+                now = stat()
+                if now is None or now == last:
+                    continue
+                try:
+                    self.reload()
+                    last = now
+                except Exception as e:
+                    # likely a half-written file, try again next round
+                    print(f"Error reloading {self.path}: {e}")
+
+        self._watcher = threading.Thread(target=run, daemon=True, name="data-watch")
+        self._watcher.start()
+
+
+registry = DataRegistry()
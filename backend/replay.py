@@ -0,0 +1,182 @@
+import argparse
+import difflib
+import json
+import os
+import time
+import typing
+from typing import Any, Callable, Dict, List, Optional
+
+parser = argparse.ArgumentParser(
+    description=(
+        "Re-run the tool calls of a TOOL_TRACE_FILE against the current data, without "
+        "Gemini, and report latency against the recording and which results changed."
+    )
+)
+parser.add_argument("trace", type=str, help="JSONL trace written with TOOL_TRACE_FILE")
+parser.add_argument("--tools", nargs="*", help="only replay these tools")
+parser.add_argument(
+    "--limit", type=int, default=0, help="replay at most this many calls"
+)
+parser.add_argument(
+    "--repeat",
+    type=int,
+    default=1,
+    help="run each call this many times, keep the fastest",
+)
+parser.add_argument("--diffs", type=int, default=5, help="result diffs to print")
+parser.add_argument("--json", type=str, help="also write the summary here")
+
+# read by backend.constants: a replay must not append to a trace or hit the query cache
+os.environ["TOOL_TRACE_FILE"] = ""
+os.environ["QUERY_CACHE_TTL"] = "0"
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+def result_diff(recorded: Any, replayed: Any, limit: int = 40) -> str:
+    lines = difflib.unified_diff(
+        json.dumps(recorded, indent=1, sort_keys=True, default=str).splitlines(),
+        json.dumps(replayed, indent=1, sort_keys=True, default=str).splitlines(),
+        "recorded",
+        "replayed",
+        lineterm="",
+    )
+    return "\n".join(list(lines)[:limit])
+
+
+def replay(
+    path: str,
+    tools: Optional[List[str]] = None,
+    limit: int = 0,
+    repeat: int = 1,
+    make_tools: Optional[Callable[..., List[Callable]]] = None,
+    data: Optional[Any] = None,
+) -> Dict[str, Any]:
+    """
+    make_tools(profile, term, data) returns the tools to replay against, by default
+    the chat's (functions.get_tools without tracing).
+    """
+    from backend.constants import UserFulfilled
+    from backend.registry import registry
+    from backend.tracing import digest, read_trace, stable_json
+
+    if make_tools is None:
+        from backend.functions import get_tools
+
+        def make_tools(profile, term, data):
+            return get_tools(profile, term, data, traced=False)
+
+    data = data or registry.current()
+    profiles: Dict[str, Dict[str, Any]] = {}
+    calls = []
+    for record in read_trace(path):
+        if record["type"] == "profile":
+            profiles[record["hash"]] = record["profile"]
+        elif record["type"] == "call" and (not tools or record["tool"] in tools):
+            calls.append(record)
+    if limit:
+        calls = calls[:limit]
+
+    per_tool: Dict[str, Dict[str, List[float]]] = {}
+    mismatches = []
+    skipped = 0
+    versions = set()
+    for record in calls:
+        if record["profile"] not in profiles:
+            skipped += 1
+            continue
+        versions.add(record.get("data_version"))
+        best = None
+        error = None
+        for _ in range(max(1, repeat)):
+            # update_user_profile mutates the profile, every run starts from the snapshot
+            profile = UserFulfilled.model_validate(profiles[record["profile"]])
+            by_name = {t.__name__: t for t in make_tools(profile, record["term"], data)}
+            tool = by_name[record["tool"]]
+            args_type = typing.get_type_hints(tool)["args"]
+            args = args_type.model_validate(record["args"])
+            t0 = time.perf_counter()
+            try:
+                result = tool(args)
+            except Exception as e:
+                result, error = None, f"{type(e).__name__}: {e}"
+            duration_ms = 1000 * (time.perf_counter() - t0)
+            best = duration_ms if best is None else min(best, duration_ms)
+
+        timings = per_tool.setdefault(record["tool"], {"recorded": [], "replay": []})
+        timings["recorded"].append(record["duration_ms"])
+        timings["replay"].append(best)
+        encoded = stable_json(result)
+        if digest(encoded) != record["result_hash"] or error != record.get("error"):
+            mismatch = {
+                "tool": record["tool"],
+                "args": record["args"],
+                "recorded_bytes": record["result_bytes"],
+                "replay_bytes": len(encoded),
+                "error": error,
+            }
+            if "result" in record:
+                mismatch["diff"] = result_diff(record["result"], json.loads(encoded))
+            mismatches.append(mismatch)
+
+    return {
+        "calls": len(calls) - skipped,
+        "skipped": skipped,
+        "recorded_data_versions": sorted(str(v) for v in versions),
+        "data_version": data.version,
+        "tools": {
+            name: {
+                "calls": len(t["replay"]),
+                "recorded_p50_ms": percentile(t["recorded"], 0.5),
+                "recorded_p95_ms": percentile(t["recorded"], 0.95),
+                "replay_p50_ms": percentile(t["replay"], 0.5),
+                "replay_p95_ms": percentile(t["replay"], 0.95),
+            }
+            for name, t in sorted(per_tool.items())
+        },
+        "mismatches": mismatches,
+    }
+
+
+def report(summary: Dict[str, Any], diffs: int = 5) -> None:
+    print(f"{summary['calls']} calls replayed on data {summary['data_version']}")
+    if summary["skipped"]:
+        print(f"{summary['skipped']} calls skipped, their profile is not in the trace")
+    other = [
+        v for v in summary["recorded_data_versions"] if v != summary["data_version"]
+    ]
+    if other:
+        print(f"recorded on data {', '.join(other)}: result changes are expected")
+    print(
+        f"\n{'tool':<24}{'calls':>7}{'rec p50':>10}{'rec p95':>10}"
+        f"{'p50':>10}{'p95':>10}"
+    )
+    for name, row in summary["tools"].items():
+        print(
+            f"{name:<24}{row['calls']:>7}{row['recorded_p50_ms']:>10.1f}"
+            f"{row['recorded_p95_ms']:>10.1f}{row['replay_p50_ms']:>10.1f}"
+            f"{row['replay_p95_ms']:>10.1f}"
+        )
+    print(f"\n{len(summary['mismatches'])} results differ from the recording")
+    for mismatch in summary["mismatches"][:diffs]:
+        print(
+            f"\n{mismatch['tool']} {json.dumps(mismatch['args'])}: "
+            f"{mismatch['recorded_bytes']}B -> {mismatch['replay_bytes']}B"
+            f"{' ' + mismatch['error'] if mismatch['error'] else ''}"
+        )
+        if mismatch.get("diff"):
+            print(mismatch["diff"])
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    summary = replay(args.trace, args.tools, args.limit, args.repeat)
+    report(summary, args.diffs)
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump(summary, f, indent=2)
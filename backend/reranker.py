@@ -0,0 +1,187 @@
+import argparse
+import os
+import queue
+import statistics
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.constants import RERANK_MAX_BATCH, RERANK_MAX_WAIT_MS
+
+Pair = Sequence[str]
+
+
+class BatchingReranker:
+    """
+    Scores (query, doc) pairs for many concurrent requests with one model.
+    Callers block in predict() while a single background thread merges whatever
+    requests are pending into one batch, runs model.predict once, and hands each
+    caller back its slice of the scores.
+
+    An idle reranker runs a lone request straight away. Once requests start to
+    overlap, it waits up to max_wait_ms for more to join, up to max_batch pairs.
+    Pairs are sorted by length before scoring so each padded mini-batch holds
+    similar lengths.
+    """
+
+    def __init__(
+        self,
+        model: Any,
+        max_wait_ms: float = RERANK_MAX_WAIT_MS,
+        max_batch: int = RERANK_MAX_BATCH,
+        batch_size: int = 64,
+    ):
+        self.model = model
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch = max_batch
+        self.batch_size = batch_size
+        self.stats = {"batches": 0, "requests": 0, "pairs": 0}
+        self._lock = threading.Lock()
+        self._pid: Optional[int] = None
+        self._queue: "queue.Queue[Tuple[List[Pair], Future]]" = queue.Queue()
+        self._last_batch_requests = 0
+
+    def predict(self, pairs: List[Pair]) -> np.ndarray:
+        if not pairs:
+            return np.empty(0, dtype=np.float32)
+        future: Future = Future()
+        self._ensure_worker()
+        self._queue.put((pairs, future))
+        return future.result()
+
+    def _ensure_worker(self) -> None:
+        # threads don't survive fork, a forked worker starts its own
+        if self._pid == os.getpid():
+            return
+        with self._lock:
+            if self._pid == os.getpid():
+                return
+            self._queue = queue.Queue()
+            threading.Thread(
+                target=self._run, args=(self._queue,), daemon=True, name="reranker"
+            ).start()
+            self._pid = os.getpid()
+
+    def _collect(
+        self, jobs: "queue.Queue[Tuple[List[Pair], Future]]"
+    ) -> List[Tuple[List[Pair], Future]]:
+        batch = [jobs.get()]
+        total = len(batch[0][0])
+        # only wait for company when requests have been overlapping
+        deadline = time.monotonic() + (
+            self.max_wait if self._last_batch_requests > 1 else 0.0
+        )
+        while total < self.max_batch:
+            try:
+                remaining = deadline - time.monotonic()
+                job = (
+                    jobs.get(timeout=remaining) if remaining > 0 else jobs.get_nowait()
+                )
+            except queue.Empty:
+                break
+            batch.append(job)
+            total += len(job[0])
+        return batch
+
+    def _run(self, jobs: "queue.Queue[Tuple[List[Pair], Future]]") -> None:
+        while True:
+            batch = self._collect(jobs)
+            self._last_batch_requests = len(batch)
+            self._score(batch)
+
+    def _score(self, batch: List[Tuple[List[Pair], Future]]) -> None:
+        flat = [pair for pairs, _ in batch for pair in pairs]
+        order = sorted(
+            range(len(flat)), key=lambda i: len(flat[i][0]) + len(flat[i][1])
+        )
+        try:
+            sorted_scores = self.model.predict(
+                [flat[i] for i in order],
+                batch_size=self.batch_size,
+                show_progress_bar=False,
+            )
+        except Exception as e:
+            for _, future in batch:
+                future.set_exception(e)
+            return
+
+        scores = np.empty(len(flat), dtype=np.float32)
+        scores[order] = np.asarray(sorted_scores, dtype=np.float32)
+        start = 0
+        for pairs, future in batch:
+            future.set_result(scores[start : start + len(pairs)])
+            start += len(pairs)
+
+        self.stats["batches"] += 1
+        self.stats["requests"] += len(batch)
+        self.stats["pairs"] += len(flat)
+
+
+def bench_concurrency(
+    model: Any,
+    pairs: List[Pair],
+    concurrency: int = 50,
+    n_requests: int = 200,
+) -> Dict[str, Dict[str, float]]:
+    """
+    Runs n_requests reranks of `pairs` from `concurrency` threads, once with each thread
+    calling model.predict itself and once through a BatchingReranker.
+    Reports requests per second and p50/p99 request latency.
+    """
+
+    def run(predict) -> Dict[str, float]:
+        latencies = []
+
+        def one(_):
+            t0 = time.perf_counter()
+            predict(pairs)
+            latencies.append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(one, range(n_requests)))
+        elapsed = time.perf_counter() - t0
+        latencies.sort()
+        return {
+            "req_per_s": n_requests / elapsed,
+            "p50_ms": 1000 * statistics.median(latencies),
+            "p99_ms": 1000
+            * latencies[min(len(latencies) - 1, int(0.99 * len(latencies)))],
+        }
+
+    model.predict(pairs)  # warm up
+    reranker = BatchingReranker(model)
+    results = {
+        "direct": run(lambda p: model.predict(p, show_progress_bar=False)),
+        "batched": run(reranker.predict),
+    }
+    print(
+        f"{n_requests} requests of {len(pairs)} pairs, {concurrency} concurrent, "
+        f"avg batch {reranker.stats['requests'] / max(1, reranker.stats['batches']):.1f} requests"
+    )
+    print(f"{'mode':<10}{'req/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for name, row in results.items():
+        print(
+            f"{name:<10}{row['req_per_s']:>10.1f}{row['p50_ms']:>10.1f}{row['p99_ms']:>10.1f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    from backend.inference import bench_pairs, configure_threads, load_cross_encoder
+
+    parser = argparse.ArgumentParser(
+        description="Cross-encoder throughput with and without cross-request batching."
+    )
+    parser.add_argument("--concurrency", type=int, default=50)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument(
+        "--pairs", type=int, default=100, help="Pairs per rerank request."
+    )
+    args = parser.parse_args()
+
+    configure_threads()
+    bench_concurrency(
+        load_cross_encoder(), bench_pairs(args.pairs), args.concurrency, args.requests
+    )
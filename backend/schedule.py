@@ -0,0 +1,194 @@
+import itertools
+from typing import Any, Dict, List, Optional, Tuple
+from backend.registry import DataVersion, registry
+
+
+def parse_time_str(time_str: str) -> Tuple[int, int]:
+    """Parse time string like '11:30 AM - 12:50 PM' into (start_minutes, end_minutes)."""
+    try:
+        parts = time_str.strip().split(" - ")
+        if len(parts) != 2:
+            return None
+
+        start_str, end_str = parts
+
+        def time_to_minutes(t: str) -> int:
+            t = t.strip()
+            time_part, period = t.rsplit(" ", 1)
+            hour, minute = map(int, time_part.split(":"))
+
+            if period == "PM" and hour != 12:
+                hour += 12
+            elif period == "AM" and hour == 12:
+                hour = 0
+
+            return hour * 60 + minute
+
+        return (time_to_minutes(start_str), time_to_minutes(end_str))
+    except Exception:
+        return None
+
+
+def parse_section_times(
+    times_str: str, days_str: str
+) -> Dict[str, List[Tuple[int, int]]]:
+    """Map times to days. Returns dict of day -> [(start, end), ...]."""
+    if not times_str or not days_str:
+        return {}
+
+    day_to_times = {}
+    time_slots = [slot.strip() for slot in times_str.split(",")]
+
+    # If single time slot, apply to all days
+    if len(time_slots) == 1:
+        parsed = parse_time_str(time_slots[0])
+        if parsed:
+            for day in days_str:
+                day_to_times[day] = [parsed]
+    else:
+        # Multiple time slots - map to days in order
+        for i, day in enumerate(days_str):
+            if i < len(time_slots):
+                parsed = parse_time_str(time_slots[i])
+                if parsed:
+                    day_to_times[day] = [parsed]
+
+    return day_to_times
+
+
+def has_time_conflict(section1_times: Dict, section2_times: Dict) -> bool:
+    """Check if two sections have overlapping times on any shared day."""
+    for day in section1_times:
+        if day not in section2_times:
+            continue
+
+        # Check all time slot pairs for this day
+        for start1, end1 in section1_times[day]:
+            for start2, end2 in section2_times[day]:
+                # Check for overlap: ranges overlap if start1 < end2 and start2 < end1
+                if start1 < end2 and start2 < end1:
+                    return True
+
+    return False
+
+
+def build_schedules(
+    valid_courses: List[str],
+    max_days: int,
+    term: str,
+    data: Optional[DataVersion] = None,
+    errors: Optional[List[Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """
+    Every conflict-free combination of one section per course in `term` that meets on
+    at most max_days days. Course ids must already be resolved; errors collected by the
+    caller are returned along with any found here.
+    """
+    data = data or registry.current()
+    course_data = data.course_data
+    errors = list(errors or [])
+
+    if not valid_courses:
+        return {
+            "errors": errors,
+            "schedules": [],
+            "message": "No valid courses provided.",
+        }
+
+    course_sections_list = []
+    for course_name in valid_courses:
+        course_info = course_data[course_name]
+        if not course_info:
+            errors.append({"error_message": f"Course data not found for {course_name}"})
+            continue
+
+        term_sections = course_info.sections.get(term)
+        if not term_sections:
+            errors.append(
+                {
+                    "error_message": f"No sections available for {course_name} in term {term}"
+                }
+            )
+            continue
+
+        sections_for_course = []
+        for section_id, section_data in term_sections.items():
+            days = section_data[2]
+            times = section_data[3]
+
+            section_info = {
+                "course": course_name,
+                "section_id": section_id,
+                "days": days,
+                "crn": section_data[1],
+                "times": times,
+                "location": section_data[4],
+                "instructor": section_data[8],
+            }
+
+            # Parse and store time mappings
+            section_info["parsed_times"] = parse_section_times(times, days)
+            sections_for_course.append(section_info)
+
+        if sections_for_course:
+            course_sections_list.append(sections_for_course)
+        else:
+            errors.append(
+                {"error_message": f"No sections with day info for {course_name}"}
+            )
+
+    if not course_sections_list:
+        return {
+            "errors": errors,
+            "schedules": [],
+            "message": "No sections available for any valid course.",
+        }
+
+    all_combinations = list(itertools.product(*course_sections_list))
+
+    valid_schedules = []
+    for combo in all_combinations:
+        unique_days = set()
+        for section in combo:
+            for day_char in section["days"]:
+                unique_days.add(day_char)
+
+        # Check day constraint
+        if len(unique_days) > max_days:
+            continue
+
+        # Check for time conflicts
+        has_conflict = False
+        for i in range(len(combo)):
+            for j in range(i + 1, len(combo)):
+                if has_time_conflict(
+                    combo[i]["parsed_times"], combo[j]["parsed_times"]
+                ):
+                    has_conflict = True
+                    break
+            if has_conflict:
+                break
+
+        if not has_conflict:
+            # Remove parsed_times from output (internal use only)
+            clean_sections = []
+            for section in combo:
+                clean_section = {
+                    k: v for k, v in section.items() if k != "parsed_times"
+                }
+                clean_sections.append(clean_section)
+
+            valid_schedules.append(
+                {
+                    "sections": clean_sections,
+                    "days_used": sorted(list(unique_days)),
+                    "num_days": len(unique_days),
+                }
+            )
+
+    return {
+        "errors": errors if errors else None,
+        "schedules": valid_schedules,
+        "total_valid_schedules": len(valid_schedules),
+        "message": f"Found {len(valid_schedules)} schedule(s) fitting within {max_days} day(s) with no time conflicts.",
+    }
@@ -0,0 +1,181 @@
+import base64
+import random
+import requests
+from bs4 import BeautifulSoup
+from typing import Dict, List, Optional, Any
+from backend.constants import BANNER_BASE_URL
+
+# Headers - mimicking a browser
+HEADERS = {
+    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
+    "Accept": "application/json, text/plain, */*",
+    "Referer": "https://generalssb-prod.ec.njit.edu/BannerExtensibility/customPage/page/stuRegCrseSched",
+}
+
+
+def pb_encode(s: str) -> str:
+    """
+    Encodes a string using the Ellucian Page Builder obfuscation:
+    Base64(Random_Integer_String) + Base64(Target_String)
+    """
+    # 1. Generate a random salt (usually a 2-digit number)
+    salt = str(random.randint(10, 99))
+
+    # 2. Base64 encode the salt and the actual string
+    salt_b64 = base64.b64encode(salt.encode("utf-8")).decode("utf-8")
+    val_b64 = base64.b64encode(s.encode("utf-8")).decode("utf-8")
+
+    # 3. Concatenate them
+    return salt_b64 + val_b64
+
+
+def encode_params(raw_params: Dict[str, str]) -> Dict[str, str]:
+    # obfuscate keys AND values
+    encoded_params = {}
+    for key, value in raw_params.items():
+        encoded_params[pb_encode(key)] = pb_encode(value)
+
+    # The 'encoded' flag must be true (sent as plain text)
+    encoded_params["encoded"] = "true"
+    return encoded_params
+
+
+def _get_virtual_domain(
+    domain: str, raw_params: Dict[str, str], base_url: str
+) -> Optional[Any]:
+    url = f"{base_url}/internalPb/virtualDomains.{domain}"
+    try:
+        response = requests.get(
+            url, params=encode_params(raw_params), headers=HEADERS, timeout=30
+        )
+        response.raise_for_status()
+        # Parse JSON if successful
+        return response.json()
+
+    except requests.exceptions.HTTPError as e:
+        print(f"HTTP Error: {e}")
+        print(f"Response Body: {response.text}")
+        return None
+
+
+def fetch_courses(
+    subject: str,
+    term: str,
+    max_results: str = "9999",
+    offset: str = "0",
+    base_url: str = BANNER_BASE_URL,
+) -> Optional[List[Dict[str, Any]]]:
+    raw_params = {
+        "term": term,
+        "subject": subject,
+        "max": max_results,
+        "offset": offset,
+        "attr": "",  # Attribute is usually empty based on your logs
+    }
+    return _get_virtual_domain("stuRegCrseSchedSections", raw_params, base_url)
+
+
+def fetch_subj_list(
+    term: str,
+    max_results: str = "9999",
+    offset: str = "0",
+    base_url: str = BANNER_BASE_URL,
+) -> Optional[List[Dict[str, Any]]]:
+    raw_params = {
+        "term": term,
+        "max": max_results,
+        "offset": offset,
+        "attr": "",  # Attribute is usually empty based on your logs
+    }
+    return _get_virtual_domain("stuRegCrseSchedSubjList", raw_params, base_url)
+
+
+def section_html_blobs(response_data: Optional[List[Dict[str, Any]]]) -> List[str]:
+    """Returns the HTML fragments embedded in a stuRegCrseSchedSections response."""
+    if not response_data:
+        return []
+    return [
+        value
+        for value in response_data[0].values()
+        if isinstance(value, str) and "<h4" in value
+    ]
+
+
+def parse_sections_html(html_content: str) -> List[Dict[str, Any]]:
+    """
+    Extract all course sections from HTML content by finding h4 elements and their following tables.
+    Returns one record per h4: course_id, header (course title), honors, sections and credits.
+    """
+    soup = BeautifulSoup(html_content, "html.parser")
+    records = []
+
+    # Find all h4 elements (each represents a course)
+    for h4 in soup.find_all("h4"):
+        # Extract id from h4
+        course_id = h4.get("id")
+        if not course_id:
+            continue
+        course_id = course_id.replace("\u00a0", " ")
+
+        honors_sections = False
+
+        header: str = h4.get_text(strip=True)
+        if header.lower().endswith("honors"):
+            honors_sections = True
+            right_dash = header.rfind("-")
+            left_dash = header.find("-")
+
+            header = header[left_dash + 1 : right_dash].strip()
+        else:
+            left_dash = header.find("-")
+            header = header[left_dash + 1 :].strip()
+
+        current = h4.next_sibling
+        table = None
+        while current:
+            if hasattr(current, "name"):
+                if current.name == "table":
+                    table = current
+                    break
+            current = current.next_sibling
+
+        if not table:
+            continue
+
+        sections = {}
+        num_credits = None
+        # loop each section Skip the first row (header)
+        for row in table.find_all("tr")[1:]:
+            # Extract section cloumn info
+            td_values = []
+            for i, td in enumerate(row.find_all("td")):
+                # For links, extract the text content
+                if td.find("a"):
+                    text = td.find("a").get_text(strip=True)
+                else:
+                    text = td.get_text(strip=True)
+                # Special handling for times and rooms columns
+                if (i == 4 or i == 3) and td.find("br"):
+                    text = td.get_text(separator=", ", strip=True)
+
+                td_values.append(text)
+            if not td_values:
+                continue
+            sections[td_values[0]] = td_values
+
+            try:
+                num_credits = float(td_values[-3])
+            except Exception:
+                num_credits = None
+
+        records.append(
+            {
+                "course_id": course_id,
+                "header": header,
+                "honors": honors_sections,
+                "sections": sections,
+                "credits": num_credits,
+            }
+        )
+
+    return records
@@ -1,25 +1,46 @@
 import json
 import requests
 from bs4 import BeautifulSoup
-from urllib.parse import urljoin
-import requests
-import base64
-import random
-import json
+import hashlib
+import shutil
 import time
+import threading
 import argparse
 import dotenv
 from google import genai
 from google.genai import types
 import os
-from typing import Dict, List, Optional, Any, Union
-from backend.scrapers.rmp import sync_lecturer_rating
-from backend.constants import DESCRIPTION_PROCESS_PROMPT_FILE
+from typing import Dict, List, Optional, Any, Tuple, Union
+from backend.scrapers.rmp import sync_lecturer_ratings
+from backend.scrapers.banner import (
+    fetch_courses,
+    fetch_subj_list,
+    parse_sections_html,
+    section_html_blobs,
+)
+from backend.scrapers.pipeline import (
+    Checkpoint,
+    JsonlCache,
+    ProgressReporter,
+    Stage,
+    atomic_write_json,
+)
+from backend.constants import (
+    DESCRIPTION_PROCESS_PROMPT_FILE,
+    DATA_FILE,
+    SCRAPE_WORK_DIR,
+    EMBEDDINGS_FILE,
+    EMBEDDINGS_INDEX_FILE,
+    file_digest,
+    snapshot_path_for,
+    validate_course_data,
+    write_course_snapshot,
+)
+from backend.embeddings import build_course_embeddings
+from pydantic import ValidationError
 
 dotenv.load_dotenv()
 
-all_courses = {}
-
 links = [
     "https://catalog.njit.edu/graduate/computing-sciences/#coursestext",
     "https://catalog.njit.edu/graduate/architecture-design/#coursestext",
@@ -110,329 +131,206 @@ def process_single_description(description: str) -> Union[Dict[str, Any], None,
         return {}
 
 
-# ===== SECTION SCRAPER FUNCTIONS =====
-def pb_encode(s: str) -> str:
-    """
-    Encodes a string using the Ellucian Page Builder obfuscation:
-    Base64(Random_Integer_String) + Base64(Target_String)
-    """
-    # 1. Generate a random salt (usually a 2-digit number)
-    salt = str(random.randint(10, 99))
-
-    # 2. Base64 encode the salt and the actual string
-    salt_b64 = base64.b64encode(salt.encode("utf-8")).decode("utf-8")
-    val_b64 = base64.b64encode(s.encode("utf-8")).decode("utf-8")
-
-    # 3. Concatenate them
-    return salt_b64 + val_b64
-
+def parse_catalog_html(content: str) -> List[Dict[str, str]]:
+    """Extract (course_code, title, desc) records from a catalog page."""
+    soup = BeautifulSoup(content, "html.parser")
+    records = []
 
-def fetch_courses(
-    subject: str, term: str, max_results: str = "9999", offset: str = "0"
-) -> Optional[Dict[str, Any]]:
-    url = "https://generalssb-prod.ec.njit.edu/BannerExtensibility/internalPb/virtualDomains.stuRegCrseSchedSections"
+    # Find all course blocks
+    for block in soup.find_all("div", class_="courseblock"):
+        # Extract title from courseblocktitle
+        title_elem = block.find("p", class_="courseblocktitle")
+        title = title_elem.get_text(strip=True).replace("\u00a0", " ").split(".")
 
-    # Define the raw parameters we want to send
-    raw_params = {
-        "term": term,
-        "subject": subject,
-        "max": max_results,
-        "offset": offset,
-        "attr": "",  # Attribute is usually empty based on your logs
-    }
-
-    # obfuscate keys AND values
-    encoded_params = {}
-    for key, value in raw_params.items():
-        enc_key = pb_encode(key)
-        enc_val = pb_encode(value)
-        encoded_params[enc_key] = enc_val
-
-    # The 'encoded' flag must be true (sent as plain text)
-    encoded_params["encoded"] = "true"
-
-    # Headers - mimicking a browser
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*",
-        "Referer": "https://generalssb-prod.ec.njit.edu/BannerExtensibility/customPage/page/stuRegCrseSched",
-    }
-
-    # COOKIES: You must update this with a fresh JSESSIONID from your browser
-    # The session often expires quickly.
-    cookies = {
-        "JSESSIONID": "4216B7AFB3D9E1094A2F45F8210AC0D4"  # <--- REPLACE THIS
-    }
-
-    try:
-        response = requests.get(url, params=encoded_params, headers=headers)
-        response.raise_for_status()
-        # Parse JSON if successful
-        return response.json()
-
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error: {e}")
-        print(f"Response Body: {response.text}")
-        return None
-
-
-def fetch_subj_list(
-    term: str, max_results: str = "9999", offset: str = "0"
-) -> Optional[List[Dict[str, Any]]]:
-    url = "https://generalssb-prod.ec.njit.edu/BannerExtensibility/internalPb/virtualDomains.stuRegCrseSchedSubjList"
-
-    # Define the raw parameters we want to send
-    raw_params = {
-        "term": term,
-        "max": max_results,
-        "offset": offset,
-        "attr": "",  # Attribute is usually empty based on your logs
-    }
-
-    # obfuscate keys AND values
-    encoded_params = {}
-    for key, value in raw_params.items():
-        enc_key = pb_encode(key)
-        enc_val = pb_encode(value)
-        encoded_params[enc_key] = enc_val
-
-    # The 'encoded' flag must be true (sent as plain text)
-    encoded_params["encoded"] = "true"
-
-    # Headers - mimicking a browser
-    headers = {
-        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36",
-        "Accept": "application/json, text/plain, */*",
-        "Referer": "https://generalssb-prod.ec.njit.edu/BannerExtensibility/customPage/page/stuRegCrseSched",
-    }
+        # Extract description from courseblockdesc
+        desc_elem = block.find("p", class_="courseblockdesc")
+        description = (
+            desc_elem.get_text(strip=True).replace("\u00a0", " ") if desc_elem else ""
+        )
 
-    # COOKIES: You must update this with a fresh JSESSIONID from your browser
-    # The session often expires quickly.
-    cookies = {
-        "JSESSIONID": "4216B7AFB3D9E1094A2F45F8210AC0D4"  # <--- REPLACE THIS
+        records.append(
+            {
+                "course_code": title[0].strip(),
+                "title": title[1].strip(),
+                "desc": description,
+            }
+        )
+    return records
+
+
+def empty_course(title: str, desc: str) -> Dict[str, Any]:
+    """A course entry that already validates against CourseInfoModel before it is enriched."""
+    return {
+        "title": title,
+        "desc": desc,
+        "prereq_tree": None,
+        "coreq_tree": None,
+        "restrictions": [],
+        "sections": {},
     }
 
-    try:
-        response = requests.get(url, params=encoded_params, headers=headers)
-        response.raise_for_status()
-        # Parse JSON if successful
-        return response.json()
-
-    except requests.exceptions.HTTPError as e:
-        print(f"HTTP Error: {e}")
-        print(f"Response Body: {response.text}")
-        return None
-
-
-def run_section_scraper(term: str) -> Dict[str, Any]:
-    """Run the section scraper to fetch course data from the API and return as dict"""
-    print("=" * 60)
-    print("STEP 1: Running Section Scraper")
-    print("=" * 60)
-
-    # Load subjects
-    # fetch list of subjects from api
-    subjects_list = fetch_subj_list(term)
-    final_data = {}
-
-    for item in subjects_list:
-        subj = item.get("SUBJECT")
-        if subj:
-            print(f"Fetching courses for {subj}...")
-            # fetch courses for specific subject
-            response_data = fetch_courses(subj, term, max_results="500")
-
-            final_data[subj] = response_data
-
-            time.sleep(0.2)
-
-    print(f"✓ Section scraper complete. Fetched {len(final_data)} subjects\n")
-    return final_data
-
 
-# ===== MAIN PARSER FUNCTIONS =====
-
-def extract_sections_from_html(html_content: str, term: str) -> None:
-    """Extract all course sections from HTML content by finding h4 elements and their following tables"""
-    try:
-        soup = BeautifulSoup(html_content, "html.parser")
+class ScrapePipeline:
+    """
+    Runs the scrape as five stages connected by bounded queues:
 
-        # Find all h4 elements (each represents a course)
-        h4_elements = soup.find_all("h4")
+        fetch -> parse -> enrich -> write
+                      \\-> ratings
 
-        for h4 in h4_elements:
-            # Extract id from h4
-            course_id = h4.get("id")
-            if not course_id:
-                continue
+    fetch   downloads catalog pages and Banner section listings (network)
+    parse   turns them into records and merges them into all_courses (CPU)
+    enrich  fetches missing course details and runs the Gemini description parser (LLM)
+    ratings syncs RateMyProfessor ratings for new or changed lecturers
+    write   applies enrich results and saves graph.json once everything is done
 
-            honors_sections = False
+    fetch and parse checkpoint every item to <work_dir>/fetch and <work_dir>/parsed,
+    enrich results go to an append-only cache keyed by prompt + description, so a
+    resumed run only redoes work that never finished.
+    """
 
-            header: str = h4.get_text(strip=True)
-            if header.lower().endswith("honors"):
-                honors_sections = True
-                right_dash = header.rfind("-")
-                left_dash = header.find("-")
+    def __init__(
+        self,
+        all_courses: Dict[str, Any],
+        term: str,
+        output: str,
+        work_dir: str,
+        enrich_cache: JsonlCache,
+        enrich_workers: int = 4,
+        build_embeddings: bool = True,
+    ):
+        self.all_courses = all_courses
+        self.build_embeddings = build_embeddings
+        self.term = term
+        self.output = output
+        self.checkpoint = Checkpoint(work_dir)
+        self.enrich_cache = enrich_cache
+        self._lock = threading.Lock()
+        self._lecturers = set()
+
+        with open(DESCRIPTION_PROCESS_PROMPT_FILE, "r", encoding="utf-8") as f:
+            self._prompt_hash = hashlib.md5(f.read().encode("utf-8")).hexdigest()
+
+        self.write_stage = Stage("write", self.apply_update, on_finish=self.save)
+        self.enrich_stage = Stage(
+            "enrich",
+            self.enrich,
+            workers=enrich_workers,
+            on_finish=self.write_stage.close,
+        )
+        self.ratings_stage = Stage(
+            "ratings",
+            self.collect_lecturer,
+            maxsize=1024,
+            on_finish=self.sync_ratings,
+        )
+        self.parse_stage = Stage("parse", self.parse, on_finish=self._close_parse)
+        self.fetch_stage = Stage("fetch", self.fetch, on_finish=self.parse_stage.close)
+        self.stages = [
+            self.fetch_stage,
+            self.parse_stage,
+            self.enrich_stage,
+            self.ratings_stage,
+            self.write_stage,
+        ]
+
+    def _close_parse(self) -> None:
+        self.enrich_stage.close()
+        self.ratings_stage.close()
+
+    def run(self, sources: List[tuple], progress_interval: float = 10.0) -> None:
+        reporter = ProgressReporter(self.stages, progress_interval)
+        for stage in self.stages:
+            stage.start()
+        reporter.start()
+
+        for source in sources:
+            self.fetch_stage.put(source)
+        self.fetch_stage.close()
+
+        for stage in self.stages:
+            stage.join()
+        reporter.stop()
+        reporter.report()
+
+    # ---- fetch ----
+    @staticmethod
+    def source_key(kind: str, name: str) -> str:
+        if kind == "catalog":
+            return "catalog-" + hashlib.md5(name.encode("utf-8")).hexdigest()[:12]
+        return f"sections-{name}"
+
+    def fetch(self, source: tuple) -> None:
+        kind, name = source
+        key = self.source_key(kind, name)
+
+        if self.checkpoint.has("parsed", key):
+            # parse already checkpointed this item, no need to load the raw payload
+            self.parse_stage.put((kind, key, None))
+            return
 
-                header = header[left_dash + 1 : right_dash].strip()
+        if self.checkpoint.has("fetch", key):
+            payload = self.checkpoint.load("fetch", key)
+        else:
+            if kind == "catalog":
+                print(f"Scraping: {name}")
+                headers = {
+                    "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
+                }
+                response = requests.get(name, headers=headers, timeout=10)
+                response.raise_for_status()
+                payload = response.text
             else:
-                left_dash = header.find("-")
-                header = header[left_dash + 1 :].strip()
-
-            current = h4.next_sibling
-            table = None
-            num_credits = 0
-
-            while current:
-                if hasattr(current, "name"):
-                    if current.name == "table":
-                        table = current
-                        break
-                current = current.next_sibling
-
-            if table:
-                # Extract sections from this table
-                rows = table.find_all("tr")
-                sections = {}
-
-                # loop each section Skip the first row (header)
-                for row in rows[1:]:
-                    tds = row.find_all("td")
-
-                    # Extract section cloumn info
-                    td_values = []
-                    for i, td in enumerate(tds):
-                        text = ""
-                        # For links, extract the text content
-                        if td.find("a"):
-                            text = td.find("a").get_text(strip=True)
-                        else:
-                            text = td.get_text(strip=True)
-                            # Special handling for rooms column (4th index, 0-based)
-                        if (i == 4 or i == 3) and td.find("br"):
-                            text = td.get_text(separator=", ", strip=True)
-
-                        td_values.append(text)
-                    section_key = td_values[0]
-                    sections[section_key] = td_values
-
-                    # Check for lecturer change or new section
-                    new_lecturer = td_values[8]
-                    if new_lecturer:
-                        # Get existing lecturer for this section if it exists
-                        existing_sections = (
-                            all_courses.get(course_id, {})
-                            .get("sections", {})
-                            .get(term, {})
-                        )
-                        existing_lecturer = None
-                        if section_key in existing_sections:
-                            existing_lecturer = existing_sections[section_key][8]
-
-                        if existing_lecturer != new_lecturer:
-                            sync_lecturer_rating(new_lecturer)
-
-                    try:
-                        num_credits = float(td_values[-3])
-                    except Exception as e:
-                        num_credits = None
-
-                course_id = course_id.replace("\u00a0", " ")
-                if course_id not in all_courses.keys():
-                    print("New Course Found:", course_id)
-                    # fetch individual course details
-                    course_obj = get_individual_course(course_id)
-
-                    # process description with ai model
-                    course_returns = process_single_description(course_obj["desc"])
-                    course_obj.update(course_returns)
-
-                    if course_obj["title"] in ("Unkown", ""):
-                        course_obj["title"] = header
-                    course_obj["sections"] = {}
-                    course_obj["sections"][term] = sections
-                    all_courses[course_id] = course_obj
-                elif "sections" not in all_courses[course_id].keys():
-                    all_courses[course_id]["sections"] = {}
-
-                if (
-                    honors_sections
-                    and term in all_courses[course_id]["sections"].keys()
-                ):
-                    all_courses[course_id]["sections"][term].update(sections)
-                else:
-                    all_courses[course_id]["sections"][term] = sections
-
-                if all_courses[course_id]["title"] in ("Unkown", ""):
-                    all_courses[course_id]["title"] = header
-
-                all_courses[course_id]["credits"] = num_credits
-
-                if not all_courses[course_id]["sections"]:
-                    print(course_id, "has no sections")
-
-    except Exception as e:
-        print(f"Error parsing HTML: {e}")
-        return None
-
-
-def run_parser(scraped_data: Dict[str, Any], term: str) -> None:
-    """Run the parser to extract sections from scraped data dict"""
-    print("=" * 60)
-    print("STEP 2: Running Section Parser")
-    print("=" * 60)
-
-    print(f"\nExtracting sections from {len(scraped_data)} subjects...\n")
-
-    for course_name, course_data in scraped_data.items():
-        print(f"Processing {course_name}...")
-        course_data = course_data[0]
-
-        # If it's already a dict, look for HTML content in values
-        for key, value in course_data.items():
-            if isinstance(value, str) and ("<h4" in value):
-                # extract sections from html content
-                extract_sections_from_html(value, term)
-
-
-# == SECTION END==
-
+                print(f"Fetching courses for {name}...")
+                payload = fetch_courses(name, self.term, max_results="500")
+                time.sleep(0.2)
+            if payload is None:
+                # not checkpointed, so --resume retries it
+                raise RuntimeError(f"No data returned for {key}")
+            self.checkpoint.save("fetch", key, payload)
+
+        self.parse_stage.put((kind, key, payload))
+
+    # ---- parse ----
+    def parse(self, item: tuple) -> None:
+        kind, key, payload = item
+        if payload is None:
+            records = self.checkpoint.load("parsed", key)
+        else:
+            if kind == "catalog":
+                records = parse_catalog_html(payload)
+            else:
+                records = []
+                for html in section_html_blobs(payload):
+                    records.extend(parse_sections_html(html))
+            self.checkpoint.save("parsed", key, records)
+
+        if kind == "catalog":
+            jobs, lecturers = self.merge_catalog(records), []
+        else:
+            jobs, lecturers = self.merge_sections(records)
+
+        # queue outside the lock, downstream stages need it to make progress
+        for job in jobs:
+            self.enrich_stage.put(job)
+        for lecturer in lecturers:
+            self.ratings_stage.put(lecturer)
+
+    def merge_catalog(self, records: List[Dict[str, str]]) -> List[Dict[str, Any]]:
+        jobs = []
+        with self._lock:
+            for record in records:
+                course_code = record["course_code"]
+                title = record["title"]
+                description = record["desc"]
+
+                course_obj = self.all_courses.get(course_code)
+                if course_obj is None:
+                    course_obj = empty_course(title, description)
+                    self.all_courses[course_code] = course_obj
+                    # process new course description with ai
+                    jobs.append({"course_id": course_code, "desc": description})
+                    continue
 
-def scrape_undergrad_grad_catalog(url: str) -> None:
-    """Scrape courses from a given URL"""
-    try:
-        print(f"Scraping: {url}")
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36"
-        }
-        response = requests.get(url, headers=headers, timeout=10)
-        response.raise_for_status()
-
-        # print(response.content)
-        soup = BeautifulSoup(response.content, "html.parser")
-        courses = {}
-
-        # Find all course blocks
-        course_blocks = soup.find_all("div", class_="courseblock")
-
-        for block in course_blocks:
-            # Extract title from courseblocktitle
-            title_elem = block.find("p", class_="courseblocktitle")
-            title = title_elem.get_text(strip=True).replace("\u00a0", " ").split(".")
-
-            # Extract description from courseblockdesc
-            desc_elem = block.find("p", class_="courseblockdesc")
-            description = (
-                desc_elem.get_text(strip=True).replace("\u00a0", " ")
-                if desc_elem
-                else ""
-            )
-
-            course_code = title[0].strip()
-            title = title[1].strip()
-
-            if course_code in all_courses:
-                course_obj = all_courses[course_code]
                 if course_obj["title"] != title:
                     print(
                         "Title changed:",
@@ -443,40 +341,158 @@ def scrape_undergrad_grad_catalog(url: str) -> None:
                         title,
                     )
                     course_obj["title"] = title
-                elif course_obj["desc"] != description:
-                    print(
-                        "Description changed:",
-                        course_code,
-                        "Old description:",
-                        course_obj["desc"],
-                        "New description:",
-                        description,
-                    )
+                if course_obj["desc"] != description:
+                    print("Description changed:", course_code)
                     course_obj["desc"] = description
                     # update existing course with ai data
-                    course_returns = process_single_description(course_obj["desc"])
-                    course_obj.update(course_returns)
-            else:
-                course_obj = {"title": title, "desc": description}
-                # process new course description with ai
-                course_returns = process_single_description(description)
-                course_obj.update(course_returns)
-            if "sections" not in course_obj.keys():
-                course_obj["sections"] = {}
-            all_courses[course_code] = course_obj
+                    jobs.append({"course_id": course_code, "desc": description})
+                course_obj.setdefault("sections", {})
+        return jobs
+
+    def merge_sections(
+        self, records: List[Dict[str, Any]]
+    ) -> Tuple[List[Dict[str, Any]], List[str]]:
+        jobs, lecturers = [], []
+        term = self.term
+        with self._lock:
+            for record in records:
+                course_id = record["course_id"]
+                sections = record["sections"]
+
+                # Check for lecturer change or new section
+                existing_sections = (
+                    self.all_courses.get(course_id, {})
+                    .get("sections", {})
+                    .get(term, {})
+                )
+                for section_key, td_values in sections.items():
+                    new_lecturer = td_values[8] if len(td_values) > 8 else ""
+                    if not new_lecturer:
+                        continue
+                    existing = existing_sections.get(section_key)
+                    if existing is None or existing[8] != new_lecturer:
+                        lecturers.append(new_lecturer)
+
+                if course_id not in self.all_courses:
+                    print("New Course Found:", course_id)
+                    self.all_courses[course_id] = empty_course(
+                        record["header"], "No Description"
+                    )
+                    # fetch individual course details and process with ai
+                    jobs.append({"course_id": course_id, "fetch_details": True})
 
-        print(f"✓ Found {len(all_courses)} courses")
+                course_obj = self.all_courses[course_id]
+                course_obj.setdefault("sections", {})
+                if record["honors"] and term in course_obj["sections"]:
+                    course_obj["sections"][term].update(sections)
+                else:
+                    course_obj["sections"][term] = sections
 
-    except Exception as e:
-        print(f"✗ Error scraping {url}: {e}")
+                if course_obj["title"] in ("Unkown", ""):
+                    course_obj["title"] = record["header"]
 
+                course_obj["credits"] = record["credits"]
+
+                if not course_obj["sections"]:
+                    print(course_id, "has no sections")
+        return jobs, lecturers
+
+    # ---- enrich ----
+    def describe(self, description: str) -> Optional[Dict[str, Any]]:
+        """process_single_description with results cached by prompt + description."""
+        key = hashlib.md5((self._prompt_hash + description).encode("utf-8")).hexdigest()
+        cached = self.enrich_cache.get(key)
+        if cached is not None:
+            return cached
+
+        result = process_single_description(description)
+        if not isinstance(result, dict) or not result or "error" in result:
+            # not cached, so --resume retries it
+            raise RuntimeError(f"Description processing failed: {description[:60]}")
+        self.enrich_cache.put(key, result)
+        return result
+
+    def enrich(self, job: Dict[str, Any]) -> None:
+        course_id = job["course_id"]
+        updates = {}
+        description = job.get("desc", "")
+
+        if job.get("fetch_details"):
+            details = get_individual_course(course_id) or {}
+            description = details.get("desc", "No Description")
+            updates["desc"] = description
+            if details.get("title") not in (None, "Unkown", ""):
+                updates["title"] = details["title"]
+
+        updates.update(self.describe(description))
+        self.write_stage.put((course_id, updates))
+
+    # ---- ratings ----
+    def collect_lecturer(self, lecturer: str) -> None:
+        self._lecturers.add(lecturer)
+        if len(self._lecturers) >= 100:
+            self.sync_ratings()
+
+    def sync_ratings(self) -> None:
+        if self._lecturers:
+            batch, self._lecturers = self._lecturers, set()
+            sync_lecturer_ratings(batch)
+
+    # ---- write ----
+    def apply_update(self, update: tuple) -> None:
+        course_id, updates = update
+        with self._lock:
+            if course_id in self.all_courses:
+                self.all_courses[course_id].update(updates)
+
+    def save(self) -> None:
+        failed = sum(
+            stage.errors for stage in self.stages if stage is not self.ratings_stage
+        )
+        if failed:
+            # keep the input untouched so --resume can replay on top of it
+            path = os.path.join(self.checkpoint.work_dir, "graph.partial.json")
+        else:
+            path = self.output
+        with self._lock:
+            atomic_write_json(path, self.all_courses, indent=4)
+
+        state = self.checkpoint.load_state()
+        state["completed"] = not failed
+        self.checkpoint.save_state(state)
+        print(f"\n✓ Saved {len(self.all_courses)} courses to {path}")
+
+        if not failed:
+            self.save_snapshot()
+            if self.build_embeddings:
+                self.save_embeddings()
+
+    def save_snapshot(self) -> None:
+        """Validates the output once here so servers can load it without validating."""
+        try:
+            validated = validate_course_data(self.all_courses)
+        except ValidationError as e:
+            print(f"✗ {self.output} failed validation, snapshot not written:")
+            print(e)
+            return
+        snapshot_path = snapshot_path_for(self.output)
+        write_course_snapshot(validated, file_digest(self.output), snapshot_path)
+        print(f"✓ Saved snapshot to {snapshot_path}")
+
+    def save_embeddings(self) -> None:
+        """Builds the embeddings artifact beside the output, so servers skip model inference."""
+        directory = os.path.dirname(self.output)
+        build_course_embeddings(
+            (
+                (cid, info.get("title"), info.get("desc"))
+                for cid, info in self.all_courses.items()
+            ),
+            path=os.path.join(directory, os.path.basename(EMBEDDINGS_FILE)),
+            index_path=os.path.join(directory, os.path.basename(EMBEDDINGS_INDEX_FILE)),
+        )
 
-def main():
-    global all_courses
-    all_courses = json.load(
-        open(r"d:\Projects\NJIT_Course_FLOWCHART\backend\data\graph.json", "r")
-    )
 
+def main():
     """Scrape all links and save to JSON"""
     parser = argparse.ArgumentParser(
         description="Scrape NJIT course catalog and section information.",
@@ -492,10 +508,16 @@ def main():
         "  - 202590: Fall 2025\n"
         "  - 202550: Summer 2025",
     )
+    parser.add_argument(
+        "--input",
+        type=str,
+        default=DATA_FILE,
+        help="Existing graph.json to update.",
+    )
     parser.add_argument(
         "--output",
         type=str,
-        default=r"d:\Projects\NJIT_Course_FLOWCHART\backend\data\graph.json",
+        default=DATA_FILE,
         help="Path to the output JSON file.",
     )
     parser.add_argument(
@@ -508,6 +530,34 @@ def main():
         action="store_true",
         help="Only scrape course sections for the given term.",
     )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Continue an interrupted run from the checkpoints in --work-dir.",
+    )
+    parser.add_argument(
+        "--work-dir",
+        type=str,
+        default=SCRAPE_WORK_DIR,
+        help="Directory for checkpoints and the Gemini result cache.",
+    )
+    parser.add_argument(
+        "--enrich-workers",
+        type=int,
+        default=4,
+        help="Number of concurrent Gemini description requests.",
+    )
+    parser.add_argument(
+        "--no-embeddings",
+        action="store_true",
+        help="Skip building the course embeddings artifact after saving.",
+    )
+    parser.add_argument(
+        "--progress-interval",
+        type=float,
+        default=10.0,
+        help="Seconds between per-stage progress reports.",
+    )
 
     args = parser.parse_args()
 
@@ -517,48 +567,71 @@ def main():
     run_catalog = not args.sections or args.catalog
     run_sections = not args.catalog or args.sections
 
-    if args.sections and not args.catalog:
-        run_catalog = False
-    elif args.catalog and not args.sections:
-        run_sections = False
-
     term = args.term
     semester = semesters[term[-2:]]
     term_text = term[:-2] + " " + semester
 
-    if run_catalog:
-        print("=" * 60)
-        print("RUNNING CATALOG SCRAPER")
-        print("=" * 60)
-        print("=" * 60)
-        for url in links:
-            # scrape catalog page from url
-            scrape_undergrad_grad_catalog(url)
-        print("\n✓ Catalog scraping complete.\n")
+    term_work_dir = os.path.join(args.work_dir, term)
+    checkpoint = Checkpoint(term_work_dir)
+    state = checkpoint.load_state()
+    if args.resume and state.get("completed"):
+        print(f"Run for {term_text} already completed, nothing to resume.")
+        return
+    if not args.resume:
+        # start over, but keep the enrich cache so paid Gemini results are reused
+        for stage in ("fetch", "parsed"):
+            shutil.rmtree(os.path.join(term_work_dir, stage), ignore_errors=True)
+    checkpoint.save_state(
+        {
+            "term": term,
+            "catalog": run_catalog,
+            "sections": run_sections,
+            "output": args.output,
+            "completed": False,
+        }
+    )
 
-    if run_sections:
-        if not term:
-            print("Error: --term is required when scraping sections.")
-            return
+    # resumed runs restart from the same input, replaying checkpointed work
+    all_courses = {}
+    if os.path.exists(args.input):
+        with open(args.input, "r", encoding="utf-8") as f:
+            all_courses = json.load(f)
 
-        print("=" * 60)
+    sources = []
+    if run_catalog:
+        sources.extend(("catalog", url) for url in links)
+    if run_sections:
         print(f"RUNNING SECTIONS SCRAPER FOR TERM: {term_text}")
-        print("=" * 60)
-        print("-" * 60)
-        # run scraper for course sections
-        scraped_data = run_section_scraper(term)
-        # parse scraped section data
-        run_parser(scraped_data, term)
-        print("\n✓ Section scraping and parsing complete.\n")
-
-    # Save to JSON
-    if run_catalog or run_sections:
-        output_file = args.output
-        with open(output_file, "w") as f:
-            json.dump(all_courses, f, indent=4)
-        print(f"\n✓ Saved {len(all_courses)} courses to {output_file}")
-    else:
-        print("No action performed. Use --catalog, --sections, or no flags to run.")
+        if checkpoint.has("fetch", "subjects"):
+            subjects_list = checkpoint.load("fetch", "subjects")
+        else:
+            # fetch list of subjects from api
+            subjects_list = fetch_subj_list(term)
+            if subjects_list is None:
+                print("Error: could not fetch the subject list, is the session valid?")
+                return
+            checkpoint.save("fetch", "subjects", subjects_list)
+        for item in subjects_list:
+            subj = item.get("SUBJECT")
+            if subj:
+                sources.append(("sections", subj))
+
+    pipeline = ScrapePipeline(
+        all_courses,
+        term,
+        args.output,
+        term_work_dir,
+        JsonlCache(os.path.join(args.work_dir, "enrich.jsonl")),
+        enrich_workers=args.enrich_workers,
+        build_embeddings=not args.no_embeddings,
+    )
+    print("=" * 60)
+    print(f"Scraping {len(sources)} sources")
+    print("=" * 60)
+    pipeline.run(sources, progress_interval=args.progress_interval)
+
+    if not checkpoint.load_state().get("completed"):
+        print("Some items failed, rerun with --resume to retry them.")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,219 @@
+import json
+import os
+import queue
+import tempfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+# put into a stage's inbox once per worker to shut it down
+_DONE = object()
+
+
+class Stage:
+    """
+    A pool of worker threads that pull items from a bounded inbox and call `handler`
+    on each. Upstream stages call close() when they will not put anything else;
+    once every worker has drained the inbox, `on_finish` runs exactly once
+    (typically to close the downstream stages).
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        maxsize: int = 64,
+        on_finish: Optional[Callable[[], None]] = None,
+    ):
+        self.name = name
+        self.handler = handler
+        self.workers = workers
+        self.inbox: queue.Queue = queue.Queue(maxsize=maxsize)
+        self.on_finish = on_finish
+
+        self.processed = 0
+        self.errors = 0
+        self.busy_seconds = 0.0
+        self.started_at: Optional[float] = None
+        self.finished_at: Optional[float] = None
+
+        self._lock = threading.Lock()
+        self._running = 0
+        self._threads: List[threading.Thread] = []
+
+    def start(self) -> "Stage":
+        self.started_at = time.monotonic()
+        self._running = self.workers
+        for i in range(self.workers):
+            t = threading.Thread(
+                target=self._work, name=f"{self.name}-{i}", daemon=True
+            )
+            t.start()
+            self._threads.append(t)
+        return self
+
+    def put(self, item: Any) -> None:
+        self.inbox.put(item)
+
+    def close(self) -> None:
+        for _ in range(self.workers):
+            self.inbox.put(_DONE)
+
+    def join(self) -> None:
+        for t in self._threads:
+            t.join()
+
+    @property
+    def done(self) -> bool:
+        return self.finished_at is not None
+
+    def _work(self) -> None:
+        while True:
+            item = self.inbox.get()
+            if item is _DONE:
+                break
+            t0 = time.monotonic()
+            try:
+                self.handler(item)
+            except Exception as e:
+                with self._lock:
+                    self.errors += 1
+                print(f"✗ [{self.name}] {e}")
+            with self._lock:
+                self.processed += 1
+                self.busy_seconds += time.monotonic() - t0
+
+        with self._lock:
+            self._running -= 1
+            last = self._running == 0
+        if last:
+            try:
+                if self.on_finish:
+                    self.on_finish()
+            finally:
+                self.finished_at = time.monotonic()
+
+    def summary(self) -> str:
+        end = self.finished_at or time.monotonic()
+        elapsed = max(end - (self.started_at or end), 1e-9)
+        rate = self.processed / elapsed
+        state = "done" if self.done else f"queue {self.inbox.qsize()}"
+        return (
+            f"{self.name}: {self.processed} items, {rate:.2f}/s, "
+            f"{self.errors} errors, busy {self.busy_seconds:.1f}s ({state})"
+        )
+
+
+class ProgressReporter(threading.Thread):
+    """Prints one line per stage every `interval` seconds until stopped."""
+
+    def __init__(self, stages: List[Stage], interval: float = 10.0):
+        super().__init__(name="progress", daemon=True)
+        self.stages = stages
+        self.interval = interval
+        self._stop_event = threading.Event()
+
+    def run(self) -> None:
+        while not self._stop_event.wait(self.interval):
+            self.report()
+
+    def report(self) -> None:
+        print("-" * 60)
+        for stage in self.stages:
+            print(stage.summary())
+        print("-" * 60)
+
+    def stop(self) -> None:
+        self._stop_event.set()
+
+
+def atomic_write_json(path: str, data: Any, **dump_kwargs) -> None:
+    """Writes JSON to a temp file beside `path` and swaps it in, so readers never see a partial file."""
+    directory = os.path.dirname(path) or "."
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(data, f, **dump_kwargs)
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class Checkpoint:
+    """
+    Per-stage checkpoint files inside a work directory.
+    Each stage keeps one JSON file per item key under <work_dir>/<stage>/.
+    """
+
+    def __init__(self, work_dir: str):
+        self.work_dir = work_dir
+
+    def _path(self, stage: str, key: str) -> str:
+        return os.path.join(self.work_dir, stage, f"{key}.json")
+
+    def has(self, stage: str, key: str) -> bool:
+        return os.path.exists(self._path(stage, key))
+
+    def load(self, stage: str, key: str) -> Any:
+        with open(self._path(stage, key), "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save(self, stage: str, key: str, data: Any) -> None:
+        atomic_write_json(self._path(stage, key), data)
+
+    def load_state(self) -> Dict[str, Any]:
+        path = os.path.join(self.work_dir, "state.json")
+        if not os.path.exists(path):
+            return {}
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+
+    def save_state(self, state: Dict[str, Any]) -> None:
+        atomic_write_json(os.path.join(self.work_dir, "state.json"), state, indent=4)
+
+
+class JsonlCache:
+    """
+    Append-only key -> value cache backed by a JSONL file.
+    Used for results that are expensive to recompute (LLM calls), so they survive crashes.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._lock = threading.Lock()
+        self._data: Dict[str, Any] = {}
+        if os.path.exists(path):
+            with open(path, "rb+") as f:
+                complete = 0
+                for line in f:
+                    if not line.endswith(b"\n"):
+                        # a crash mid-write left a truncated last line; cut it off
+                        # so the next put doesn't land on the same line
+                        f.truncate(complete)
+                        break
+                    complete += len(line)
+                    try:
+                        entry = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self._data[entry["key"]] = entry["value"]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def get(self, key: str) -> Any:
+        return self._data.get(key)
+
+    def put(self, key: str, value: Any) -> None:
+        line = json.dumps({"key": key, "value": value}, ensure_ascii=False)
+        with self._lock:
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+                f.flush()
+                os.fsync(f.fileno())
+            self._data[key] = value
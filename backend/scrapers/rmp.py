@@ -1,8 +1,13 @@
 import json
 import requests
 import os
-from backend.constants import LECTURERS_FILE
-from functools import cache
+import threading
+import time
+import argparse
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from typing import Any, Dict, Iterable, List, Optional
+from backend.constants import LECTURERS_FILE, LECTURER_RATING_TTL, RMP_PROXY_URL
+from backend.scrapers.pipeline import atomic_write_json
 
 DEFAULT_RATING = {
     "avgRating": "0",
@@ -13,69 +18,230 @@ DEFAULT_RATING = {
     "legacyId": 0,
 }
 
+_thread_local = threading.local()
 
-@cache
-def sync_lecturer_rating(lecturer_name: str):
+
+class RateLimiter:
     """
-    Fetches the rating for a lecturer from the proxy API and updates lecturers.json.
-    lecturer_name format: "Lastname, Firstname"
+    Spaces out calls so that at most `rate` requests start per second,
+    shared across all worker threads.
     """
-    if not lecturer_name:
-        return
 
-    print(f"Syncing rating for: {lecturer_name}")
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._lock = threading.Lock()
+        self._next_slot = 0.0
 
-    try:
-        if ", " in lecturer_name:
-            lastname, firstname = lecturer_name.split(", ", 1)
-            query = f"{firstname} {lastname}"
-        else:
-            query = lecturer_name
+    def wait(self) -> None:
+        if not self.interval:
+            return
+        with self._lock:
+            slot = max(time.monotonic(), self._next_slot)
+            self._next_slot = slot + self.interval
+        delay = slot - time.monotonic()
+        if delay > 0:
+            time.sleep(delay)
 
-        response = requests.get(
-            f"https://backend-server-black-phi.vercel.app/prof?q={query}", timeout=10
-        )
 
-        if not response.ok or response.status_code == 204:
-            rating = DEFAULT_RATING
-        else:
-            rating = response.json()
+class LecturerRatingStore:
+    """
+    In-memory view of lecturers.json. Entries carry a `fetchedAt` unix timestamp
+    so stale ratings can be refreshed. Writes only happen on flush(), atomically.
+    """
+
+    def __init__(self, path: str = LECTURERS_FILE):
+        self.path = path
+        self.ratings: Dict[str, Dict[str, Any]] = load_lecturer_ratings(path)
+        self._lock = threading.Lock()
+        self._dirty = False
+
+    def is_fresh(self, lecturer_name: str, ttl: int = LECTURER_RATING_TTL) -> bool:
+        entry = self.ratings.get(lecturer_name)
+        if not entry or "fetchedAt" not in entry:
+            return False
+        return time.time() - entry["fetchedAt"] < ttl
+
+    def put(self, lecturer_name: str, rating: Dict[str, Any]) -> None:
+        with self._lock:
+            self.ratings[lecturer_name] = {**rating, "fetchedAt": int(time.time())}
+            self._dirty = True
+
+    def flush(self) -> bool:
+        """Writes the store to disk if anything changed. Returns True if written."""
+        with self._lock:
+            if not self._dirty:
+                return False
+            snapshot = dict(self.ratings)
+            self._dirty = False
+
+        try:
+            atomic_write_json(self.path, snapshot, indent=4, ensure_ascii=False)
+        except Exception:
+            with self._lock:
+                self._dirty = True
+            raise
+        return True
+
+
+def load_lecturer_ratings(path: str = LECTURERS_FILE) -> Dict[str, Dict[str, Any]]:
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except Exception as e:
+        print(f"Error loading {path}: {e}")
+        return {}
 
-        # Update lecturers.json
-        lecturer_ratings = {}
-        if os.path.exists(LECTURERS_FILE):
-            try:
-                with open(LECTURERS_FILE, "r", encoding="utf-8") as f:
-                    lecturer_ratings = json.load(f)
-            except Exception as e:
-                print(f"Error loading {LECTURERS_FILE}: {e}")
 
-        lecturer_ratings[lecturer_name] = rating
+def _session() -> requests.Session:
+    # requests.Session is not guaranteed thread safe, keep one per thread
+    if not hasattr(_thread_local, "session"):
+        _thread_local.session = requests.Session()
+    return _thread_local.session
 
-        with open(LECTURERS_FILE, "w", encoding="utf-8") as f:
-            json.dump(lecturer_ratings, f, indent=4, ensure_ascii=False)
 
-        print(f"✓ Updated rating for {lecturer_name}")
+def fetch_lecturer_rating(lecturer_name: str) -> Optional[Dict[str, Any]]:
+    """
+    Fetches the rating for a lecturer from the proxy API.
+    lecturer_name format: "Lastname, Firstname"
+    Returns None if the request failed, so the lecturer is retried on the next sync.
+    """
+    if ", " in lecturer_name:
+        lastname, firstname = lecturer_name.split(", ", 1)
+        query = f"{firstname} {lastname}"
+    else:
+        query = lecturer_name
 
-    except Exception as e:
+    try:
+        response = _session().get(RMP_PROXY_URL, params={"q": query}, timeout=10)
+    except requests.RequestException as e:
         print(f"Error syncing rating for {lecturer_name}: {e}")
+        return None
+
+    if not response.ok or response.status_code == 204:
+        return dict(DEFAULT_RATING)
+    try:
+        return response.json()
+    except ValueError as e:
+        print(f"Error syncing rating for {lecturer_name}: {e}")
+        return None
+
+
+def sync_lecturer_ratings(
+    lecturer_names: Iterable[str],
+    store: Optional[LecturerRatingStore] = None,
+    ttl: int = LECTURER_RATING_TTL,
+    max_workers: int = 8,
+    rate: float = 10.0,
+    flush_every: int = 250,
+    force: bool = False,
+) -> Dict[str, int]:
+    """
+    Syncs ratings for many lecturers at once.
+    Names are deduped, entries fetched within `ttl` seconds are skipped (unless force),
+    the rest are fetched concurrently with at most `rate` requests per second.
+    lecturers.json is written every `flush_every` updates and once at the end.
+    Returns counts of fetched, skipped and failed lecturers.
+    """
+    if store is None:
+        store = LecturerRatingStore()
+
+    unique_names = list(dict.fromkeys(name for name in lecturer_names if name))
+    to_fetch = [
+        name for name in unique_names if force or not store.is_fresh(name, ttl)
+    ]
+    stats = {
+        "fetched": 0,
+        "skipped": len(unique_names) - len(to_fetch),
+        "failed": 0,
+    }
+    if not to_fetch:
+        return stats
+
+    print(
+        f"Syncing ratings for {len(to_fetch)} lecturers "
+        f"({stats['skipped']} still fresh)..."
+    )
+    limiter = RateLimiter(rate)
+
+    def worker(name: str) -> Optional[Dict[str, Any]]:
+        limiter.wait()
+        return fetch_lecturer_rating(name)
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = {pool.submit(worker, name): name for name in to_fetch}
+            for done, future in enumerate(as_completed(futures), 1):
+                name = futures[future]
+                rating = future.result()
+                if rating is None:
+                    stats["failed"] += 1
+                else:
+                    store.put(name, rating)
+                    stats["fetched"] += 1
+
+                if flush_every and done % flush_every == 0:
+                    store.flush()
+                    print(f"{done} / {len(to_fetch)} lecturers synced")
+    finally:
+        store.flush()
+
+    print(
+        f"✓ Synced {stats['fetched']} lecturer ratings "
+        f"({stats['failed']} failed, {stats['skipped']} skipped)"
+    )
+    return stats
+
+
+def sync_lecturer_rating(lecturer_name: str):
+    """
+    Fetches the rating for a single lecturer and updates lecturers.json.
+    Prefer sync_lecturer_ratings when syncing more than one lecturer.
+    """
+    if not lecturer_name:
+        return
+    sync_lecturer_ratings([lecturer_name], max_workers=1)
+
+
+def collect_lecturers(course_data) -> List[str]:
+    """Returns every distinct instructor across all course sections, in first-seen order."""
+    lecturers = {}
+    for course_info in course_data.values():
+        for term_sections in course_info.sections.values():
+            for section in term_sections.values():
+                # Instructor is at index 8 of SectionEntries
+                lecturer = section[8]
+                if lecturer:
+                    lecturers[lecturer] = None
+    return list(lecturers)
 
 
 if __name__ == "__main__":
-    # Original behavior for backward compatibility or direct execution
     from backend.constants import course_data
 
-    lecturers = []
-    for course, course_info in course_data.items():
-        for term in course_info.sections:
-            for section_id in course_info.sections[term]:
-                # In the original script, it was index -5.
-                # SectionEntries = Tuple[str, str, str, str, str, str, str, str, str, str, str, str, str]
-                # Instructor is at index 8 (0-based) which is -5 from the end (13 total)
-                lecturer = course_info.sections[term][section_id][8]
-                if lecturer and lecturer not in lecturers:
-                    lecturers.append(lecturer)
-
-    for i, lecturer in enumerate(lecturers):
-        print(f"{i + 1} / {len(lecturers)}")
-        sync_lecturer_rating(lecturer)
+    parser = argparse.ArgumentParser(
+        description="Sync RateMyProfessor ratings for every lecturer in graph.json."
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument(
+        "--rate", type=float, default=10.0, help="Max requests per second."
+    )
+    parser.add_argument(
+        "--ttl",
+        type=int,
+        default=LECTURER_RATING_TTL,
+        help="Seconds before a stored rating is fetched again.",
+    )
+    parser.add_argument(
+        "--force", action="store_true", help="Refetch every lecturer."
+    )
+    args = parser.parse_args()
+
+    sync_lecturer_ratings(
+        collect_lecturers(course_data),
+        ttl=args.ttl,
+        max_workers=args.workers,
+        rate=args.rate,
+        force=args.force,
+    )
@@ -0,0 +1,87 @@
+import argparse
+import gc
+import json
+import statistics
+import time
+import tracemalloc
+from typing import Callable, Dict, Tuple
+from backend.constants import (
+    DATA_FILE,
+    file_digest,
+    load_course_snapshot,
+    snapshot_path_for,
+    validate_course_data,
+    write_course_snapshot,
+)
+
+
+def build_snapshot(path: str) -> str:
+    """Validates graph.json and writes the snapshot beside it."""
+    with open(path, "r", encoding="utf-8") as f:
+        data = validate_course_data(json.load(f))
+    snapshot_path = snapshot_path_for(path)
+    write_course_snapshot(data, file_digest(path), snapshot_path)
+    print(f"✓ Saved snapshot of {len(data)} courses to {snapshot_path}")
+    return snapshot_path
+
+
+def _measure(load: Callable[[], object], repeat: int) -> Tuple[float, float]:
+    """Returns (median seconds, peak MiB allocated) for a load function."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        t0 = time.perf_counter()
+        result = load()
+        times.append(time.perf_counter() - t0)
+        del result
+
+    gc.collect()
+    tracemalloc.start()
+    result = load()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return statistics.median(times), peak / (1 << 20)
+
+
+def bench(path: str, repeat: int = 5) -> Dict[str, Tuple[float, float]]:
+    """Compares json.load + validation against the snapshot for the same graph.json."""
+    snapshot_path = snapshot_path_for(path)
+
+    def load_json():
+        with open(path, "r", encoding="utf-8") as f:
+            return validate_course_data(json.load(f))
+
+    def load_snapshot():
+        # includes hashing graph.json, which every real startup has to do
+        data = load_course_snapshot(snapshot_path, file_digest(path))
+        if data is None:
+            raise RuntimeError(f"{snapshot_path} is missing or stale")
+        return data
+
+    results = {
+        "json + validate": _measure(load_json, repeat),
+        "snapshot": _measure(load_snapshot, repeat),
+    }
+    print(f"{'loader':<18}{'median s':>10}{'peak MiB':>10}")
+    for name, (seconds, peak) in results.items():
+        print(f"{name:<18}{seconds:>10.3f}{peak:>10.1f}")
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Build the binary course-data snapshot loaded by the server."
+    )
+    parser.add_argument("--input", type=str, default=DATA_FILE)
+    parser.add_argument(
+        "--bench",
+        action="store_true",
+        help="Also compare load time and peak memory against json.load + validation.",
+    )
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    build_snapshot(args.input)
+    if args.bench:
+        bench(args.input, args.repeat)
@@ -0,0 +1,385 @@
+import argparse
+import json
+import os
+import re
+import socket
+import threading
+import time
+import uuid
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+from backend.constants import (
+    BANNER_BASE_URL,
+    SEAT_FEED,
+    SEAT_REFRESH_INTERVAL,
+    SERVER_WORKERS,
+    CourseInfoModel,
+    get_redis,
+)
+from backend.registry import DataVersion, registry
+from backend.scrapers.banner import (
+    fetch_courses,
+    fetch_subj_list,
+    parse_sections_html,
+    section_html_blobs,
+)
+
+# SectionEntries indexes of Status, Max and Now
+SEAT_FIELDS = (5, 6, 7)
+
+
+def seat_change(
+    kind: str, course_id: str, section: str, row: Optional[Tuple[str, ...]]
+) -> Dict[str, Any]:
+    change = {"kind": kind, "course": course_id, "section": section, "row": row}
+    if row is not None:
+        change.update(crn=row[1], status=row[5], max=row[6], now=row[7])
+    return change
+
+
+class MemoryChangeFeed:
+    """
+    Change feed for a single process. Cursors are sequence numbers; only the newest
+    `maxlen` changes are kept, older cursors get reset=True and should reload.
+    """
+
+    def __init__(self, maxlen: int = 10000):
+        self._entries: deque = deque(maxlen=maxlen)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def acquire_leader(self, ttl: int) -> bool:
+        return True
+
+    def publish(self, changes: List[Dict[str, Any]]) -> str:
+        with self._lock:
+            for change in changes:
+                self._seq += 1
+                self._entries.append({**change, "id": str(self._seq)})
+            return str(self._seq)
+
+    def since(self, cursor: Optional[str], limit: int = 500) -> Dict[str, Any]:
+        with self._lock:
+            if cursor is None:
+                return {"changes": [], "cursor": str(self._seq), "reset": False}
+            if not cursor.isdigit():
+                raise ValueError(f"Invalid cursor {cursor}")
+            after = int(cursor)
+            if after > self._seq:
+                # cursor from before a restart
+                return {"changes": [], "cursor": str(self._seq), "reset": True}
+            first = int(self._entries[0]["id"]) if self._entries else self._seq + 1
+            changes = [e for e in self._entries if int(e["id"]) > after][:limit]
+        return {
+            "changes": changes,
+            "cursor": changes[-1]["id"] if changes else cursor,
+            "reset": after < first - 1,
+        }
+
+
+STREAM_ID = re.compile(r"\d+-\d+")
+
+
+def _stream_id(entry_id: str) -> Tuple[int, int]:
+    ms, _, seq = entry_id.partition("-")
+    return int(ms), int(seq or 0)
+
+
+class RedisChangeFeed:
+    """
+    Change feed in a Redis stream, shared by every server worker. Cursors are stream
+    ids. Only one process at a time (the leader, holding a Redis key with a TTL)
+    fetches from Banner and publishes; every worker applies what it reads.
+    """
+
+    def __init__(self, term: str, maxlen: int = 10000):
+        self.key = f"sections:changes:{term}"
+        self.leader_key = f"sections:leader:{term}"
+        self.maxlen = maxlen
+        self.token = f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+
+    def acquire_leader(self, ttl: int) -> bool:
+        redis_client = get_redis()
+        if redis_client.set(self.leader_key, self.token, nx=True, ex=ttl):
+            return True
+        if redis_client.get(self.leader_key) == self.token:
+            redis_client.expire(self.leader_key, ttl)
+            return True
+        return False
+
+    def publish(self, changes: List[Dict[str, Any]]) -> str:
+        pipe = get_redis().pipeline()
+        for change in changes:
+            pipe.xadd(
+                self.key,
+                {"change": json.dumps(change)},
+                maxlen=self.maxlen,
+                approximate=True,
+            )
+        return pipe.execute()[-1]
+
+    def since(self, cursor: Optional[str], limit: int = 500) -> Dict[str, Any]:
+        redis_client = get_redis()
+        if cursor is None:
+            last = redis_client.xrevrange(self.key, count=1)
+            return {
+                "changes": [],
+                "cursor": last[0][0] if last else "0-0",
+                "reset": False,
+            }
+        if not STREAM_ID.fullmatch(cursor):
+            # Redis would answer a malformed id with a ResponseError
+            raise ValueError(f"Invalid cursor {cursor}")
+        # XRANGE is inclusive, ask for one more and drop the cursor itself
+        entries = [
+            (entry_id, fields)
+            for entry_id, fields in redis_client.xrange(
+                self.key, min=cursor, count=limit + 1
+            )
+            if entry_id != cursor
+        ][:limit]
+        first = redis_client.xrange(self.key, count=1)
+        reset = (
+            cursor != "0-0"
+            and bool(first)
+            and _stream_id(first[0][0]) > _stream_id(cursor)
+        )
+        changes = [
+            {**json.loads(fields["change"]), "id": entry_id}
+            for entry_id, fields in entries
+        ]
+        return {
+            "changes": changes,
+            "cursor": changes[-1]["id"] if changes else cursor,
+            "reset": reset,
+        }
+
+
+def make_change_feed(term: str, workers: int = SERVER_WORKERS):
+    """
+    The feed SEAT_FEED asks for. Several workers always get the Redis feed: separate
+    memory feeds would each poll Banner and number their own cursors, so a client
+    polling different workers would skip or repeat changes.
+    """
+    if SEAT_FEED == "redis" or workers > 1:
+        if SEAT_FEED != "redis":
+            print(
+                f"SEAT_FEED={SEAT_FEED} with {workers} workers, using the Redis feed."
+            )
+        return RedisChangeFeed(term)
+    return MemoryChangeFeed()
+
+
+class SeatRefresher:
+    """
+    Keeps section rows of one term fresh without rerunning the scraper.
+    Every `interval` seconds the leader re-fetches the term's sections from Banner,
+    diffs Status/Max/Now (and added or removed sections) against the in-memory data,
+    and publishes the changes to the feed. Every process applies the feed to its own
+    course data, a course at a time: each course's term dict is rebuilt and swapped
+    in with one assignment, so readers never see a half-updated course. The rows
+    applied so far are kept as an overlay and applied again to every data version the
+    registry swaps in, which would otherwise start from the scraped sections.
+    """
+
+    def __init__(
+        self,
+        term: str,
+        feed,
+        data: Optional[DataVersion] = None,
+        base_url: str = BANNER_BASE_URL,
+        interval: float = SEAT_REFRESH_INTERVAL,
+        poll_interval: float = 5.0,
+        workers: int = 4,
+    ):
+        self.term = term
+        self.feed = feed
+        self._data = data
+        self.base_url = base_url
+        self.interval = interval
+        self.poll_interval = poll_interval
+        self.workers = workers
+        # local data is the baseline, only apply what is published from now on
+        self.cursor = feed.since(None)["cursor"]
+        self.last_refresh: Optional[float] = None
+        # course id -> section -> latest applied row, None once removed
+        self.overlay: Dict[str, Dict[str, Optional[Tuple[str, ...]]]] = {}
+        self._apply_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def data(self) -> DataVersion:
+        """The given data version, or the registry's current one after every reload."""
+        if self._data is not None:
+            return self._data
+        return registry.current()
+
+    @property
+    def courses(self) -> Dict[str, CourseInfoModel]:
+        return self.data.course_data
+
+    def fetch(self) -> Dict[str, Dict[str, Tuple[str, ...]]]:
+        """{course_id: {section: row}} for every course Banner lists this term."""
+        subjects = fetch_subj_list(self.term, base_url=self.base_url) or []
+
+        def fetch_subject(subject: str) -> List[Dict[str, Any]]:
+            try:
+                payload = fetch_courses(
+                    subject, self.term, max_results="500", base_url=self.base_url
+                )
+            except Exception as e:
+                print(f"Seat refresh: could not fetch {subject}: {e}")
+                return []
+            records = []
+            for html in section_html_blobs(payload):
+                records.extend(parse_sections_html(html))
+            return records
+
+        fetched: Dict[str, Dict[str, Tuple[str, ...]]] = {}
+        names = [item.get("SUBJECT") for item in subjects if item.get("SUBJECT")]
+        with ThreadPoolExecutor(max_workers=self.workers) as pool:
+            for records in pool.map(fetch_subject, names):
+                for record in records:
+                    # honors sections come as a second record for the same course
+                    sections = fetched.setdefault(record["course_id"], {})
+                    for key, row in record["sections"].items():
+                        sections[key] = tuple(row)
+        return fetched
+
+    def diff(
+        self, fetched: Dict[str, Dict[str, Tuple[str, ...]]]
+    ) -> List[Dict[str, Any]]:
+        changes = []
+        courses = self.courses
+        for course_id, sections in fetched.items():
+            info = courses.get(course_id)
+            if info is None:
+                # new courses need descriptions and trees, that's the scraper's job
+                continue
+            current = info.sections.get(self.term, {})
+            for key, row in sections.items():
+                old = current.get(key)
+                if old is None:
+                    changes.append(seat_change("added", course_id, key, row))
+                elif any(old[i] != row[i] for i in SEAT_FIELDS):
+                    merged = list(old)
+                    for i in SEAT_FIELDS:
+                        merged[i] = row[i]
+                    changes.append(
+                        seat_change("updated", course_id, key, tuple(merged))
+                    )
+            for key in current.keys() - sections.keys():
+                changes.append(seat_change("removed", course_id, key, None))
+        return changes
+
+    def _apply_rows(
+        self,
+        rows_by_course: Dict[str, Dict[str, Optional[Tuple[str, ...]]]],
+        data: DataVersion,
+    ) -> None:
+        for course_id, rows in rows_by_course.items():
+            info = data.course_data.get(course_id)
+            if info is None:
+                continue
+            sections = dict(info.sections.get(self.term, {}))
+            for key, row in rows.items():
+                if row is None:
+                    sections.pop(key, None)
+                else:
+                    sections[key] = row
+            if sections:
+                info.sections[self.term] = sections
+            else:
+                info.sections.pop(self.term, None)
+            # a course's first or last section in the term changes what's offered
+            data.offering_index.set_sections(course_id, self.term, len(sections))
+
+    def apply(self, changes: List[Dict[str, Any]]) -> None:
+        rows_by_course: Dict[str, Dict[str, Optional[Tuple[str, ...]]]] = {}
+        for change in changes:
+            row = None if change["kind"] == "removed" else tuple(change["row"])
+            rows_by_course.setdefault(change["course"], {})[change["section"]] = row
+        with self._apply_lock:
+            for course_id, rows in rows_by_course.items():
+                self.overlay.setdefault(course_id, {}).update(rows)
+            self._apply_rows(rows_by_course, self.data)
+
+    def reapply(self, data: DataVersion) -> None:
+        """Applies every row consumed so far to a newly loaded data version."""
+        with self._apply_lock:
+            self._apply_rows(self.overlay, data)
+
+    def catch_up(self) -> int:
+        applied = 0
+        while True:
+            page = self.feed.since(self.cursor, 1000)
+            if page["reset"]:
+                print("Seat refresh: fell behind the change feed, some updates missed.")
+            self.apply(page["changes"])
+            self.cursor = page["cursor"]
+            applied += len(page["changes"])
+            if len(page["changes"]) < 1000:
+                return applied
+
+    def refresh_once(self) -> int:
+        """Fetch, diff and publish one round. Returns how many changes were published."""
+        self.catch_up()
+        started = time.perf_counter()
+        changes = self.diff(self.fetch())
+        if changes:
+            self.feed.publish(changes)
+        self.catch_up()
+        self.last_refresh = time.time()
+        print(
+            f"Seat refresh for {self.term}: {len(changes)} changes "
+            f"in {time.perf_counter() - started:.1f}s"
+        )
+        return len(changes)
+
+    def _run(self) -> None:
+        next_refresh = 0.0
+        while not self._stop.is_set():
+            try:
+                if time.monotonic() >= next_refresh and self.feed.acquire_leader(
+                    int(self.interval * 2)
+                ):
+                    next_refresh = time.monotonic() + self.interval
+                    self.refresh_once()
+                else:
+                    self.catch_up()
+            except Exception as e:
+                print(f"Seat refresh error: {e}")
+            self._stop.wait(self.poll_interval)
+
+    def start(self) -> None:
+        if self._data is None:
+            registry.on_swap(self.reapply)
+        self._thread = threading.Thread(
+            target=self._run, daemon=True, name="seat-refresh"
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Refresh seat availability for one term and print the changes."
+    )
+    parser.add_argument("--term", type=str, required=True)
+    parser.add_argument("--base-url", type=str, default=BANNER_BASE_URL)
+    args = parser.parse_args()
+
+    refresher = SeatRefresher(args.term, MemoryChangeFeed(), base_url=args.base_url)
+    changes = refresher.diff(refresher.fetch())
+    for change in changes:
+        print(
+            f"{change['kind']:<8}{change['course']:<12}{change['section']:<6}"
+            f"{change.get('status', '')} {change.get('now', '')}/{change.get('max', '')}"
+        )
+    print(f"{len(changes)} changes")
@@ -0,0 +1,173 @@
+import base64
+import hashlib
+import json
+import re
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.constants import (
+    SEMANTIC_CACHE,
+    SEMANTIC_CACHE_MAX_ENTRIES,
+    SEMANTIC_CACHE_THRESHOLD,
+    SEMANTIC_CACHE_TTL,
+    UserFulfilled,
+    get_redis,
+)
+
+STATS_KEY = "semcache:stats"
+
+# messages that change (or report) the user's profile, the LLM has to handle these
+MUTATING_PATTERNS = [
+    r"\bi(?:'ve| have)? (?:took|taken|passed|failed|completed|finished|got|received|dropped|withdrew)\b",
+    r"\bi'?m (?:a |an )?(?:freshman|sophomore|junior|senior|grad)",
+    r"\bi am (?:a |an )?(?:freshman|sophomore|junior|senior|grad)",
+    r"\b(?:add|remove|delete|update|change|reset)\b",
+    r"\bmy (?:grade|standing|profile|courses|classes)\b",
+    r"\bequivalen",
+    r"\bsemesters? left\b",
+    r"\b(?:grade|got) (?:an? )?[a-f][+-]?\b",
+]
+_mutating = re.compile("|".join(MUTATING_PATTERNS), re.IGNORECASE)
+
+
+def bypass_reason(query: str, has_history: bool) -> Optional[str]:
+    """Why a message must not be answered from (or stored in) the cache, if it mustn't."""
+    if _mutating.search(query):
+        return "mutating"
+    if has_history:
+        # its meaning may depend on the conversation so far ("and the second one?",
+        # "what about Fridays"), which the cache key doesn't capture
+        return "history"
+    return None
+
+
+def profile_fingerprint(profile: UserFulfilled) -> str:
+    """Same for profiles that are equivalent for answering, whatever their order."""
+    canonical = {
+        "courses": sorted(
+            (name.upper(), info.grade) for name, info in profile.courses.items()
+        ),
+        "equivalents": sorted({e.upper() for e in profile.equivalents}),
+        "standing": profile.standing,
+        "semesters_left": profile.semesters_left,
+    }
+    return hashlib.sha1(
+        json.dumps(canonical, separators=(",", ":")).encode("utf-8")
+    ).hexdigest()[:20]
+
+
+def encode_vector(vector: np.ndarray) -> str:
+    return base64.b64encode(vector.astype(np.float16).tobytes()).decode("ascii")
+
+
+def decode_vector(text: str) -> np.ndarray:
+    return np.frombuffer(base64.b64decode(text), dtype=np.float16).astype(np.float32)
+
+
+def best_match(
+    query: np.ndarray, entries: Sequence[Dict], threshold: float
+) -> Optional[Tuple[Dict, float]]:
+    """The most similar entry at or above threshold. Vectors are unit length."""
+    if not entries:
+        return None
+    matrix = np.stack([decode_vector(e["embedding"]) for e in entries])
+    similarities = matrix @ query
+    i = int(np.argmax(similarities))
+    if similarities[i] < threshold:
+        return None
+    return entries[i], float(similarities[i])
+
+
+class SemanticCache:
+    """
+    Earlier chat answers, looked up by query embedding similarity. Entries are
+    bucketed by (data version, term, profile fingerprint) in a capped Redis list, so
+    an answer is only reused for users the LLM would have seen as identical. Only the
+    first message of a session is looked up and stored.
+    Disabled unless SEMANTIC_CACHE=1. Redis errors are logged and treated as misses.
+    """
+
+    def __init__(
+        self,
+        embed: Callable[[List[str]], np.ndarray],
+        enabled: bool = SEMANTIC_CACHE,
+        threshold: float = SEMANTIC_CACHE_THRESHOLD,
+        ttl: int = SEMANTIC_CACHE_TTL,
+        max_entries: int = SEMANTIC_CACHE_MAX_ENTRIES,
+    ):
+        self.embed = embed
+        self.enabled = enabled
+        self.threshold = threshold
+        self.ttl = ttl
+        self.max_entries = max_entries
+
+    def key(self, version: str, term: str, profile: UserFulfilled) -> str:
+        return f"semcache:{version[:16]}:{term}:{profile_fingerprint(profile)}"
+
+    def embed_query(self, query: str) -> np.ndarray:
+        vector = np.asarray(self.embed([" ".join(query.split())])[0], dtype=np.float32)
+        norm = np.linalg.norm(vector)
+        return vector / norm if norm else vector
+
+    def _count(self, field: str) -> None:
+        try:
+            get_redis().hincrby(STATS_KEY, field, 1)
+        except Exception:
+            pass
+
+    def lookup(
+        self, key: str, query: str, has_history: bool
+    ) -> Tuple[Optional[str], Optional[np.ndarray]]:
+        """
+        (cached answer or None, query embedding to store the answer with, or None
+        when the message bypasses the cache).
+        """
+        if not self.enabled:
+            return None, None
+        reason = bypass_reason(query, has_history)
+        if reason is not None:
+            self._count(f"bypass_{reason}")
+            return None, None
+        try:
+            vector = self.embed_query(query)
+            entries = [json.loads(e) for e in get_redis().lrange(key, 0, -1)]
+        except Exception as e:
+            print(f"Semantic cache unavailable: {e}")
+            return None, None
+        match = best_match(vector, entries, self.threshold)
+        if match is None:
+            self._count("misses")
+            return None, vector
+        self._count("hits")
+        return match[0]["answer"], None
+
+    def store(self, key: str, query: str, vector: np.ndarray, answer: str) -> None:
+        entry = {
+            "query": query,
+            "embedding": encode_vector(vector),
+            "answer": answer,
+            "created": time.time(),
+        }
+        try:
+            pipe = get_redis().pipeline()
+            pipe.lpush(key, json.dumps(entry))
+            pipe.ltrim(key, 0, self.max_entries - 1)
+            pipe.expire(key, self.ttl)
+            length = pipe.execute()[0]
+        except Exception as e:
+            print(f"Semantic cache unavailable: {e}")
+            return
+        self._count("stored")
+        if length > self.max_entries:
+            self._count("evicted")
+
+    def stats(self) -> Dict[str, float]:
+        try:
+            counts = {k: int(v) for k, v in get_redis().hgetall(STATS_KEY).items()}
+        except Exception:
+            return {}
+        looked_up = counts.get("hits", 0) + counts.get("misses", 0)
+        counts["hit_rate"] = (
+            round(counts.get("hits", 0) / looked_up, 3) if looked_up else 0.0
+        )
+        return counts
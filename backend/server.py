@@ -1,12 +1,37 @@
-from backend.functions import initialize_database
-from backend.functions import gemini_call
+from backend.functions import release_chroma, response_cache
+from backend.functions import gemini_call, load_prereqs
 from backend.constants import ChatRequest
 from backend.constants import ChatResponse
-from fastapi import FastAPI, HTTPException
+from backend.constants import EligibilityRequest, PlanRequest, TermCode
+from backend.constants import SERVER_HOST, SERVER_PORT, SERVER_WORKERS
+from backend.constants import SEAT_REFRESH_TERM
+from backend.constants import ADMIN_TOKEN, DATA_WATCH_INTERVAL
+from backend.eligibility import eligibility_index
+from backend.graph_index import Direction, graph_etag
+from backend.inference import configure_threads
+from backend.planner import plan_degree
+from backend.registry import SharedBuildLock, registry
+from backend.query_cache import query_cache
+from backend.sessions import session_store
+from backend.shaping import shaping_stats
+from backend.timing import memory_usage, server_timing, start_request
+from backend.profiling import load_profile, profile_call, slow_sampler, store_profile
+from backend.seats import SeatRefresher, make_change_feed
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
 from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
+import gc
+import os
+import signal
+import socket
+import sys
+import time
+import traceback
 import uvicorn
+from typing import Dict, List, Literal, Optional
+import json
 from backend.constants import GEMINI_API_KEY
+from backend.admission import Rejected, chat_admission
 
 app = FastAPI()
 origins = ["http://localhost:3000", "https://flownjit.com"]
@@ -17,19 +42,380 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
-initialize_database()
+# course data, indexes and the vector store of the first data version
+registry.load()
+
+# per worker process, reported by /health
+request_count = 0
+# started per worker, after the fork
+seat_refresher: Optional[SeatRefresher] = None
+
+
+@app.on_event("startup")
+async def start_seat_refresher():
+    global seat_refresher
+    if SEAT_REFRESH_TERM:
+        seat_refresher = SeatRefresher(
+            SEAT_REFRESH_TERM, make_change_feed(SEAT_REFRESH_TERM)
+        )
+        seat_refresher.start()
+
+
+@app.on_event("startup")
+async def start_data_watcher():
+    # per worker, each one reloads its own copy when graph.json changes; with several
+    # workers only one syncs Chroma, the rest swap in once it's done (SharedBuildLock)
+    registry.watch(DATA_WATCH_INTERVAL)
+
+
+def require_admin(token: Optional[str]) -> None:
+    if not ADMIN_TOKEN or token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Forbidden")
 
 
 @app.post("/chat", response_model=ChatResponse)
-async def chat_endpoint(request: ChatRequest):
-    response = await run_in_threadpool(
-        gemini_call, request.query, request.sessionID, request.term
-    )
+async def chat_endpoint(
+    request: ChatRequest,
+    raw_request: Request,
+    http_response: Response,
+    x_profile: Optional[str] = Header(None),
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    X-Profile: 1 (with X-Admin-Token) profiles this request, see /admin/profiles.
+    Over the worker's concurrency, queue or rate limits this answers 429 with
+    Retry-After.
+    """
+    global request_count
+    request_count += 1
+    stages = start_request()
+    call = slow_sampler.wrap("/chat", gemini_call)
+    args = (request.query, request.sessionID, request.term)
+    client_ip = raw_request.client.host if raw_request.client else None
+    if x_profile:
+        require_admin(x_admin_token)
+    try:
+        async with chat_admission.admit(request.sessionID, client_ip) as waited_ms:
+            stages["admission"] = waited_ms
+            if x_profile:
+                response, profile = await run_in_threadpool(profile_call, call, *args)
+                profile.update(path="/chat", stages=stages)
+                http_response.headers["X-Profile-Id"] = await run_in_threadpool(
+                    store_profile, profile
+                )
+            else:
+                response = await run_in_threadpool(call, *args)
+    except Rejected as e:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests ({e.reason}), retry later",
+            headers={"Retry-After": e.retry_after_header},
+        )
+    http_response.headers["Server-Timing"] = server_timing(stages)
     return {"response": response}
 
 
+@app.get("/courses/{course_id}/graph")
+async def course_graph(
+    course_id: str,
+    request: Request,
+    direction: Direction = "ancestors",
+    depth: Optional[int] = Query(None, ge=1),
+):
+    """
+    Prerequisite (ancestors) or dependent (descendants) subgraph of one course, so the
+    frontend doesn't need the whole graph.json to draw it.
+    """
+    data = registry.current()
+    resolved = data.prereq_graph.resolve(course_id)
+    if resolved is None:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+
+    headers = {
+        "ETag": graph_etag(data.version, resolved, direction, depth),
+        "Cache-Control": "public, max-age=3600",
+    }
+    if request.headers.get("if-none-match") == headers["ETag"]:
+        return Response(status_code=304, headers=headers)
+    body = data.prereq_graph.subgraph(resolved, direction, depth)
+    return Response(
+        json.dumps(body, separators=(",", ":")),
+        media_type="application/json",
+        headers=headers,
+    )
+
+
+@app.get("/courses/{course_id}/offerings")
+async def course_offerings(
+    course_id: str,
+    term: List[TermCode] = Query(default=[]),
+):
+    """Past offerings per semester type, plus the predicted chance for each ?term=."""
+    data = registry.current()
+    offering_index = data.offering_index
+    resolved = data.prereq_graph.resolve(course_id)
+    if resolved is None or resolved not in offering_index.masks:
+        raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+    summary = offering_index.summary(resolved)
+    summary["predictions"] = {
+        t: round(offering_index.predict(resolved, t), 2) for t in term
+    }
+    return summary
+
+
+@app.get("/sections/changes")
+async def section_changes(
+    since: Optional[str] = None, limit: int = Query(500, ge=1, le=5000)
+):
+    """
+    Seat changes after the `since` cursor, oldest first. Call without `since` to get
+    the current cursor, then poll with the returned one. reset=true means changes
+    were dropped and the client should reload its section data.
+    """
+    if seat_refresher is None:
+        raise HTTPException(status_code=404, detail="Seat refresh is not enabled")
+    try:
+        return await run_in_threadpool(seat_refresher.feed.since, since, limit)
+    except ValueError:
+        raise HTTPException(status_code=400, detail=f"Invalid cursor {since}")
+
+
+@app.post("/plan")
+async def plan_endpoint(request: PlanRequest):
+    data = registry.current()
+    targets = []
+    for course_id in request.targets:
+        resolved = data.prereq_graph.resolve(course_id)
+        if resolved is None:
+            raise HTTPException(status_code=404, detail=f"Unknown course {course_id}")
+        targets.append(resolved)
+    if not request.start_term:
+        raise HTTPException(status_code=422, detail="start_term is required")
+
+    return await run_in_threadpool(
+        plan_degree,
+        request.profile,
+        targets,
+        request.start_term,
+        max_terms=request.max_terms,
+        max_credits=request.max_credits,
+        include_summer=request.include_summer,
+        include_winter=request.include_winter,
+        time_budget=request.time_budget_ms / 1000,
+        data=data,
+    )
+
+
+@app.post("/eligibility")
+async def eligibility_endpoint(request: EligibilityRequest):
+    """
+    taken / eligible / blocked / unknown for each course and every course of
+    `department`, against the given profile or the chat session's. reasons=true adds
+    why each blocked course is blocked.
+    """
+    data = registry.current()
+    index = eligibility_index(data)
+    if request.profile is not None:
+        profile = request.profile
+    elif request.sessionID:
+        session = await run_in_threadpool(session_store.load, request.sessionID)
+        profile = load_prereqs(session["prereqs"])
+    else:
+        raise HTTPException(status_code=422, detail="profile or sessionID is required")
+
+    course_ids = list(request.courses)
+    if request.department:
+        course_ids += index.by_subject.get(request.department.strip().upper(), [])
+    statuses = index.statuses(profile, course_ids)
+    body = {"data_version": data.version, "statuses": statuses}
+    if request.reasons:
+        body["reasons"] = index.reasons(profile, statuses)
+    return body
+
+
+@app.post("/admin/reload")
+async def reload_data(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """
+    Reloads graph.json in this worker without a restart. In-flight requests finish on
+    the version they started with. Other workers pick the file up with their watcher.
+    """
+    require_admin(x_admin_token)
+    try:
+        data = await run_in_threadpool(registry.reload, force)
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Reload failed: {e}")
+    current = registry.current()
+    return {
+        "reloaded": data is not None,
+        "version": current.version,
+        "courses": len(current.course_data),
+        "pid": os.getpid(),
+    }
+
+
+@app.get("/admin/profiles/slow")
+async def slow_profiles(x_admin_token: Optional[str] = Header(None)):
+    """This worker's slowest requests of the last sampling window, with profile ids."""
+    require_admin(x_admin_token)
+    return {"pid": os.getpid(), "requests": slow_sampler.recent()}
+
+
+@app.get("/admin/profiles/{profile_id}")
+async def get_profile(
+    profile_id: str,
+    format: Literal["json", "text", "html"] = "json",
+    x_admin_token: Optional[str] = Header(None),
+):
+    """
+    A stored profile. text is pyinstrument's or cProfile's report, or collapsed stacks
+    (flamegraph.pl, speedscope) for the sampler's; html only exists for pyinstrument.
+    """
+    require_admin(x_admin_token)
+    profile = await run_in_threadpool(load_profile, profile_id)
+    if profile is None:
+        raise HTTPException(status_code=404, detail=f"Unknown profile {profile_id}")
+    if format == "json":
+        return profile
+    if format not in profile:
+        raise HTTPException(status_code=404, detail=f"No {format} for this profile")
+    media_type = "text/html" if format == "html" else "text/plain"
+    return Response(profile[format], media_type=media_type)
+
+
+@app.get("/health")
+async def health():
+    return {
+        "pid": os.getpid(),
+        "requests": request_count,
+        "data_version": registry.current().version,
+        "query_cache": query_cache.stats(),
+        "response_cache": response_cache.stats(),
+        "admission": chat_admission.stats(),
+        "sessions": session_store.stats(),
+        "tool_results": shaping_stats.stats(),
+        **memory_usage(),
+    }
+
+
+# a worker that exits sooner than this after starting counts as a startup failure;
+# the slot is restarted with a growing delay, and given up after this many in a row
+WORKER_MIN_UPTIME = 5.0
+WORKER_MAX_QUICK_EXITS = 5
+
+
+def _serve_worker(sock: socket.socket) -> None:
+    # torch's thread pool does not survive fork, size it again in the child
+    configure_threads()
+    server = uvicorn.Server(uvicorn.Config(app, log_level="info"))
+    server.run(sockets=[sock])
+
+
+def serve_forked(
+    workers: int = SERVER_WORKERS, host: str = SERVER_HOST, port: int = SERVER_PORT
+) -> None:
+    """
+    Pre-fork server. Course data, indexes and models are already loaded by this
+    (master) process when the module is imported; the workers are forked from it so
+    those pages are shared copy-on-write. Objects are moved to the GC's permanent
+    generation first, so collections in the workers don't write to every shared page.
+    Redis, Chroma and Gemini clients are created in each worker on first use.
+    Crashed workers are replaced, with a backoff if they die right after starting;
+    a slot failing repeatedly at startup is left empty. SIGINT/SIGTERM stop all.
+    Only one worker writes Chroma for a new graph.json, see SharedBuildLock.
+
+    The startup hooks run in every worker, so background work grows with the worker
+    count: every worker stats graph.json each DATA_WATCH_INTERVAL and rebuilds its
+    own in-memory indexes on a change, and every worker runs a seat refresher on the
+    Redis feed, where only the leader polls Banner and the rest read the stream each
+    poll interval. python -m backend.benchmarks.prefork measures memory and
+    throughput per worker count.
+    """
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(2048)
+    sock.set_inheritable(True)
+
+    registry.shared_lock = SharedBuildLock()
+    release_chroma()
+    gc.collect()
+    gc.freeze()
+
+    children: Dict[int, int] = {}
+    # slot -> when its worker was forked, and how many in a row died right after
+    started: Dict[int, float] = {}
+    quick_exits: Dict[int, int] = {}
+    stopping = False
+
+    def spawn(slot: int) -> None:
+        pid = os.fork()
+        if pid == 0:
+            signal.signal(signal.SIGINT, signal.SIG_DFL)
+            signal.signal(signal.SIGTERM, signal.SIG_DFL)
+            code = 0
+            try:
+                _serve_worker(sock)
+            except SystemExit as e:
+                # uvicorn exits with a status when it can't start
+                code = e.code if isinstance(e.code, int) else 1
+            except BaseException:
+                traceback.print_exc()
+                code = 1
+            finally:
+                # flush the traceback, os._exit skips the interpreter's cleanup
+                sys.stderr.flush()
+                os._exit(code)
+        children[pid] = slot
+        started[slot] = time.monotonic()
+
+    def stop(signum, frame) -> None:
+        nonlocal stopping
+        stopping = True
+        for pid in list(children):
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+
+    signal.signal(signal.SIGINT, stop)
+    signal.signal(signal.SIGTERM, stop)
+
+    print(f"Serving on http://{host}:{port} with {workers} workers")
+    for slot in range(workers):
+        spawn(slot)
+
+    while children:
+        try:
+            pid, status = os.wait()
+        except ChildProcessError:
+            break
+        slot = children.pop(pid, None)
+        if slot is None or stopping:
+            continue
+        if time.monotonic() - started[slot] < WORKER_MIN_UPTIME:
+            quick_exits[slot] = quick_exits.get(slot, 0) + 1
+        else:
+            quick_exits[slot] = 0
+        if quick_exits[slot] > WORKER_MAX_QUICK_EXITS:
+            print(
+                f"Worker {pid} exited ({status}) within {WORKER_MIN_UPTIME:.0f}s "
+                f"of starting {quick_exits[slot]} times in a row, not restarting it"
+            )
+            continue
+        # 0s after a worker that ran for a while, then 1s, 2s, 4s...
+        delay = 2 ** (quick_exits[slot] - 1) if quick_exits[slot] else 0
+        print(f"Worker {pid} exited ({status}), restarting in {delay}s...")
+        time.sleep(delay)
+        if not stopping:
+            spawn(slot)
+    sock.close()
+
+
 def start():
-    uvicorn.run(app, host="127.0.0.1", port=3001)
+    if SERVER_WORKERS > 1:
+        serve_forked()
+    else:
+        uvicorn.run(app, host=SERVER_HOST, port=SERVER_PORT)
 
 
 if __name__ == "__main__":
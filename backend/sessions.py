@@ -0,0 +1,148 @@
+import json
+from typing import Any, Dict, List, Optional
+import redis
+from backend.constants import SESSION_SAVE_RETRIES, get_redis
+
+
+def profile_delta(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    What one chat turn changed in a profile (UserFulfilled dumped to JSON): courses set
+    (None for removed), equivalents added/removed and the scalar fields that changed.
+    """
+    delta: Dict[str, Any] = {}
+    courses = {
+        name: info
+        for name, info in after.get("courses", {}).items()
+        if before.get("courses", {}).get(name) != info
+    }
+    for name in before.get("courses", {}):
+        if name not in after.get("courses", {}):
+            courses[name] = None
+    if courses:
+        delta["courses"] = courses
+    before_equivalents = before.get("equivalents", [])
+    after_equivalents = after.get("equivalents", [])
+    added = [e for e in after_equivalents if e not in before_equivalents]
+    removed = [e for e in before_equivalents if e not in after_equivalents]
+    if added:
+        delta["equivalents_added"] = added
+    if removed:
+        delta["equivalents_removed"] = removed
+    for key in ("standing", "semesters_left"):
+        if before.get(key) != after.get(key):
+            delta[key] = after.get(key)
+    return delta
+
+
+def apply_delta(profile: Dict[str, Any], delta: Dict[str, Any]) -> Dict[str, Any]:
+    """The delta of one turn replayed onto a (newer) profile; the turn wins on overlap."""
+    merged = json.loads(json.dumps(profile))
+    merged.setdefault("courses", {})
+    merged.setdefault("equivalents", [])
+    for name, info in delta.get("courses", {}).items():
+        if info is None:
+            merged["courses"].pop(name, None)
+        else:
+            merged["courses"][name] = info
+    removed = set(delta.get("equivalents_removed", []))
+    merged["equivalents"] = [e for e in merged["equivalents"] if e not in removed]
+    for equivalent in delta.get("equivalents_added", []):
+        if equivalent not in merged["equivalents"]:
+            merged["equivalents"].append(equivalent)
+    for key in ("standing", "semesters_left"):
+        if key in delta:
+            merged[key] = delta[key]
+    return merged
+
+
+class SessionStore:
+    """
+    A chat session's history and profile in Redis, next to a version counter bumped by
+    every save. A turn loads all three, runs for seconds, then saves with WATCH on the
+    version: when nobody saved in between its state is written as is, otherwise the
+    turn's new messages are appended to the latest history and its profile delta is
+    applied to the latest profile, so overlapping requests of one session (double
+    submits, several tabs) don't overwrite each other. Counts are per worker.
+    """
+
+    def __init__(
+        self,
+        client: Optional[redis.Redis] = None,
+        retries: int = SESSION_SAVE_RETRIES,
+    ):
+        self._client = client
+        self.retries = retries
+        self.counts = {"saves": 0, "merged": 0, "retries": 0, "failed": 0}
+
+    @property
+    def client(self) -> redis.Redis:
+        return self._client or get_redis()
+
+    @staticmethod
+    def keys(session_id: str) -> List[str]:
+        return [
+            f"{session_id}:history",
+            f"{session_id}:prereqs",
+            f"{session_id}:version",
+        ]
+
+    def load(self, session_id: str) -> Dict[str, Any]:
+        """{"history": raw JSON or None, "prereqs": raw JSON or None, "version": int}"""
+        history, prereqs, version = self.client.mget(self.keys(session_id))
+        return {"history": history, "prereqs": prereqs, "version": int(version or 0)}
+
+    def save(
+        self,
+        session_id: str,
+        loaded: Dict[str, Any],
+        new_messages: List[Dict[str, Any]],
+        profile_before: Dict[str, Any],
+        profile_after: Dict[str, Any],
+    ) -> Dict[str, Any]:
+        """
+        Appends new_messages (dumped Contents) and the profile change of this turn.
+        Returns the saved state; raises WatchError after `retries` conflicting saves.
+        """
+        history_key, prereqs_key, version_key = self.keys(session_id)
+        delta = profile_delta(profile_before, profile_after)
+        merged = False
+        attempt = 0
+        with self.client.pipeline() as pipe:
+            while True:
+                try:
+                    pipe.watch(version_key)
+                    version = int(pipe.get(version_key) or 0)
+                    if version == loaded["version"]:
+                        history = json.loads(loaded["history"] or "[]")
+                        profile = profile_after
+                    else:
+                        # another request of this session saved since we loaded
+                        merged = True
+                        history = json.loads(pipe.get(history_key) or "[]")
+                        latest = pipe.get(prereqs_key)
+                        profile = apply_delta(
+                            json.loads(latest) if latest else profile_before, delta
+                        )
+                    history += new_messages
+                    pipe.multi()
+                    pipe.set(history_key, json.dumps(history))
+                    pipe.set(prereqs_key, json.dumps(profile))
+                    pipe.incr(version_key)
+                    pipe.execute()
+                    break
+                except redis.WatchError:
+                    # a save landed between our WATCH and EXEC, merge onto that one
+                    if attempt == self.retries:
+                        self.counts["failed"] += 1
+                        raise
+                    attempt += 1
+                    self.counts["retries"] += 1
+        self.counts["saves"] += 1
+        self.counts["merged"] += merged
+        return {"history": history, "profile": profile, "version": version + 1}
+
+    def stats(self) -> Dict[str, int]:
+        return dict(self.counts)
+
+
+session_store = SessionStore()
@@ -0,0 +1,216 @@
+import functools
+import json
+import threading
+from typing import Any, Callable, Dict, Optional
+from backend.constants import (
+    TOOL_DESC_CHARS,
+    TOOL_MAX_SCHEDULES,
+    TOOL_RESULT_BUDGET,
+    TOOL_RESULT_SHAPING,
+)
+from backend.registry import DataVersion
+
+# bytes of JSON per tool, TOOL_RESULT_BUDGET for the others
+BUDGETS: Dict[str, int] = {
+    "course_query": TOOL_RESULT_BUDGET,
+    "make_schedule": TOOL_RESULT_BUDGET // 2,
+    "plan_degree": TOOL_RESULT_BUDGET + TOOL_RESULT_BUDGET // 2,
+    "get_course_details": 2 * TOOL_RESULT_BUDGET,
+}
+
+
+def result_size(result: Any) -> int:
+    """Bytes of the result as JSON, what the SDK sends back to the model."""
+    return len(json.dumps(result, separators=(",", ":"), default=str))
+
+
+def estimate_tokens(size: int) -> int:
+    # about four bytes a token for English and JSON
+    return size // 4
+
+
+def truncate(text: str, limit: int) -> str:
+    if len(text) <= limit:
+        return text
+    cut = text[:limit].rsplit(" ", 1)[0]
+    return cut.rstrip(" ,.;:") + "..."
+
+
+def section_summary(course: str, section: Dict[str, Any]) -> str:
+    """`CS 280-002 #12345 MW 10:00 AM - 11:20 AM, Smith` from a make_schedule section."""
+    return (
+        f"{course}-{section['section_id']} #{section['crn']} {section['days']} "
+        f"{section['times']}, {section['instructor']}"
+    )
+
+
+def fit_budget(result: Any, budget: int) -> Any:
+    """
+    Drops items from the end of the result's longest list until it fits in budget
+    bytes, noting how many were left out. Results without lists are returned as is.
+    """
+    if budget <= 0 or result_size(result) <= budget:
+        return result
+    if isinstance(result, list):
+        items, wrapper = list(result), None
+    elif isinstance(result, dict):
+        lists = [k for k, v in result.items() if isinstance(v, list) and v]
+        if not lists:
+            return result
+        key = max(lists, key=lambda k: result_size(result[k]))
+        items, wrapper = list(result[key]), key
+    else:
+        return result
+
+    omitted = 0
+    while items:
+        items.pop()
+        omitted += 1
+        shaped = items if wrapper is None else {**result, wrapper: items}
+        if result_size(shaped) <= budget:
+            break
+    if wrapper is None:
+        return {"items": items, "omitted": omitted}
+    return {**result, wrapper: items, "omitted": omitted}
+
+
+def shape_course_query(result: Any, data: DataVersion, term: str) -> Any:
+    if not isinstance(result, dict):
+        return result
+    courses = data.course_data
+    shaped = []
+    for item in result.get("search_result", []):
+        course = courses[item["id"]]
+        shaped.append(
+            {
+                "id": item["id"],
+                "title": course.title,
+                "desc": truncate(course.desc, TOOL_DESC_CHARS),
+                "score": round(item["score"], 3),
+            }
+        )
+    return {
+        "search_result": shaped,
+        "message_to_relay_to_user": result.get("message_to_relay_to_user"),
+        "details": "Descriptions are shortened, get_course_details has the full ones.",
+    }
+
+
+def shape_profile(result: Any, data: DataVersion, term: str) -> Any:
+    if not isinstance(result, dict):
+        return result
+    shaped: Dict[str, Any] = {
+        "courses": {
+            name: info["grade"] for name, info in result.get("courses", {}).items()
+        }
+    }
+    for key in ("equivalents", "standing", "semesters_left"):
+        if result.get(key):
+            shaped[key] = result[key]
+    return shaped
+
+
+def shape_schedules(result: Any, data: DataVersion, term: str) -> Any:
+    if not isinstance(result, dict) or not result.get("schedules"):
+        return result
+    # fewest days first, every schedule here already fits max_days
+    schedules = sorted(result["schedules"], key=lambda s: s["num_days"])
+    shaped = {k: v for k, v in result.items() if k != "schedules" and v is not None}
+    shaped["schedules"] = [
+        {
+            "days": "".join(schedule["days_used"]),
+            "sections": [
+                section_summary(section["course"], section)
+                for section in schedule["sections"]
+            ],
+        }
+        for schedule in schedules[:TOOL_MAX_SCHEDULES]
+    ]
+    shaped["shown"] = len(shaped["schedules"])
+    return shaped
+
+
+def shape_plan(result: Any, data: DataVersion, term: str) -> Any:
+    if not isinstance(result, dict):
+        return result
+    return {k: v for k, v in result.items() if v not in (None, [], {})}
+
+
+SHAPERS: Dict[str, Callable[[Any, DataVersion, str], Any]] = {
+    "course_query": shape_course_query,
+    "update_user_profile": shape_profile,
+    "make_schedule": shape_schedules,
+    "plan_degree": shape_plan,
+}
+
+
+class ShapingStats:
+    """
+    Per worker: JSON bytes of tool results before and after shaping, and the prompt
+    tokens of the final model call of each chat turn, which include every tool result
+    and the history. Compare runs with TOOL_RESULT_SHAPING=full and compact.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.tools: Dict[str, Dict[str, int]] = {}
+        self.turns = 0
+        self.prompt_tokens = 0
+
+    def record_tool(self, name: str, full: int, shaped: int) -> None:
+        with self._lock:
+            row = self.tools.setdefault(
+                name, {"calls": 0, "full_bytes": 0, "shaped_bytes": 0}
+            )
+            row["calls"] += 1
+            row["full_bytes"] += full
+            row["shaped_bytes"] += shaped
+
+    def record_turn(self, prompt_tokens: Optional[int]) -> None:
+        if prompt_tokens:
+            with self._lock:
+                self.turns += 1
+                self.prompt_tokens += prompt_tokens
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "mode": TOOL_RESULT_SHAPING,
+                "turns": self.turns,
+                "prompt_tokens_per_turn": (
+                    round(self.prompt_tokens / self.turns) if self.turns else 0
+                ),
+                "tools": {
+                    name: {
+                        **row,
+                        "saved_tokens": estimate_tokens(
+                            row["full_bytes"] - row["shaped_bytes"]
+                        ),
+                    }
+                    for name, row in self.tools.items()
+                },
+            }
+
+
+shaping_stats = ShapingStats()
+
+
+def shape_tool(
+    tool: Callable, data: DataVersion, term: str, mode: str = TOOL_RESULT_SHAPING
+) -> Callable:
+    """The tool with its result shaped and held to its budget, keeping the signature."""
+    shaper = SHAPERS.get(tool.__name__)
+    budget = BUDGETS.get(tool.__name__, TOOL_RESULT_BUDGET)
+
+    @functools.wraps(tool)
+    def shaped(args):
+        result = tool(args)
+        full = result_size(result)
+        if mode == "compact":
+            if shaper is not None:
+                result = shaper(result, data, term)
+            result = fit_budget(result, budget)
+        shaping_stats.record_tool(tool.__name__, full, result_size(result))
+        return result
+
+    return shaped
@@ -0,0 +1,112 @@
+import sys
+import os
+import asyncio
+import time
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.admission import AdmissionController, RateLimiter, Rejected
+
+
+def controller(**kwargs):
+    defaults = dict(
+        max_concurrency=2,
+        queue_size=2,
+        queue_timeout=5,
+        ip_limiter=RateLimiter(0, 0),
+        session_limiter=RateLimiter(0, 0),
+    )
+    return AdmissionController(**{**defaults, **kwargs})
+
+
+def test_rate_limiter_refills():
+    limiter = RateLimiter(rate=2, burst=2)
+    assert limiter.take("a", now=0) == 0
+    assert limiter.take("a", now=0) == 0
+    assert limiter.take("a", now=0) == pytest.approx(0.5)
+    assert limiter.take("b", now=0) == 0
+    assert limiter.take("a", now=1) == 0
+
+
+def test_concurrency_cap_and_bounded_queue():
+    admission = controller()
+    running = []
+    peak = []
+
+    async def request(session_id):
+        try:
+            async with admission.admit(session_id):
+                running.append(session_id)
+                peak.append(len(running))
+                await asyncio.sleep(0.05)
+                running.remove(session_id)
+                return "ok"
+        except Rejected as e:
+            return e.reason
+
+    async def main():
+        return await asyncio.gather(*(request(f"s{i}") for i in range(6)))
+
+    results = asyncio.run(main())
+    # two run, two wait, two find the queue full
+    assert results.count("ok") == 4
+    assert results.count("queue_full") == 2
+    assert max(peak) == 2
+    stats = admission.stats()
+    assert stats["active"] == 0 and stats["queued"] == 0
+    assert stats["admitted"] == 4 and stats["rejected_queue_full"] == 2
+
+
+def test_same_session_runs_serially_and_deadline_rejects():
+    admission = controller(max_concurrency=4, queue_timeout=0.5)
+    order = []
+
+    async def request(i, hold):
+        try:
+            async with admission.admit("same"):
+                order.append(("start", i))
+                await asyncio.sleep(hold)
+                order.append(("end", i))
+                return "ok"
+        except Rejected as e:
+            return e.reason
+
+    async def main():
+        first = asyncio.create_task(request(0, 0.05))
+        await asyncio.sleep(0)
+        second = await request(1, 0.0)
+        # outlives the deadline of the request behind it
+        slow = asyncio.create_task(request(2, 1.0))
+        await asyncio.sleep(0)
+        late = await request(3, 0.0)
+        await slow
+        return await first, second, late
+
+    assert asyncio.run(main()) == ("ok", "ok", "timeout")
+    assert order[:4] == [("start", 0), ("end", 0), ("start", 1), ("end", 1)]
+
+
+def test_slot_handed_over_as_the_wait_times_out_is_passed_on(monkeypatch):
+    admission = controller(max_concurrency=1, queue_size=2)
+
+    async def wait_for(waiter, timeout):
+        # the holder finishes and hands its slot over in the same loop iteration the
+        # timeout fires
+        admission._release_slot()
+        assert waiter.done()
+        raise asyncio.TimeoutError
+
+    async def main():
+        deadline = time.monotonic() + 5
+        await admission._acquire_slot(deadline)
+        monkeypatch.setattr(asyncio, "wait_for", wait_for)
+        with pytest.raises(Rejected) as rejected:
+            await admission._acquire_slot(deadline)
+        assert rejected.value.reason == "timeout"
+
+    asyncio.run(main())
+    # nobody holds a slot, none leaked
+    stats = admission.stats()
+    assert stats["active"] == 0 and stats["queued"] == 0
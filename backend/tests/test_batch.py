@@ -0,0 +1,78 @@
+import sys
+import os
+import json
+import subprocess
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.batch import run_batch
+from backend.benchmarks.catalog import generate_catalog
+from backend.constants import validate_course_data
+from backend.registry import DataVersion, registry
+
+DATA = DataVersion(validate_course_data(generate_catalog(0.1, seed=3)), "test")
+ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "../.."))
+
+
+def request_lines():
+    courses = sorted(DATA.course_data)
+    lines = []
+    for i, course_id in enumerate(courses[:40]):
+        if i % 2:
+            params = {"course_name": course_id, "profile": {}}
+            lines.append({"id": i, "method": "can_take_course", "params": params})
+        else:
+            params = {"courses": [course_id], "reasons": True}
+            lines.append({"id": i, "method": "eligibility", "params": params})
+    return [json.dumps(line) for line in lines]
+
+
+def test_results_come_back_in_input_order(monkeypatch):
+    monkeypatch.setattr(registry, "_current", DATA)
+    lines = request_lines()
+    # blank lines are skipped, not answered
+    lines.insert(5, "")
+    single = [json.loads(r) for r in run_batch(lines)]
+    assert [r["id"] for r in single] == list(range(40))
+    assert all("error" not in r for r in single)
+
+    # workers fork with the parent's data, a small chunk size interleaves them
+    forked = [json.loads(r) for r in run_batch(lines, workers=2, chunk_size=3)]
+    assert forked == single
+
+
+def test_bad_lines_are_error_results(monkeypatch):
+    monkeypatch.setattr(registry, "_current", DATA)
+    lines = [
+        "{not json",
+        json.dumps({"id": "a", "method": "drop_course", "params": {}}),
+        json.dumps({"id": "b", "method": "can_take_course", "params": {}}),
+        json.dumps({"id": "c", "method": "make_schedule", "params": {"courses": []}}),
+        json.dumps(
+            {"id": "d", "method": "can_take_course", "params": {"course_name": "ZZ 1"}}
+        ),
+    ]
+    results = [json.loads(r) for r in run_batch(lines)]
+    assert results[0]["id"] is None and "error" in results[0]
+    assert results[1] == {"id": "a", "error": "Unknown method drop_course"}
+    assert results[2]["id"] == "b" and "course_name" in results[2]["error"]
+    assert "needs a term" in results[3]["error"]
+    assert results[4]["result"] == {"error_message": "Unknown course ZZ 1"}
+
+
+def test_import_keeps_the_chat_stack_out():
+    heavy = ["backend.functions", "chromadb", "sentence_transformers", "google.genai"]
+    script = (
+        "import sys, backend.batch\n"
+        f"print([m for m in {heavy!r} if m in sys.modules])\n"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", script],
+        cwd=ROOT,
+        capture_output=True,
+        text=True,
+        check=True,
+    ).stdout
+    # the last line, after any warning about missing data files
+    assert out.strip().splitlines()[-1] == "[]"
@@ -0,0 +1,26 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.benchmarks.catalog import NJIT_COURSES, generate_catalog
+from backend.constants import validate_course_data
+from backend.graph_index import PrereqGraph, tree_course_refs
+
+
+def test_catalog_is_seeded_and_valid():
+    catalog = generate_catalog(0.25, seed=3)
+    assert catalog == generate_catalog(0.25, seed=3)
+    assert catalog != generate_catalog(0.25, seed=4)
+    assert len(catalog) == round(0.25 * NJIT_COURSES)
+
+    courses = validate_course_data(catalog)
+    graph = PrereqGraph(courses)
+    for course_id, info in courses.items():
+        refs = set(tree_course_refs(info.prereq_tree))
+        # prerequisites exist and are lower level, so the graph is acyclic
+        assert refs <= set(courses)
+        assert all(int(r.split()[1]) < int(course_id.split()[1]) for r in refs)
+        assert course_id not in graph.closure(course_id, "ancestors")
+    assert any(info.sections for info in courses.values())
@@ -0,0 +1,107 @@
+import sys
+import os
+import random
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend import cohort as cohort_module
+from backend.benchmarks.catalog import generate_catalog
+from backend.cohort import Cohort, analyze
+from backend.constants import UserFulfilled, validate_course_data
+from backend.eligibility import eligibility_index
+from backend.registry import DataVersion
+
+DATA = DataVersion(validate_course_data(generate_catalog(0.1, seed=3)), "test")
+GRADES = ["A", "B+", "B", "C+", "C", "F"]
+
+
+def random_rows(students=60, seed=0):
+    rng = random.Random(seed)
+    courses = sorted(DATA.course_data)
+    rows = []
+    for s in range(students):
+        standing = rng.choice(["", "FRESHMAN", "JUNIOR", "SENIOR", "GRAD"])
+        semesters_left = rng.choice(["", "1", "4"])
+        for course_id in rng.sample(courses, rng.randint(0, 30)):
+            rows.append(
+                {
+                    "student_id": f"s{s}",
+                    "course": course_id,
+                    "grade": rng.choice(GRADES + ["EQ"]),
+                    "standing": standing,
+                    "semesters_left": semesters_left,
+                }
+            )
+        rows.append(
+            {
+                "student_id": f"s{s}",
+                "standing": standing,
+                "semesters_left": semesters_left,
+            }
+        )
+    return rows
+
+
+def to_profile(rows, student):
+    courses, equivalents, extra = {}, [], {}
+    for row in rows:
+        if row["student_id"] != student:
+            continue
+        if row.get("standing"):
+            extra["standing"] = row["standing"]
+        if row.get("semesters_left"):
+            extra["semesters_left"] = int(row["semesters_left"])
+        if not row.get("course"):
+            continue
+        if row["grade"] == "EQ":
+            equivalents.append(row["course"])
+        else:
+            # the best of repeated grades, like the cohort matrix
+            best = courses.get(row["course"])
+            if best is None or GRADES.index(row["grade"]) < GRADES.index(best):
+                courses[row["course"]] = row["grade"]
+    return UserFulfilled.model_validate(
+        {
+            "courses": {c: {"name": c, "grade": g} for c, g in courses.items()},
+            "equivalents": equivalents,
+            **extra,
+        }
+    )
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_matrix_matches_per_profile_statuses(workers, monkeypatch):
+    monkeypatch.setattr(cohort_module, "CHUNK_SIZE", 16)
+    rows = random_rows()
+    cohort = Cohort.from_rows(rows, list(DATA.course_data))
+    targets = sorted(DATA.course_data)
+    matrix = analyze(cohort, targets, DATA, workers=workers)["matrix"]
+
+    index = eligibility_index(DATA)
+    for i, student in enumerate(cohort.students):
+        statuses = index.statuses(to_profile(rows, student), targets)
+        expected = [statuses[t] == "eligible" for t in targets]
+        assert matrix[i].tolist() == expected, student
+
+
+def test_what_if_min_grade_delta():
+    # the first course some tree requires without a minimum grade
+    index = eligibility_index(DATA)
+    target, required = next(
+        (course_id, tree[1])
+        for course_id, tree in sorted(index.trees.items())
+        if tree and tree[0] == "COURSE" and tree[2] is None
+    )
+    rows = [
+        {"student_id": "a", "course": required, "grade": "A"},
+        {"student_id": "c", "course": required, "grade": "C"},
+        {"student_id": "f", "course": required, "grade": "F"},
+        {"student_id": "none"},
+    ]
+    cohort = Cohort.from_rows(rows, list(DATA.course_data))
+    summary = analyze(cohort, [target], DATA, what_if={"min_grade": {required: "B"}})
+    row = summary["courses"][target]
+    assert row["eligible"] == 3 and row["what_if_eligible"] == 1
+    assert row["lost"] == ["c", "f"] and row["gained"] == []
@@ -0,0 +1,134 @@
+import sys
+import os
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import UserFulfilled, validate_course_data
+from backend.eligibility import (
+    ProfileView,
+    check_prereq_tree,
+    compile_tree,
+    eligibility_index,
+    evaluate,
+)
+from backend.registry import DataVersion
+
+
+def course(tree=None):
+    if tree is not None and tree["type"] not in ("AND", "OR"):
+        tree = {"type": "AND", "children": [tree]}
+    return {
+        "prereq_tree": tree,
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": "",
+        "title": "",
+        "credits": 3.0,
+        "sections": {},
+    }
+
+
+def needs(name, min_grade=None):
+    node = {"type": "COURSE", "course": name}
+    if min_grade:
+        node["min_grade"] = min_grade
+    return node
+
+
+DATA = DataVersion(
+    validate_course_data(
+        {
+            "CS 100": course(),
+            "CS 113": course(needs("CS 100")),
+            "CS 114": course(needs("CS 113", "C")),
+            "CS 280": course(
+                {
+                    "type": "AND",
+                    "children": [
+                        needs("CS 114", "B"),
+                        {
+                            "type": "OR",
+                            "children": [
+                                needs("MATH 111"),
+                                {"type": "EQUIVALENT", "courses": ["MATH 111"]},
+                            ],
+                        },
+                    ],
+                }
+            ),
+            "CS 490": course(
+                {
+                    "type": "OR",
+                    "children": [
+                        {
+                            "type": "STANDING",
+                            "standing": "Senior standing",
+                            "normalized": "SENIOR",
+                            "semesters_left": 2,
+                        },
+                        {"type": "SKILL", "name": "Instructor approval"},
+                    ],
+                }
+            ),
+            "MATH 111": course(),
+        }
+    ),
+    "test",
+)
+
+PROFILES = [
+    UserFulfilled(),
+    UserFulfilled.model_validate(
+        {"courses": {"CS 100": {"name": "CS 100", "grade": "F"}}}
+    ),
+    UserFulfilled.model_validate(
+        {
+            "courses": {
+                "CS 113": {"name": "CS 113", "grade": "C+"},
+                "CS 114": {"name": "CS 114", "grade": "B"},
+            },
+            "equivalents": ["MATH 111"],
+            "standing": "GRAD",
+            "semesters_left": 3,
+        }
+    ),
+    UserFulfilled.model_validate(
+        {
+            "courses": {
+                "CS 113": {"name": "CS 113", "grade": "F"},
+                "CS 114": {"name": "CS 114", "grade": "C"},
+                "MATH 111": {"name": "MATH 111", "grade": "A"},
+            },
+            "standing": "SENIOR",
+            "semesters_left": 2,
+        }
+    ),
+]
+
+
+@pytest.mark.parametrize("profile", PROFILES)
+def test_compiled_trees_agree_with_check_prereq_tree(profile):
+    view = ProfileView(profile)
+    for course_id, info in DATA.course_data.items():
+        expected = check_prereq_tree(info.prereq_tree, profile) is True
+        assert evaluate(compile_tree(info.prereq_tree), view) == expected, course_id
+
+
+def test_statuses_by_department_with_reasons():
+    index = eligibility_index(DATA)
+    profile = PROFILES[1]
+    statuses = index.statuses(profile, index.by_subject["CS"] + ["CS 999"])
+    assert statuses == {
+        "CS 100": "taken",
+        "CS 113": "eligible",
+        "CS 114": "blocked",
+        "CS 280": "blocked",
+        "CS 490": "blocked",
+        "CS 999": "unknown",
+    }
+    reasons = index.reasons(profile, statuses)
+    assert set(reasons) == {"CS 114", "CS 280", "CS 490"}
+    assert reasons["CS 114"] == "Missing course CS 113"
+    assert eligibility_index(DATA) is index
@@ -0,0 +1,105 @@
+import sys
+import os
+import json
+import numpy as np
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend import embeddings
+from backend.embeddings import (
+    build_course_embeddings,
+    embedder_id,
+    load_course_embeddings,
+)
+
+
+def fake_embed(calls):
+    def embed(texts, model_name, batch_size):
+        calls.append(list(texts))
+        # a deterministic vector per text, so reused rows can be told apart
+        return np.array(
+            [[len(text), sum(map(ord, text)) % 97, 1.0] for text in texts],
+            dtype=np.float32,
+        )
+
+    return embed
+
+
+def test_rebuild_reuses_unchanged_rows(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(embeddings, "_embed", fake_embed(calls))
+    path, index_path = str(tmp_path / "emb.npy"), str(tmp_path / "emb.json")
+    courses = [
+        ("CS 100", "Intro", "Basics."),
+        ("CS 113", "Programming", "Java."),
+        ("CS 114", "Data Structures", "Lists."),
+    ]
+    assert build_course_embeddings(courses, path, index_path, "model-a") == 3
+    first = load_course_embeddings(path, index_path, "model-a")
+    assert first.ids == ["CS 100", "CS 113", "CS 114"]
+    first_rows = np.array(first.matrix)
+
+    # CS 113 changes, CS 280 is new, CS 114 is gone and the order shifts
+    calls.clear()
+    courses = [
+        ("CS 280", "Languages", "Grammars."),
+        ("CS 113", "Programming", "Python."),
+        ("CS 100", "Intro", "Basics."),
+    ]
+    assert build_course_embeddings(courses, path, index_path, "model-a") == 2
+    assert calls == [["Languages Grammars.", "Programming Python."]]
+
+    second = load_course_embeddings(path, index_path, "model-a")
+    assert second.ids == ["CS 280", "CS 113", "CS 100"]
+    assert np.array_equal(second.matrix[2], first_rows[0])
+    assert not np.array_equal(second.matrix[1], first_rows[1])
+    assert second.get("CS 113", first.hashes[1]) is None
+
+
+def test_other_model_rebuilds_everything(tmp_path, monkeypatch):
+    calls = []
+    monkeypatch.setattr(embeddings, "_embed", fake_embed(calls))
+    path, index_path = str(tmp_path / "emb.npy"), str(tmp_path / "emb.json")
+    courses = [("CS 100", "Intro", "Basics."), ("CS 113", "Programming", None)]
+    build_course_embeddings(courses, path, index_path, "model-a")
+
+    assert load_course_embeddings(path, index_path, "model-b") is None
+    assert build_course_embeddings(courses, path, index_path, "model-b") == 2
+    assert calls[-1] == ["Intro Basics.", "Programming"]
+    assert load_course_embeddings(path, index_path, "model-a") is None
+
+
+def test_offline_backend_ignores_the_model_artifact(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "_embed", fake_embed([]))
+    path, index_path = str(tmp_path / "emb.npy"), str(tmp_path / "emb.json")
+    build_course_embeddings([("CS 100", "Intro", "Basics.")], path, index_path, "m")
+
+    assert embedder_id("m", "onnx") == "m"
+    assert load_course_embeddings(path, index_path, embedder_id("m", "onnx"))
+    # token hashing queries can't be compared with the model's vectors
+    assert load_course_embeddings(path, index_path, embedder_id("m", "hash")) is None
+
+
+def test_index_names_the_matrix_it_was_written_with(tmp_path, monkeypatch):
+    monkeypatch.setattr(embeddings, "_embed", fake_embed([]))
+    path, index_path = str(tmp_path / "emb.npy"), str(tmp_path / "emb.json")
+    build_course_embeddings([("CS 100", "Intro", "Basics.")], path, index_path, "m")
+    first = load_course_embeddings(path, index_path, "m")
+    first_rows = np.array(first.matrix)
+
+    # same row count, other course: the old index must not be paired with it
+    with open(index_path, encoding="utf-8") as f:
+        old_index = f.read()
+    build_course_embeddings([("CS 113", "Programming", "Java.")], path, index_path, "m")
+    (matrix_file,) = [name for name in os.listdir(tmp_path) if name.endswith(".npy")]
+    assert (
+        json.loads(open(index_path, encoding="utf-8").read())["matrix"] == matrix_file
+    )
+    # the mapped old matrix stays readable after its file is removed
+    assert np.array_equal(first.matrix, first_rows)
+
+    # a reader that got the old index finds its matrix gone, not the new one's rows
+    with open(index_path, "w", encoding="utf-8") as f:
+        f.write(old_index)
+    assert load_course_embeddings(path, index_path, "m") is None
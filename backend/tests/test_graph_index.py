@@ -0,0 +1,80 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import validate_course_data
+from backend.graph_index import PrereqGraph
+
+
+def course(prereq=None, coreq=None):
+    return {
+        "prereq_tree": prereq,
+        "coreq_tree": coreq,
+        "restrictions": [],
+        "desc": "",
+        "title": "Title",
+        "credits": 3.0,
+        "sections": {},
+    }
+
+
+def needs(*courses):
+    return {
+        "type": "AND",
+        "children": [{"type": "COURSE", "course": c} for c in courses],
+    }
+
+
+GRAPH = validate_course_data(
+    {
+        "CS 100": course(),
+        "CS 114": course(needs("CS 100")),
+        "MATH 111": course(),
+        "CS 241": course(
+            {
+                "type": "OR",
+                "children": [
+                    {"type": "COURSE", "course": "CS 114"},
+                    {"type": "EQUIVALENT", "courses": ["CS 115"]},
+                ],
+            }
+        ),
+        "CS 280": course(needs("CS 241", "MATH 111")),
+        # mutual corequisites form a cycle
+        "PHYS 111": course(coreq=needs("PHYS 111A")),
+        "PHYS 111A": course(coreq=needs("PHYS 111")),
+    }
+)
+
+
+def test_closures():
+    graph = PrereqGraph(GRAPH)
+    assert graph.closure("CS 280", "ancestors") == {
+        "CS 241",
+        "CS 114",
+        "CS 100",
+        "CS 115",
+        "MATH 111",
+    }
+    assert graph.closure("CS 100", "descendants") == {"CS 114", "CS 241", "CS 280"}
+    assert graph.closure("PHYS 111", "ancestors") == {"PHYS 111", "PHYS 111A"}
+    # referenced only as an equivalent, still a node
+    assert graph.resolve("cs115") == "CS 115"
+    assert graph.resolve("CS 999") is None
+
+
+def test_subgraph_depth():
+    graph = PrereqGraph(GRAPH)
+    near = graph.subgraph("CS 280", "ancestors", depth=1)
+    assert set(near["courses"]) == {"CS 280", "CS 241", "MATH 111"}
+    assert {(e["from"], e["to"]) for e in near["edges"]} == {
+        ("CS 241", "CS 280"),
+        ("MATH 111", "CS 280"),
+    }
+
+    full = graph.subgraph("CS 280", "ancestors")
+    assert len(full["courses"]) == 6
+    assert full["courses"]["CS 115"] is None
+    assert full["courses"]["CS 114"]["prereq_tree"]["children"][0]["course"] == "CS 100"
@@ -0,0 +1,44 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.loadtest.driver import parse_server_timing
+from backend.loadtest.mock_gemini import MockGemini
+
+TOOLS = [{"functionDeclarations": [{"name": "course_query"}, {"name": "plan_degree"}]}]
+
+
+def test_scripted_calls_then_reply():
+    mock = MockGemini(latency_ms=0, jitter_ms=0)
+    contents = [{"role": "user", "parts": [{"text": "intro machine learning"}]}]
+
+    first = mock.respond({"contents": contents, "tools": TOOLS}, "m")
+    part = first["candidates"][0]["content"]["parts"][0]
+    assert part["functionCall"]["name"] == "course_query"
+    assert part["functionCall"]["args"]["args"]["query"] == "intro machine learning"
+
+    contents += [
+        {"role": "model", "parts": [part]},
+        {
+            "role": "user",
+            "parts": [{"functionResponse": {"name": "course_query", "response": {}}}],
+        },
+    ]
+    second = mock.respond({"contents": contents, "tools": TOOLS}, "m")
+    assert "text" in second["candidates"][0]["content"]["parts"][0]
+    assert len(mock.chunks(second)) > 1
+
+    # tools the request didn't declare are never called
+    contents = [{"role": "user", "parts": [{"text": "what is CS 280 about"}]}]
+    reply = mock.respond({"contents": contents, "tools": TOOLS}, "m")
+    assert "text" in reply["candidates"][0]["content"]["parts"][0]
+
+
+def test_parse_server_timing():
+    assert parse_server_timing("chat_turn;dur=812.4, course_query;dur=95") == {
+        "chat_turn": 812.4,
+        "course_query": 95.0,
+    }
+    assert parse_server_timing(None) == {}
@@ -0,0 +1,58 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import validate_course_data
+from backend.offerings import OfferingIndex
+
+
+def course(*terms, sections=1):
+    section = ["001", "1", "M", "", "", "Open", "30", "0", "", "", "3", "", ""]
+    return {
+        "prereq_tree": None,
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": "",
+        "title": "Title",
+        "credits": 3.0,
+        "sections": {
+            term: {f"{i:03}": section for i in range(sections)} for term in terms
+        },
+    }
+
+
+GRAPH = validate_course_data(
+    {
+        "CS 100": course("202410", "202490", "202510", "202590", sections=4),
+        "CS 341": course("202490", "202590"),
+        "CS 280": course("202410", "202510", "202610"),
+        "CS 490": course(),
+    }
+)
+
+
+def test_term_courses_include_every_course():
+    index = OfferingIndex(GRAPH)
+    assert index.terms == ["202410", "202490", "202510", "202590", "202610"]
+    assert index.term_courses["202410"] == {"CS 100", "CS 280"}
+    assert index.term_courses["202610"] == {"CS 280"}
+    assert index.offered_in("CS 341", "202590")
+    assert not index.offered_in("CS 341", "202510")
+
+
+def test_frequencies_and_predictions():
+    index = OfferingIndex(GRAPH)
+    assert index.frequency("CS 341", "90") == 1.0
+    assert index.frequency("CS 341", "10") == 0.0
+    assert round(index.frequency("CS 280", "10"), 2) == 1.0
+    assert index.typical_sections("CS 100", "90") == 4
+
+    # published term: exact, future term: per-semester frequency
+    assert index.predict("CS 341", "202610") == 0.0
+    assert index.predict("CS 341", "202690") == 1.0
+    assert index.predict("CS 490", "202690") == 0.5
+    assert index.predict("CS 490", "202650") == 0.0
+    assert index.predict("CS 999", "202690") == 0.0
+    assert index.summary("CS 341")["semesters"]["Fall"]["frequency"] == 1.0
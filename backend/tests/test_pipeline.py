@@ -0,0 +1,180 @@
+import sys
+import os
+import json
+import threading
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.scrapers import courses as courses_module
+from backend.scrapers.banner import parse_sections_html
+from backend.scrapers.pipeline import Checkpoint, JsonlCache, Stage
+
+TERM = "202610"
+CATALOG_URL = "https://catalog.njit.edu/undergraduate/computing-sciences/"
+CATALOG_HTML = (
+    '<div class="courseblock"><p class="courseblocktitle">CS 100. Roadmap to '
+    'Computing. 3 credits.</p><p class="courseblockdesc">Basics.</p></div>'
+    '<div class="courseblock"><p class="courseblocktitle">CS 113. Programming. '
+    '3 credits.</p><p class="courseblockdesc">Java.</p></div>'
+)
+TREES = {"prereq_tree": None, "coreq_tree": None, "restrictions": []}
+
+
+def sections_payload(course_id, title, lecturer):
+    cells = "".join(
+        f"<td>{value}</td>"
+        for value in ["001", "12345", "MW", "10:00 AM - 11:20 AM", "KUPF 1",
+                      "Open", "30", "12", lecturer, "Face-to-Face", "3", "", ""]
+    )  # fmt: skip
+    html = (
+        f'<h4 id="{course_id}">{course_id} - {title}</h4>'
+        f"<table><tr><th>Section</th></tr><tr>{cells}</tr></table>"
+    )
+    return [{"SECTIONS": html}]
+
+
+class FakeResponse:
+    text = CATALOG_HTML
+
+    def raise_for_status(self):
+        pass
+
+
+class FakeSources:
+    """Catalog, Banner and Gemini stand-ins that record what the pipeline asked for."""
+
+    def __init__(self, monkeypatch, failing=()):
+        self.failing = set(failing)
+        self.pages, self.subjects, self.described = [], [], []
+        self.parsed_sections = 0
+        self.lock = threading.Lock()
+        monkeypatch.setattr(courses_module, "links", [CATALOG_URL])
+        monkeypatch.setattr(courses_module.requests, "get", self.get)
+        monkeypatch.setattr(courses_module, "fetch_courses", self.fetch_courses)
+        monkeypatch.setattr(courses_module, "fetch_subj_list", self.fetch_subj_list)
+        monkeypatch.setattr(courses_module, "parse_sections_html", self.parse_sections)
+        monkeypatch.setattr(courses_module, "process_single_description", self.describe)
+        monkeypatch.setattr(courses_module, "get_individual_course", self.details)
+        monkeypatch.setattr(courses_module, "sync_lecturer_ratings", lambda names: None)
+
+    def get(self, url, headers=None, timeout=None):
+        with self.lock:
+            self.pages.append(url)
+        return FakeResponse()
+
+    def fetch_subj_list(self, term):
+        return [{"SUBJECT": "CS"}, {"SUBJECT": "MATH"}]
+
+    def fetch_courses(self, subject, term, max_results="9999"):
+        with self.lock:
+            self.subjects.append(subject)
+        if subject in self.failing:
+            return None
+        if subject == "CS":
+            return sections_payload("CS 100", "Roadmap to Computing", "Doe, Jane")
+        return sections_payload("MATH 111", "Calculus I", "Roe, Ann")
+
+    def parse_sections(self, html):
+        with self.lock:
+            self.parsed_sections += 1
+        return parse_sections_html(html)
+
+    def describe(self, description):
+        with self.lock:
+            self.described.append(description)
+        return dict(TREES)
+
+    def details(self, course_id):
+        return {"title": "Calculus I", "desc": "Limits."}
+
+
+def run_main(monkeypatch, tmp_path, *flags):
+    output = str(tmp_path / "graph.json")
+    argv = ["courses.py", "--term", TERM, "--output", output, "--input", output,
+            "--work-dir", str(tmp_path / "work"), "--no-embeddings",
+            "--progress-interval", "3600", *flags]  # fmt: skip
+    monkeypatch.setattr(sys, "argv", argv)
+    courses_module.main()
+    return output
+
+
+def test_resume_only_refetches_the_failed_source(tmp_path, monkeypatch):
+    first = FakeSources(monkeypatch, failing={"MATH"})
+    output = run_main(monkeypatch, tmp_path)
+    assert first.pages == [CATALOG_URL]
+    assert sorted(first.subjects) == ["CS", "MATH"]
+    work_dir = str(tmp_path / "work" / TERM)
+    # the failed run leaves the input alone and writes a partial graph instead
+    assert not os.path.exists(output)
+    assert os.path.exists(os.path.join(work_dir, "graph.partial.json"))
+    assert Checkpoint(work_dir).load_state()["completed"] is False
+
+    resumed = FakeSources(monkeypatch)
+    run_main(monkeypatch, tmp_path, "--resume")
+    # the catalog page and CS come from their parse checkpoints, only MATH is fetched
+    assert resumed.pages == [] and resumed.subjects == ["MATH"]
+    assert resumed.parsed_sections == 1
+    # enriched descriptions come from the cache, only the new course goes to Gemini
+    assert sorted(first.described) == ["Basics.", "Java."]
+    assert resumed.described == ["Limits."]
+
+    with open(output, encoding="utf-8") as f:
+        graph = json.load(f)
+    assert sorted(graph) == ["CS 100", "CS 113", "MATH 111"]
+    assert graph["CS 100"]["sections"][TERM]["001"][8] == "Doe, Jane"
+    assert graph["MATH 111"]["title"] == "Calculus I"
+    assert graph["MATH 111"]["desc"] == "Limits."
+    assert Checkpoint(work_dir).load_state()["completed"] is True
+
+
+def test_checkpoint_state_round_trip(tmp_path):
+    checkpoint = Checkpoint(str(tmp_path))
+    assert checkpoint.load_state() == {}
+    checkpoint.save_state({"term": "202610", "completed": False})
+    assert Checkpoint(str(tmp_path)).load_state() == {
+        "term": "202610",
+        "completed": False,
+    }
+    # atomic writes leave no temp files behind
+    assert sorted(os.listdir(tmp_path)) == ["state.json"]
+
+
+def test_jsonl_cache_recovers_from_truncated_last_line(tmp_path):
+    path = str(tmp_path / "enrich.jsonl")
+    cache = JsonlCache(path)
+    cache.put("one", {"prereqs": ["CS 100"]})
+    cache.put("two", None)
+    with open(path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"key": "three", "value": 3})[:-5])
+
+    reloaded = JsonlCache(path)
+    assert len(reloaded) == 2
+    assert reloaded.get("one") == {"prereqs": ["CS 100"]}
+    assert reloaded.get("three") is None
+
+    # later puts still land on their own line after the partial one
+    reloaded.put("three", 3)
+    assert JsonlCache(path).get("three") == 3
+
+
+def test_stage_finishes_once_after_all_workers(tmp_path):
+    finished = []
+    seen = []
+    stage = Stage(
+        "work",
+        lambda item: seen.append(item),
+        workers=4,
+        maxsize=2,
+        on_finish=lambda: finished.append(len(seen)),
+    ).start()
+    for i in range(50):
+        stage.put(i)
+    assert not stage.done
+    stage.close()
+    stage.join()
+
+    assert sorted(seen) == list(range(50))
+    assert finished == [50]
+    assert stage.done and stage.processed == 50 and stage.errors == 0
+    assert "done" in stage.summary()
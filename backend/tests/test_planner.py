@@ -0,0 +1,158 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+import backend.planner as planner
+from backend.constants import UserFulfilled, validate_course_data
+from backend.registry import DataVersion
+
+
+def course(prereq=None, coreq=None, credits=3.0):
+    return {
+        "prereq_tree": prereq,
+        "coreq_tree": coreq,
+        "restrictions": [],
+        "desc": "",
+        "title": "Title",
+        "credits": credits,
+        "sections": {},
+    }
+
+
+def needs(*courses):
+    return {
+        "type": "AND",
+        "children": [{"type": "COURSE", "course": c} for c in courses],
+    }
+
+
+GRAPH = validate_course_data(
+    {
+        "CS 100": course(),
+        "CS 114": course(needs("CS 100")),
+        "CS 241": course(needs("CS 114")),
+        "CS 280": course(needs("CS 241")),
+        "MATH 111": course(credits=4.0),
+        "MATH 112": course(needs("MATH 111"), credits=4.0),
+        "PHYS 111": course(needs("MATH 111"), coreq=needs("PHYS 111A")),
+        "PHYS 111A": course(coreq=needs("PHYS 111"), credits=1.0),
+        "CS 490": course(
+            {
+                "type": "OR",
+                "children": [
+                    needs("CS 280", "MATH 112"),
+                    {"type": "COURSE", "course": "CS 241"},
+                ],
+            }
+        ),
+    }
+)
+
+
+DATA = DataVersion(GRAPH, "test")
+
+
+def always(course_id, term):
+    return 1.0
+
+
+def test_term_cadence():
+    assert planner.next_term("202590") == "202595"
+    assert planner.next_term("202595") == "202610"
+    assert planner.upcoming_terms("202590", 3, ["10", "90"]) == [
+        "202590",
+        "202610",
+        "202690",
+    ]
+
+
+def test_plan_follows_prereq_chain_and_coreqs():
+    result = planner.plan_degree(
+        UserFulfilled(),
+        ["CS 490", "PHYS 111"],
+        "202590",
+        max_credits=9,
+        offer_probability=always,
+        data=DATA,
+    )
+    terms = [[c["course"] for c in t["courses"]] for t in result["terms"]]
+    position = {c: i for i, t in enumerate(terms) for c in t}
+
+    # the cheaper OR branch (CS 241) is picked, not CS 280 + MATH 112
+    assert set(position) == {
+        "CS 100",
+        "CS 114",
+        "CS 241",
+        "CS 490",
+        "MATH 111",
+        "PHYS 111",
+        "PHYS 111A",
+    }
+    assert position["CS 100"] < position["CS 114"] < position["CS 241"]
+    assert position["CS 241"] < position["CS 490"]
+    assert position["PHYS 111"] == position["PHYS 111A"] > position["MATH 111"]
+    assert all(t["credits"] <= 9 for t in result["terms"])
+    assert result["terms_used"] == result["lower_bound_terms"] == 4
+    assert result["optimal"]
+    assert result["unscheduled"] == []
+
+
+def test_offerings_and_completed_courses():
+
+    def fall_only(course_id, term):
+        return 1.0 if course_id != "CS 241" or term.endswith("90") else 0.0
+
+    profile = UserFulfilled(courses={"CS 100": {"name": "CS 100", "grade": "B"}})
+    result = planner.plan_degree(
+        profile, ["CS 241", "CS 100"], "202590", offer_probability=fall_only, data=DATA
+    )
+    assert [t["term"] for t in result["terms"]] == ["202590", "202610", "202690"]
+    assert [c["course"] for c in result["terms"][-1]["courses"]] == ["CS 241"]
+    assert result["already_completed"] == ["CS 100"]
+
+    short = planner.plan_degree(
+        profile,
+        ["CS 241"],
+        "202590",
+        max_terms=2,
+        offer_probability=fall_only,
+        data=DATA,
+    )
+    assert short["unscheduled"] == [
+        {"course": "CS 241", "reason": "Doesn't fit in 2 terms"}
+    ]
+
+
+def test_insufficient_grades_are_retaken():
+    graph = validate_course_data(
+        {
+            "CS 100": course(),
+            "CS 113": course(needs("CS 100")),
+            "CS 114": course(
+                {
+                    "type": "AND",
+                    "children": [
+                        {"type": "COURSE", "course": "CS 113", "min_grade": "B"}
+                    ],
+                }
+            ),
+        }
+    )
+    data = DataVersion(graph, "grades")
+    profile = UserFulfilled.model_validate(
+        {
+            "courses": {
+                "CS 100": {"name": "CS 100", "grade": "F"},
+                "CS 113": {"name": "CS 113", "grade": "C"},
+            }
+        }
+    )
+    result = planner.plan_degree(
+        profile, ["CS 114", "CS 100"], "202590", offer_probability=always, data=data
+    )
+    terms = [[c["course"] for c in t["courses"]] for t in result["terms"]]
+    # the F is retaken, and the C in CS 113 is below CS 114's minimum grade
+    assert terms == [["CS 100"], ["CS 113"], ["CS 114"]]
+    assert result["already_completed"] == []
@@ -0,0 +1,69 @@
+import sys
+import os
+import time
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.profiling import SlowRequestSampler, profile_call
+
+
+def busy(ms):
+    deadline = time.perf_counter() + ms / 1000
+    total = 0
+    while time.perf_counter() < deadline:
+        total += sum(range(200))
+    return total
+
+
+def test_profile_call_returns_result_and_report():
+    result, profile = profile_call(lambda n: sum(range(n)), 1000)
+    assert result == sum(range(1000))
+    assert profile["format"] in ("pyinstrument", "cprofile")
+    assert profile["text"]
+    assert profile["duration_ms"] >= 0 and profile["created"] <= time.time()
+
+
+def test_sampler_keeps_the_slowest_of_a_window():
+    stored = []
+    sampler = SlowRequestSampler(
+        interval_ms=1,
+        top_n=2,
+        window_seconds=3600,
+        store=lambda profile: stored.append(profile) or "id",
+    )
+    for label, ms in [("fast", 1), ("slowest", 60), ("medium", 20), ("quick", 2)]:
+        sampler.wrap(label, busy)(ms)
+
+    profiles = sampler.flush()
+    assert [p["path"] for p in profiles] == ["slowest", "medium"]
+    assert stored == profiles
+    slowest = profiles[0]
+    assert slowest["format"] == "collapsed" and slowest["samples"] > 0
+    # collapsed stacks, root first, with the sampled function in them
+    assert "busy (test_profiling.py:" in slowest["text"]
+    assert all(line.rsplit(" ", 1)[1].isdigit() for line in slowest["text"].split("\n"))
+
+    recent = sampler.recent()
+    assert [r["path"] for r in recent] == ["slowest", "medium"]
+    assert all("text" not in r for r in recent)
+    # the next window starts empty
+    assert sampler.flush() == [] and sampler.recent() == []
+
+
+def test_disabled_sampler_and_store_errors():
+    disabled = SlowRequestSampler(interval_ms=0, top_n=5, store=None)
+    assert disabled.wrap("noop", lambda: 7)() == 7
+    assert disabled.flush() == []
+
+    def failing_store(profile):
+        raise ConnectionError("no redis")
+
+    sampler = SlowRequestSampler(
+        interval_ms=1, top_n=1, window_seconds=3600, store=failing_store
+    )
+    sampler.wrap("kept", busy)(5)
+    assert sampler.recent() == []
+    # a profile that couldn't be stored is still listed
+    assert [p["path"] for p in sampler.flush()] == ["kept"]
+    assert [r["path"] for r in sampler.recent()] == ["kept"]
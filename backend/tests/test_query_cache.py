@@ -0,0 +1,81 @@
+import sys
+import os
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend import query_cache as query_cache_module
+from backend.query_cache import QueryResultCache, normalize_query
+
+
+class DictRedis:
+    """The few Redis commands the cache uses, on dicts."""
+
+    def __init__(self):
+        self.values = {}
+        self.hashes = {}
+        self.expiry = {}
+
+    def get(self, key):
+        return self.values.get(key)
+
+    def set(self, key, value, ex=None):
+        self.values[key] = value
+        self.expiry[key] = ex
+
+    def hincrby(self, key, field, amount):
+        fields = self.hashes.setdefault(key, {})
+        fields[field] = str(int(fields.get(field, 0)) + amount)
+
+    def hgetall(self, key):
+        return dict(self.hashes.get(key, {}))
+
+
+RANKED = [{"id": "CS 100", "init_distance": 0.5, "score": 3.2}]
+
+
+def use_redis(monkeypatch):
+    redis_client = DictRedis()
+    monkeypatch.setattr(query_cache_module, "get_redis", lambda: redis_client)
+    return redis_client
+
+
+def test_miss_then_hit(monkeypatch):
+    redis_client = use_redis(monkeypatch)
+    cache = QueryResultCache(ttl=60)
+    assert cache.get("Intro ML?", "202610", "v1") is None
+    cache.set("Intro ML?", "202610", "v1", RANKED)
+    # the same question, worded with other case, punctuation and spacing
+    assert cache.get("intro  ml", "202610", "v1") == RANKED
+    assert cache.stats() == {"misses": 1, "hits": 1}
+    assert list(redis_client.expiry.values()) == [60]
+
+
+def test_keys_separate_versions_and_terms(monkeypatch):
+    use_redis(monkeypatch)
+    cache = QueryResultCache(ttl=60)
+    cache.set("circuits", "202610", "v1", RANKED)
+    assert cache.get("circuits", "202690", "v1") is None
+    assert cache.get("circuits", None, "v1") is None
+    assert cache.get("circuits", "202610", "v2") is None
+    assert cache.key("circuits", None, "v1").split(":")[2] == "all"
+    assert normalize_query("C++ / C#!") == "c++ c#"
+
+
+def test_zero_ttl_disables_the_cache(monkeypatch):
+    redis_client = use_redis(monkeypatch)
+    cache = QueryResultCache(ttl=0)
+    cache.set("circuits", "202610", "v1", RANKED)
+    assert cache.get("circuits", "202610", "v1") is None
+    assert redis_client.values == {} and redis_client.hashes == {}
+
+
+def test_redis_errors_are_misses(monkeypatch):
+    def unavailable():
+        raise ConnectionError("no server")
+
+    monkeypatch.setattr(query_cache_module, "get_redis", unavailable)
+    cache = QueryResultCache(ttl=60)
+    cache.set("circuits", "202610", "v1", RANKED)
+    assert cache.get("circuits", "202610", "v1") is None
+    assert cache.stats() == {}
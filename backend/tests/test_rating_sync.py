@@ -0,0 +1,72 @@
+import sys
+import os
+import json
+import time
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.scrapers import rmp
+
+
+def test_sync_dedupes_and_flushes_once(tmp_path, monkeypatch):
+    fetched = []
+    writes = []
+
+    def fake_fetch(name):
+        fetched.append(name)
+        return {"avgRating": "4.5", "link": name}
+
+    monkeypatch.setattr(rmp, "fetch_lecturer_rating", fake_fetch)
+    path = str(tmp_path / "lecturers.json")
+    store = rmp.LecturerRatingStore(path)
+    original_flush = store.flush
+    monkeypatch.setattr(store, "flush", lambda: writes.append(original_flush()))
+
+    names = ["Calvin, James", "Doe, Jane", "Calvin, James", "", "Doe, Jane"]
+    stats = rmp.sync_lecturer_ratings(names, store=store, rate=0, flush_every=0)
+
+    assert sorted(fetched) == ["Calvin, James", "Doe, Jane"]
+    assert stats == {"fetched": 2, "skipped": 0, "failed": 0}
+    assert writes == [True]
+
+    with open(path, "r", encoding="utf-8") as f:
+        data = json.load(f)
+    assert data["Doe, Jane"]["avgRating"] == "4.5"
+    assert "fetchedAt" in data["Doe, Jane"]
+
+
+def test_sync_skips_fresh_and_refreshes_stale(tmp_path, monkeypatch):
+    path = str(tmp_path / "lecturers.json")
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(
+            {
+                "Fresh, Prof": {"avgRating": "3", "fetchedAt": int(time.time())},
+                "Stale, Prof": {"avgRating": "3", "fetchedAt": 0},
+                "Legacy, Prof": {"avgRating": "3"},
+            },
+            f,
+        )
+
+    fetched = []
+    monkeypatch.setattr(
+        rmp, "fetch_lecturer_rating", lambda name: fetched.append(name) or {}
+    )
+    store = rmp.LecturerRatingStore(path)
+    stats = rmp.sync_lecturer_ratings(
+        ["Fresh, Prof", "Stale, Prof", "Legacy, Prof"], store=store, ttl=60, rate=0
+    )
+
+    assert sorted(fetched) == ["Legacy, Prof", "Stale, Prof"]
+    assert stats["skipped"] == 1
+
+
+def test_failed_fetch_is_not_stored(tmp_path, monkeypatch):
+    monkeypatch.setattr(rmp, "fetch_lecturer_rating", lambda name: None)
+    path = str(tmp_path / "lecturers.json")
+    store = rmp.LecturerRatingStore(path)
+
+    stats = rmp.sync_lecturer_ratings(["Doe, Jane"], store=store, rate=0)
+
+    assert stats["failed"] == 1
+    assert not os.path.exists(path)
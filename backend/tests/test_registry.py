@@ -0,0 +1,172 @@
+import sys
+import os
+import json
+import threading
+import time
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.registry import DataRegistry
+
+
+def course(title, *prereqs):
+    return {
+        "prereq_tree": (
+            {
+                "type": "AND",
+                "children": [{"type": "COURSE", "course": c} for c in prereqs],
+            }
+            if prereqs
+            else None
+        ),
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": "",
+        "title": title,
+        "credits": 3.0,
+        "sections": {},
+    }
+
+
+def write_graph(path, graph):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(graph, f)
+
+
+def test_reload_swaps_in_a_new_version(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, {"CS 100": course("Roadmap"), "CS 114": course("II", "CS 100")})
+    registry = DataRegistry(path)
+    built = []
+    registry.add_builder("titles", lambda data: built.append(data.version) or 1)
+
+    first = registry.reload(force=True)
+    assert registry.current() is first
+    assert first.derived["titles"] == 1
+    assert registry.reload() is None
+
+    write_graph(
+        path,
+        {
+            "CS 100": course("Roadmap"),
+            "CS 114": course("II", "CS 100"),
+            "CS 241": course("Foundations", "CS 114"),
+        },
+    )
+    second = registry.reload()
+    assert second is not None and registry.current() is second
+    assert second.version != first.version
+    assert built == [first.version, second.version]
+    assert second.prereq_graph.closure("CS 241", "ancestors") == {"CS 100", "CS 114"}
+    # a request still holding the old version keeps a consistent view
+    assert "CS 241" not in first.valid_courses
+    assert first.prereq_graph.resolve("CS 241") is None
+
+
+def test_failed_reload_keeps_current_version(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, {"CS 100": course("Roadmap")})
+    registry = DataRegistry(path)
+    first = registry.reload(force=True)
+
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('{"CS 100": ')
+    with pytest.raises(ValueError):
+        registry.reload()
+    assert registry.current() is first
+
+
+class LocalBuildLock:
+    """SharedBuildLock's protocol on a dict, standing in for Redis between threads."""
+
+    def __init__(self):
+        self.keys = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, version, force=False):
+        with self.lock:
+            if not force and ("synced", version) in self.keys:
+                return False
+            return self.keys.setdefault(("sync", version), threading.get_ident()) == (
+                threading.get_ident()
+            )
+
+    def hold(self, version):
+        return lambda: None
+
+    def release(self, version, synced):
+        with self.lock:
+            if synced:
+                self.keys[("synced", version)] = True
+            self.keys.pop(("sync", version), None)
+
+    def wait(self, version):
+        while True:
+            with self.lock:
+                if ("synced", version) in self.keys:
+                    return True
+                if ("sync", version) not in self.keys:
+                    return False
+            time.sleep(0.01)
+
+
+def test_shared_builders_run_once_across_workers(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, {"CS 100": course("Roadmap")})
+    shared_lock = LocalBuildLock()
+    synced = []
+    release = threading.Event()
+
+    def sync(data):
+        release.wait(5)
+        synced.append(data.version)
+
+    workers = []
+    for _ in range(3):
+        registry = DataRegistry(path)
+        registry.shared_lock = shared_lock
+        registry.add_builder("chroma", sync, shared=True)
+        registry.add_builder("titles", lambda data: len(data.course_data))
+        workers.append(registry)
+
+    threads = [threading.Thread(target=r.reload, args=(True,)) for r in workers]
+    for t in threads:
+        t.start()
+    time.sleep(0.2)
+    # nobody swaps in the new version before the sync finished
+    assert all(r._current is None for r in workers)
+    release.set()
+    for t in threads:
+        t.join()
+
+    assert len(synced) == 1
+    assert all(r.current().version == synced[0] for r in workers)
+    assert all(r.current().derived["titles"] == 1 for r in workers)
+
+
+def test_waiting_worker_takes_over_a_failed_sync(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, {"CS 100": course("Roadmap")})
+    shared_lock = LocalBuildLock()
+
+    def failing_sync(data):
+        raise RuntimeError("worker died")
+
+    leader = DataRegistry(path)
+    leader.shared_lock = shared_lock
+    leader.add_builder("chroma", failing_sync, shared=True)
+    with pytest.raises(RuntimeError):
+        leader.reload(force=True)
+
+    follower = DataRegistry(path)
+    follower.shared_lock = shared_lock
+    follower.add_builder("chroma", lambda data: "synced", shared=True)
+    data = follower.reload()
+    assert data.derived["chroma"] == "synced"
+    # a worker seeing the version later doesn't sync it again
+    late = DataRegistry(path)
+    late.shared_lock = shared_lock
+    late.add_builder("chroma", failing_sync, shared=True)
+    assert "chroma" not in late.reload().derived
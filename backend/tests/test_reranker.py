@@ -0,0 +1,58 @@
+import sys
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.reranker import BatchingReranker
+
+
+class FakeCrossEncoder:
+    """Scores a pair by the length of its document and records every call."""
+
+    def __init__(self, started=None, release=None):
+        self.calls = []
+        self.started = started
+        self.release = release
+
+    def predict(self, pairs, batch_size=32, show_progress_bar=False):
+        self.calls.append(len(pairs))
+        if self.started is not None:
+            self.started.set()
+            self.release.wait(5)
+        return [float(len(doc)) for _, doc in pairs]
+
+
+def test_scores_are_returned_to_the_right_caller():
+    model = FakeCrossEncoder()
+    reranker = BatchingReranker(model, max_wait_ms=1)
+    pairs = [("q", "x" * n) for n in (5, 1, 3)]
+    assert list(reranker.predict(pairs)) == [5.0, 1.0, 3.0]
+    assert list(reranker.predict([])) == []
+
+
+def test_concurrent_requests_share_a_batch():
+    started, release = threading.Event(), threading.Event()
+    model = FakeCrossEncoder(started, release)
+    reranker = BatchingReranker(model, max_wait_ms=20)
+
+    with ThreadPoolExecutor(max_workers=9) as pool:
+        # the first request occupies the model while the others queue up
+        first = pool.submit(reranker.predict, [("q", "a")])
+        started.wait(5)
+        rest = [
+            pool.submit(reranker.predict, [("q", "b" * i), ("q", "c")])
+            for i in range(1, 9)
+        ]
+        while reranker._queue.qsize() < 8:
+            time.sleep(0.001)
+        release.set()
+        assert list(first.result(5)) == [1.0]
+        for i, future in enumerate(rest, 1):
+            assert list(future.result(5)) == [float(i), 1.0]
+
+    assert model.calls == [1, 16]
+    assert reranker.stats == {"batches": 2, "requests": 9, "pairs": 17}
@@ -0,0 +1,204 @@
+import sys
+import os
+import base64
+import json
+import threading
+import pytest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import validate_course_data
+from backend.registry import DataVersion, registry
+from backend.seats import (
+    MemoryChangeFeed,
+    RedisChangeFeed,
+    SeatRefresher,
+    make_change_feed,
+    seat_change,
+)
+
+TERM = "202610"
+
+
+def row(section, status, max_seats, now):
+    return [section, f"1{section}", "MW", "10:00 AM - 11:20 AM", "KUPF 1", status,
+            max_seats, now, "Doe, Jane", "Face-to-Face", "3", "", ""]  # fmt: skip
+
+
+def sections_html(course_id, title, rows):
+    cells = "".join(
+        "<tr>" + "".join(f"<td>{value}</td>" for value in r) + "</tr>" for r in rows
+    )
+    return (
+        f'<h4 id="{course_id}">{course_id} - {title}</h4>'
+        f"<table><tr><th>Section</th></tr>{cells}</table>"
+    )
+
+
+class StubBanner(BaseHTTPRequestHandler):
+    """Serves the two Banner virtual domains the refresher uses."""
+
+    sections = {}
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        # undo pb_encode: a 4 character base64 salt, then the base64 value
+        params = {
+            base64.b64decode(k[4:]).decode(): base64.b64decode(v[4:]).decode()
+            for k, v in parse_qsl(url.query)
+            if k != "encoded"
+        }
+        if url.path.endswith("stuRegCrseSchedSubjList"):
+            body = [{"SUBJECT": subject} for subject in self.sections]
+        else:
+            body = [{"SECTIONS": self.sections.get(params["subject"], "")}]
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def course(title, sections):
+    return {
+        "prereq_tree": None,
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": "",
+        "title": title,
+        "credits": 3.0,
+        "sections": sections,
+    }
+
+
+def scraped_data():
+    """CS 100 with three sections this term, CS 101 with none yet."""
+    courses = validate_course_data(
+        {
+            "CS 100": course(
+                "Roadmap to Computing",
+                {
+                    TERM: {
+                        "001": row("001", "Open", "30", "12"),
+                        "002": row("002", "Open", "30", "5"),
+                        "003": row("003", "Open", "30", "1"),
+                    }
+                },
+            ),
+            "CS 101": course("Computer Programming", {"202590": {}}),
+        }
+    )
+    return DataVersion(courses, "v1")
+
+
+def test_refresh_diffs_applies_and_publishes():
+    data = scraped_data()
+    courses = data.course_data
+    StubBanner.sections = {
+        "CS": sections_html(
+            "CS 100",
+            "Roadmap to Computing",
+            [
+                row("001", "Closed", "30", "30"),
+                row("002", "Open", "30", "5"),
+                row("004", "Open", "25", "0"),
+            ],
+        )
+    }
+    server = ThreadingHTTPServer(("127.0.0.1", 0), StubBanner)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    try:
+        feed = MemoryChangeFeed()
+        refresher = SeatRefresher(
+            TERM,
+            feed,
+            data=data,
+            base_url=f"http://127.0.0.1:{server.server_address[1]}",
+        )
+        start = refresher.cursor
+        assert refresher.refresh_once() == 3
+
+        sections = courses["CS 100"].sections[TERM]
+        assert sections["001"][5:8] == ("Closed", "30", "30")
+        assert "003" not in sections
+        assert sections["004"][6] == "25"
+
+        page = feed.since(start)
+        assert {(c["kind"], c["section"]) for c in page["changes"]} == {
+            ("updated", "001"),
+            ("removed", "003"),
+            ("added", "004"),
+        }
+        assert feed.since(page["cursor"])["changes"] == []
+        assert refresher.refresh_once() == 0
+    finally:
+        server.shutdown()
+
+
+def test_applied_rows_survive_a_reload_and_update_the_offerings(monkeypatch):
+    data = scraped_data()
+    monkeypatch.setattr(registry, "_current", data)
+    refresher = SeatRefresher(TERM, MemoryChangeFeed())
+    assert refresher.data is data
+    assert data.term_courses[TERM] == {"CS 100"}
+    refresher.apply(
+        [
+            seat_change("updated", "CS 100", "001", row("001", "Closed", "30", "30")),
+            seat_change("added", "CS 101", "001", row("001", "Open", "20", "0")),
+            seat_change("removed", "CS 100", "003", None),
+        ]
+    )
+    # CS 101's first section this term makes it offered
+    assert data.term_courses[TERM] == {"CS 100", "CS 101"}
+    assert data.offering_index.offered_in("CS 101", TERM)
+    assert data.offering_index.offered_terms("CS 101") == ["202590", TERM]
+
+    # a reload starts again from graph.json, the consumed rows go on top
+    reloaded = scraped_data()
+    refresher.reapply(reloaded)
+    sections = reloaded.course_data["CS 100"].sections[TERM]
+    assert sections["001"][5] == "Closed" and "003" not in sections
+    assert reloaded.term_courses[TERM] == {"CS 100", "CS 101"}
+
+    refresher.apply([seat_change("removed", "CS 101", "001", None)])
+    refresher.reapply(reloaded)
+    assert TERM not in reloaded.course_data["CS 101"].sections
+    assert reloaded.term_courses[TERM] == {"CS 100"}
+    assert not reloaded.offering_index.offered_in("CS 101", TERM)
+
+
+def test_memory_feed_reports_dropped_changes():
+    feed = MemoryChangeFeed(maxlen=2)
+    cursor = feed.since(None)["cursor"]
+    feed.publish([{"course": "A"}, {"course": "B"}, {"course": "C"}])
+    page = feed.since(cursor)
+    assert page["reset"]
+    assert [c["course"] for c in page["changes"]] == ["B", "C"]
+    assert not feed.since(page["cursor"])["reset"]
+
+
+@pytest.mark.parametrize(
+    "feed, cursor",
+    [
+        (MemoryChangeFeed(), "abc"),
+        (MemoryChangeFeed(), "-1"),
+        (RedisChangeFeed(TERM), "abc"),
+        (RedisChangeFeed(TERM), "1700000000000"),
+        (RedisChangeFeed(TERM), "1-2-3"),
+    ],
+)
+def test_malformed_cursors_are_rejected_before_reading(feed, cursor):
+    # the Redis feed raises before contacting the server
+    with pytest.raises(ValueError):
+        feed.since(cursor)
+
+
+def test_several_workers_share_the_redis_feed():
+    assert isinstance(make_change_feed(TERM, workers=1), MemoryChangeFeed)
+    assert isinstance(make_change_feed(TERM, workers=4), RedisChangeFeed)
@@ -0,0 +1,61 @@
+import sys
+import os
+import numpy as np
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import UserFulfilled
+from backend.semantic_cache import (
+    best_match,
+    bypass_reason,
+    encode_vector,
+    profile_fingerprint,
+)
+
+
+def test_bypass_rules():
+    assert bypass_reason("What are some easy gen-eds this spring?", False) is None
+    assert bypass_reason("I passed CS 100 with a B", False) == "mutating"
+    assert bypass_reason("I'm a junior now", False) == "mutating"
+    assert bypass_reason("remove MATH 111 please", False) == "mutating"
+    # anything after the first message may refer back to the conversation
+    assert bypass_reason("what about the second one?", True) == "history"
+    assert bypass_reason("What are some easy gen-eds this spring?", True) == "history"
+    # the same words start a fresh conversation fine
+    assert bypass_reason("Is that course hard?", False) is None
+
+
+def test_equivalent_profiles_share_a_fingerprint():
+    a = UserFulfilled(
+        courses={
+            "CS 100": {"name": "CS 100", "grade": "A"},
+            "MATH 111": {"name": "MATH 111", "grade": "B"},
+        },
+        equivalents=["CS 113", "CS 114"],
+    )
+    b = UserFulfilled(
+        courses={
+            "MATH 111": {"name": "MATH 111", "grade": "B"},
+            "CS 100": {"name": "CS 100", "grade": "A"},
+        },
+        equivalents=["CS 114", "CS 113"],
+    )
+    assert profile_fingerprint(a) == profile_fingerprint(b)
+    b.standing = "JUNIOR"
+    assert profile_fingerprint(a) != profile_fingerprint(b)
+
+
+def test_best_match_respects_threshold():
+    def unit(*values):
+        v = np.array(values, dtype=np.float32)
+        return v / np.linalg.norm(v)
+
+    entries = [
+        {"embedding": encode_vector(unit(1, 0, 0)), "answer": "x"},
+        {"embedding": encode_vector(unit(0.9, 0.1, 0)), "answer": "y"},
+    ]
+    entry, similarity = best_match(unit(0.9, 0.12, 0), entries, 0.95)
+    assert entry["answer"] == "y" and similarity > 0.99
+    assert best_match(unit(0, 0, 1), entries, 0.5) is None
+    assert best_match(unit(1, 0, 0), [], 0.5) is None
@@ -0,0 +1,60 @@
+import sys
+import os
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import UserFulfilled
+from backend.sessions import apply_delta, profile_delta
+
+
+def profile(**kwargs):
+    return UserFulfilled.model_validate(kwargs).model_dump(mode="json")
+
+
+def test_delta_of_a_turn():
+    before = profile(
+        courses={"CS 100": {"name": "CS 100", "grade": "B"}},
+        equivalents=["MATH 111"],
+    )
+    after = profile(
+        courses={"CS 280": {"name": "CS 280", "grade": "A"}},
+        equivalents=["MATH 112"],
+        standing="JUNIOR",
+    )
+    assert profile_delta(before, after) == {
+        "courses": {"CS 280": {"name": "CS 280", "grade": "A"}, "CS 100": None},
+        "equivalents_added": ["MATH 112"],
+        "equivalents_removed": ["MATH 111"],
+        "standing": "JUNIOR",
+    }
+    assert profile_delta(after, after) == {}
+
+
+def test_overlapping_turns_keep_both_updates():
+    loaded = profile(courses={"CS 100": {"name": "CS 100", "grade": "B"}})
+    # two tabs start from the same profile, each adds a different course
+    first = profile(
+        courses={
+            "CS 100": {"name": "CS 100", "grade": "B"},
+            "CS 113": {"name": "CS 113", "grade": "A"},
+        },
+        semesters_left=3,
+    )
+    second = profile(
+        courses={
+            "CS 100": {"name": "CS 100", "grade": "A"},
+            "MATH 111": {"name": "MATH 111", "grade": "C"},
+        }
+    )
+    merged = apply_delta(first, profile_delta(loaded, second))
+    assert merged == profile(
+        courses={
+            "CS 100": {"name": "CS 100", "grade": "A"},
+            "CS 113": {"name": "CS 113", "grade": "A"},
+            "MATH 111": {"name": "MATH 111", "grade": "C"},
+        },
+        semesters_left=3,
+    )
+    UserFulfilled.model_validate(merged)
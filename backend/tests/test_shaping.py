@@ -0,0 +1,124 @@
+import sys
+import os
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import validate_course_data
+from backend.registry import DataVersion
+from backend.shaping import (
+    fit_budget,
+    result_size,
+    shape_course_query,
+    shape_schedules,
+    shape_tool,
+    shaping_stats,
+)
+
+
+def course(title, desc):
+    return {
+        "prereq_tree": None,
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": desc,
+        "title": title,
+        "credits": 3.0,
+        "sections": {},
+    }
+
+
+DATA = DataVersion(
+    validate_course_data(
+        {
+            "CS 100": course("Roadmap to Computing", "word " * 200),
+            "CS 113": course("Intro to Computer Science", "Short description."),
+        }
+    ),
+    "test",
+)
+
+
+def section(course_name, section_id, days):
+    return {
+        "course": course_name,
+        "section_id": section_id,
+        "days": days,
+        "crn": "12345",
+        "times": "10:00 AM - 11:20 AM",
+        "location": "GITC 1100",
+        "instructor": "Smith",
+    }
+
+
+def test_course_query_is_compact():
+    full = {
+        "search_result": [
+            {
+                "id": cid,
+                "init_distance": 0.42,
+                "score": 0.123456,
+                "document": DATA.course_data[cid].desc,
+            }
+            for cid in ("CS 100", "CS 113")
+        ],
+        "message_to_relay_to_user": "Configuration: Results restricted to current term.",
+    }
+    shaped = shape_course_query(full, DATA, "202610")
+    first, second = shaped["search_result"]
+    assert set(first) == {"id", "title", "desc", "score"}
+    assert first["desc"].endswith("...") and len(first["desc"]) <= 163
+    assert second["desc"] == "Short description."
+    assert first["score"] == 0.123
+    assert result_size(shaped) < result_size(full) / 2
+
+
+def test_schedules_are_summarized_and_capped():
+    schedules = [
+        {
+            "sections": [section("CS 100", f"00{i}", "MTWR"[: 1 + i % 4])],
+            "days_used": sorted("MTWR"[: 1 + i % 4]),
+            "num_days": 1 + i % 4,
+        }
+        for i in range(12)
+    ]
+    shaped = shape_schedules(
+        {"errors": None, "schedules": schedules, "total_valid_schedules": 12},
+        DATA,
+        "202610",
+    )
+    assert shaped["total_valid_schedules"] == 12
+    assert shaped["shown"] == len(shaped["schedules"]) == 5
+    assert [s["days"] for s in shaped["schedules"]] == ["M", "M", "M", "MT", "MT"]
+    assert shaped["schedules"][0]["sections"] == [
+        "CS 100-000 #12345 M 10:00 AM - 11:20 AM, Smith"
+    ]
+    assert "errors" not in shaped
+
+
+def test_budget_drops_list_tail():
+    result = {"search_result": [{"id": i, "pad": "x" * 50} for i in range(100)]}
+    fitted = fit_budget(result, 1000)
+    assert result_size(fitted) <= 1000
+    assert fitted["omitted"] + len(fitted["search_result"]) == 100
+    assert fitted["search_result"][0]["id"] == 0
+    assert fit_budget({"a": 1}, 1) == {"a": 1}
+
+
+def test_shape_tool_keeps_signature_and_counts():
+    def update_user_profile(args: dict) -> dict:
+        """Docs."""
+        return {
+            "courses": {"CS 100": {"name": "CS 100", "grade": "B"}},
+            "equivalents": [],
+            "standing": None,
+            "semesters_left": None,
+        }
+
+    shaped = shape_tool(update_user_profile, DATA, "202610", mode="compact")
+    assert shaped.__name__ == "update_user_profile"
+    assert shaped.__doc__ == "Docs."
+    assert shaped({}) == {"courses": {"CS 100": "B"}}
+    row = shaping_stats.stats()["tools"]["update_user_profile"]
+    assert row["shaped_bytes"] < row["full_bytes"]
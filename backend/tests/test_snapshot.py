@@ -0,0 +1,66 @@
+import sys
+import os
+import json
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import (
+    load_course_data_with_version,
+    load_course_snapshot,
+    file_digest,
+    snapshot_path_for,
+)
+
+GRAPH = {
+    "CS 280": {
+        "prereq_tree": {
+            "type": "AND",
+            "children": [{"type": "COURSE", "course": "CS 114", "min_grade": "C"}],
+        },
+        "coreq_tree": None,
+        "restrictions": [],
+        "desc": "Programming language concepts.",
+        "title": "Programming Language Concepts",
+        "credits": 3.0,
+        "sections": {
+            "202610": {
+                "001": ["001", "12345", "MW", "10:00 AM - 11:20 AM", "KUPF 1",
+                        "Open", "30", "12", "Doe, Jane", "Face-to-Face", "3", "", ""]
+            }
+        },
+    }
+}
+
+
+def write_graph(path, graph):
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(graph, f)
+
+
+def test_fallback_writes_snapshot_and_snapshot_matches(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, GRAPH)
+
+    from_json, version = load_course_data_with_version(path)
+    assert version == file_digest(path)
+    assert os.path.exists(snapshot_path_for(path))
+
+    from_snapshot = load_course_snapshot(snapshot_path_for(path), version)
+    assert from_snapshot is not None
+    assert from_snapshot["CS 280"] == from_json["CS 280"]
+    assert from_snapshot["CS 280"].prereq_tree.children[0].course == "CS 114"
+
+
+def test_snapshot_is_stale_after_graph_changes(tmp_path):
+    path = str(tmp_path / "graph.json")
+    write_graph(path, GRAPH)
+    load_course_data_with_version(path)
+
+    changed = json.loads(json.dumps(GRAPH))
+    changed["CS 280"]["title"] = "Renamed"
+    write_graph(path, changed)
+
+    assert load_course_snapshot(snapshot_path_for(path), file_digest(path)) is None
+    data, _ = load_course_data_with_version(path)
+    assert data["CS 280"].title == "Renamed"
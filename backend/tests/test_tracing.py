@@ -0,0 +1,80 @@
+import sys
+import os
+import pytest
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.constants import CourseSearchFormat, UserFulfilled
+from backend.registry import DataVersion
+from backend.replay import replay
+from backend.tracing import ToolTrace, digest, read_trace, stable_json
+
+PROFILE = UserFulfilled(courses={"CS 100": {"name": "CS 100", "grade": "A"}})
+
+
+def make_tool(titles):
+    def get_course_description(args: CourseSearchFormat):
+        return {"course": args.course_name, "title": titles[args.course_name]}
+
+    return get_course_description
+
+
+def record_trace(path, titles):
+    trace = ToolTrace(path, keep_results=True)
+    tool = trace.wrap(make_tool(titles), PROFILE, "202610", "v1")
+    assert tool.__name__ == "get_course_description"
+    assert tool(CourseSearchFormat(course_name="CS 100"))["title"] == "Roadmap"
+    tool(CourseSearchFormat(course_name="CS 114"))
+    with pytest.raises(KeyError):
+        tool(CourseSearchFormat(course_name="CS 999"))
+
+
+def test_trace_records_profile_once_and_each_call(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    record_trace(path, {"CS 100": "Roadmap", "CS 114": "Intro II"})
+    records = list(read_trace(path))
+    assert [r["type"] for r in records] == ["profile", "call", "call", "call"]
+
+    profile_hash = records[0]["hash"]
+    first = records[1]
+    assert first["profile"] == profile_hash and first["term"] == "202610"
+    assert first["args"] == {"course_name": "CS 100"}
+    encoded = stable_json({"course": "CS 100", "title": "Roadmap"})
+    assert first["result_hash"] == digest(encoded)
+    assert first["result_bytes"] == len(encoded)
+    assert records[3]["error"] == "KeyError: 'CS 999'"
+
+
+def test_disabled_trace_writes_nothing(tmp_path, capsys):
+    trace = ToolTrace("", keep_results=True)
+    tool = trace.wrap(make_tool({"CS 100": "Roadmap"}), PROFILE, "202610", "v1")
+    tool(CourseSearchFormat(course_name="CS 100"))
+    assert "tool get_course_description" in capsys.readouterr().out
+    assert os.listdir(tmp_path) == []
+
+
+def test_replay_reports_changed_results(tmp_path):
+    path = str(tmp_path / "trace.jsonl")
+    titles = {"CS 100": "Roadmap", "CS 114": "Intro II"}
+    record_trace(path, titles)
+    data = DataVersion({}, "v2")
+
+    def run():
+        return replay(
+            path, make_tools=lambda profile, term, data: [make_tool(titles)], data=data
+        )
+
+    summary = run()
+    assert summary["calls"] == 3 and summary["mismatches"] == []
+    assert summary["recorded_data_versions"] == ["v1"]
+    assert summary["tools"]["get_course_description"]["calls"] == 3
+
+    titles["CS 114"] = "Data Structures"
+    (mismatch,) = run()["mismatches"]
+    assert mismatch["args"] == {"course_name": "CS 114"}
+    assert '+ "title": "Data Structures"' in mismatch["diff"]
+
+    # a call that failed when recorded and succeeds now is a mismatch too
+    titles["CS 999"] = "New"
+    assert len(run()["mismatches"]) == 2
@@ -0,0 +1,64 @@
+import sys
+import os
+import numpy as np
+
+# Add the project root to sys.path
+sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "../..")))
+
+from backend.embeddings import CourseEmbeddings, generate_hash
+from backend.vector_index import QuantizedIndex, build_quantized_index, quantize
+
+
+def unit_vectors(n, dim=32, seed=0):
+    rng = np.random.default_rng(seed)
+    m = rng.normal(size=(n, dim)).astype(np.float32)
+    return m / np.linalg.norm(m, axis=1, keepdims=True)
+
+
+def test_quantize_round_trip_is_close():
+    m = unit_vectors(50)
+    codes, scales = quantize(m)
+    assert codes.dtype == np.int8
+    assert np.abs(codes * scales[:, None] - m).max() < 0.01
+
+
+def test_rescored_search_matches_exact_search():
+    m = unit_vectors(300)
+    ids = [f"C {i}" for i in range(len(m))]
+    index = QuantizedIndex.from_matrix(ids, m)
+    query = m[7]
+
+    exact = np.argsort(((m - query) ** 2).sum(axis=1))[:10]
+    found = index.search(query, 10)
+
+    assert [cid for cid, _ in found] == [ids[i] for i in exact]
+    assert found[0][0] == "C 7"
+    assert abs(found[0][1]) < 1e-4
+
+
+def test_search_respects_candidates():
+    m = unit_vectors(100)
+    ids = [f"C {i}" for i in range(len(m))]
+    index = QuantizedIndex.from_matrix(ids, m)
+
+    found = index.search(m[0], 5, candidate_ids=["C 3", "C 4", "missing"])
+    assert sorted(cid for cid, _ in found) == ["C 3", "C 4"]
+
+
+def test_build_uses_artifact_and_embeds_missing():
+    m = unit_vectors(3)
+    courses = {"A": ("a", "x"), "B": ("b", "y"), "C": ("c", "z")}
+    hashes = [generate_hash(*courses[c])[0] for c in ("A", "B")]
+    artifact = CourseEmbeddings(
+        m[:2], {"model": "m", "ids": ["A", "B"], "hashes": [hashes[0], "stale"]}
+    )
+    embedded = []
+
+    def embed(texts):
+        embedded.extend(texts)
+        return m[1:3]
+
+    index = build_quantized_index(courses, artifact, embed)
+
+    assert embedded == ["b y", "c z"]
+    assert index.search(m[2], 1)[0][0] == "C"
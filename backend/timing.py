@@ -0,0 +1,79 @@
+import contextvars
+import functools
+import time
+from contextlib import contextmanager
+from typing import Callable, Dict, Iterator, Optional
+
+# stage name -> accumulated milliseconds for the current request, None outside one
+_stages: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar(
+    "stages", default=None
+)
+
+
+def start_request() -> Dict[str, float]:
+    """
+    Starts collecting stage timings for this request. The dict is shared by reference,
+    so stages timed in threadpool threads or tool calls land in it too.
+    """
+    stages: Dict[str, float] = {}
+    _stages.set(stages)
+    return stages
+
+
+def current_stages() -> Optional[Dict[str, float]]:
+    return _stages.get()
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Adds the time spent in the block to `name`. A no-op outside a request."""
+    stages = _stages.get()
+    if stages is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        stages[name] = stages.get(name, 0.0) + 1000 * (time.perf_counter() - t0)
+
+
+def timed(name: str) -> Callable[[Callable], Callable]:
+    """Decorator form of stage(); keeps the signature the Gemini SDK reads."""
+
+    def decorate(fn: Callable) -> Callable:
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            with stage(name):
+                return fn(*args, **kwargs)
+
+        return wrapper
+
+    return decorate
+
+
+def server_timing(stages: Dict[str, float]) -> str:
+    """Server-Timing header value, e.g. `gemini;dur=812.4, course_query;dur=95.1`."""
+    return ", ".join(f"{name};dur={ms:.1f}" for name, ms in stages.items())
+
+
+def memory_usage() -> Dict[str, Optional[float]]:
+    """
+    RSS, PSS and private (copied or never shared) memory of this process in MiB. PSS
+    splits shared pages between the processes mapping them, so summing it over
+    workers gives the real footprint. Linux only.
+    """
+    usage: Dict[str, Optional[float]] = {"rss_mb": None, "pss_mb": None}
+    private = 0
+    try:
+        with open("/proc/self/smaps_rollup", "r") as f:
+            for line in f:
+                key, _, value = line.partition(":")
+                if key in ("Rss", "Pss"):
+                    usage[f"{key.lower()}_mb"] = int(value.split()[0]) / 1024
+                elif key in ("Private_Clean", "Private_Dirty"):
+                    private += int(value.split()[0])
+    except OSError:
+        return usage
+    usage["private_mb"] = private / 1024
+    return usage
@@ -0,0 +1,126 @@
+import functools
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Iterator, Optional, Set
+from backend.constants import TOOL_TRACE_FILE, TOOL_TRACE_RESULTS, UserFulfilled
+from backend.shaping import result_size
+
+
+def stable_json(value: Any) -> str:
+    return json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def digest(text: str) -> str:
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:16]
+
+
+class ToolTrace:
+    """
+    Append-only JSONL trace of tool calls. Two record types:
+      {"type": "profile", "hash", "profile"}, written once per profile per process;
+      {"type": "call", "tool", "args", "profile", "term", "data_version",
+       "duration_ms", "result_bytes", "result_hash", ["result"], ["error"]}.
+    Profiles are stored by hash so repeated calls from one session stay small.
+    Lines are written with one O_APPEND write each, so workers can share the file.
+    """
+
+    def __init__(
+        self, path: str = TOOL_TRACE_FILE, keep_results: bool = TOOL_TRACE_RESULTS
+    ):
+        self.path = path
+        self.keep_results = keep_results
+        self._seen_profiles: Set[str] = set()
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = None
+        self._pid: Optional[int] = None
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self.path)
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = (stable_json(record) + "\n").encode("utf-8")
+        with self._lock:
+            if self._pid != os.getpid():
+                # fresh descriptor and profile set per forked worker
+                self._fd = os.open(
+                    self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644
+                )
+                self._pid = os.getpid()
+                self._seen_profiles = set()
+            os.write(self._fd, line)
+
+    def profile_hash(self, profile: UserFulfilled) -> str:
+        body = profile.model_dump(mode="json")
+        profile_hash = digest(stable_json(body))
+        if self.enabled and profile_hash not in self._seen_profiles:
+            self._write({"type": "profile", "hash": profile_hash, "profile": body})
+            self._seen_profiles.add(profile_hash)
+        return profile_hash
+
+    def wrap(
+        self,
+        tool: Callable,
+        profile: UserFulfilled,
+        term: str,
+        data_version: str,
+    ) -> Callable:
+        """The tool with a summary line printed and, when enabled, a trace record."""
+
+        @functools.wraps(tool)
+        def traced(args):
+            profile_hash = self.profile_hash(profile)
+            t0 = time.perf_counter()
+            error = None
+            result = None
+            try:
+                result = tool(args)
+                return result
+            except Exception as e:
+                error = f"{type(e).__name__}: {e}"
+                raise
+            finally:
+                duration_ms = 1000 * (time.perf_counter() - t0)
+                # the sorted encoding is only needed for the record's hash
+                encoded = stable_json(result) if self.enabled else None
+                size = len(encoded) if encoded is not None else result_size(result)
+                print(
+                    f"tool {tool.__name__} {duration_ms:.1f}ms "
+                    f"{size}B{' ' + error if error else ''}"
+                )
+                if encoded is not None:
+                    record = {
+                        "type": "call",
+                        "ts": time.time(),
+                        "tool": tool.__name__,
+                        "args": args.model_dump(mode="json"),
+                        "profile": profile_hash,
+                        "term": term,
+                        "data_version": data_version,
+                        "duration_ms": round(duration_ms, 3),
+                        "result_bytes": size,
+                        "result_hash": digest(encoded),
+                    }
+                    if self.keep_results:
+                        record["result"] = json.loads(encoded)
+                    if error:
+                        record["error"] = error
+                    try:
+                        self._write(record)
+                    except OSError as e:
+                        print(f"Could not write tool trace: {e}")
+
+        return traced
+
+
+def read_trace(path: str) -> Iterator[Dict[str, Any]]:
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+
+tool_trace = ToolTrace()
@@ -0,0 +1,248 @@
+import argparse
+import time
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+import numpy as np
+from backend.embeddings import CourseEmbeddings, generate_hash, load_course_embeddings
+
+# rows scored per matmul, bounds the float32 temporary built from the int8 codes
+SCAN_CHUNK = 2048
+
+
+def quantize(vectors: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-vector symmetric int8 quantisation. Returns (codes, scales) with v ~= codes * scale."""
+    vectors = np.asarray(vectors, dtype=np.float32)
+    scales = np.abs(vectors).max(axis=1) / 127.0
+    scales[scales == 0] = 1.0
+    codes = np.clip(np.rint(vectors / scales[:, None]), -127, 127).astype(np.int8)
+    return codes, scales.astype(np.float32)
+
+
+class QuantizedIndex:
+    """
+    Brute-force course vector index stored as int8 codes with one float32 scale per vector,
+    about 4x smaller than float32. Search scores every allowed row against the float query
+    using the int8 codes, then re-scores the best candidates exactly with float vectors
+    read from the (memory-mapped) embeddings artifact.
+    Distances are squared L2, the same as the Chroma collection.
+    """
+
+    def __init__(
+        self,
+        ids: List[str],
+        codes: np.ndarray,
+        scales: np.ndarray,
+        sq_norms: np.ndarray,
+        float_vectors: Callable[[np.ndarray], np.ndarray],
+    ):
+        self.ids = ids
+        self.rows: Dict[str, int] = {cid: i for i, cid in enumerate(ids)}
+        self.codes = codes
+        self.scales = scales
+        self.sq_norms = sq_norms
+        self._float_vectors = float_vectors
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    @property
+    def nbytes(self) -> int:
+        return self.codes.nbytes + self.scales.nbytes + self.sq_norms.nbytes
+
+    @classmethod
+    def from_matrix(cls, ids: List[str], matrix: np.ndarray) -> "QuantizedIndex":
+        codes, scales = quantize(matrix)
+        sq_norms = np.einsum("ij,ij->i", matrix, matrix).astype(np.float32)
+        return cls(ids, codes, scales, sq_norms, lambda rows: matrix[rows])
+
+    def approximate_scores(
+        self, query: np.ndarray, rows: Optional[np.ndarray] = None
+    ) -> np.ndarray:
+        """Dot products of the query with the int8 rows (all rows if None)."""
+        query = np.asarray(query, dtype=np.float32)
+        if rows is None:
+            rows = np.arange(len(self.ids))
+        scores = np.empty(len(rows), dtype=np.float32)
+        for start in range(0, len(rows), SCAN_CHUNK):
+            chunk = rows[start : start + SCAN_CHUNK]
+            scores[start : start + len(chunk)] = (
+                self.codes[chunk].astype(np.float32) @ query
+            ) * self.scales[chunk]
+        return scores
+
+    def search(
+        self,
+        query: np.ndarray,
+        k: int,
+        candidate_ids: Optional[Sequence[str]] = None,
+        rescore_factor: int = 4,
+    ) -> List[Tuple[str, float]]:
+        """
+        Returns up to k (course_id, squared L2 distance) pairs, nearest first.
+        candidate_ids restricts the search, rescore_factor * k approximate hits are
+        re-scored with float vectors (0 disables re-scoring).
+        """
+        query = np.asarray(query, dtype=np.float32)
+        if candidate_ids is None:
+            rows = np.arange(len(self.ids))
+        else:
+            rows = np.array(
+                [self.rows[cid] for cid in candidate_ids if cid in self.rows],
+                dtype=np.int64,
+            )
+        if len(rows) == 0 or k <= 0:
+            return []
+
+        scores = self.approximate_scores(query, rows)
+        keep = min(len(rows), max(k, k * rescore_factor))
+        top = np.argpartition(-scores, keep - 1)[:keep]
+        rows, scores = rows[top], scores[top]
+
+        if rescore_factor:
+            order = np.argsort(rows)  # sorted reads are kinder to the mmap
+            rows, scores = rows[order], self._float_vectors(rows[order]) @ query
+
+        best = np.argsort(-scores)[:k]
+        query_sq = float(query @ query)
+        return [
+            (self.ids[row], float(self.sq_norms[row] + query_sq - 2 * score))
+            for row, score in zip(rows[best], scores[best])
+        ]
+
+
+def build_quantized_index(
+    courses: Dict[str, Tuple[str, str]],
+    artifact: Optional[CourseEmbeddings],
+    embed: Callable[[List[str]], np.ndarray],
+) -> QuantizedIndex:
+    """
+    Builds the index for {course_id: (title, description)}.
+    Vectors come from the embeddings artifact when the content hash matches,
+    courses missing from it are embedded with `embed` and kept in memory.
+    """
+    ids = list(courses)
+    artifact_rows = np.full(len(ids), -1, dtype=np.int64)
+    missing, missing_texts = [], []
+    for i, course_id in enumerate(ids):
+        title, description = courses[course_id]
+        content_hash, combined_text = generate_hash(title, description)
+        row = artifact.rows.get(course_id) if artifact else None
+        if row is not None and artifact.hashes[row] == content_hash:
+            artifact_rows[i] = row
+        else:
+            missing.append(i)
+            missing_texts.append(combined_text)
+
+    extra = None
+    if missing:
+        print(
+            f"Embedding {len(missing)} courses missing from the embeddings artifact..."
+        )
+        extra = np.asarray(embed(missing_texts), dtype=np.float32)
+    extra_rows = np.full(len(ids), -1, dtype=np.int64)
+    extra_rows[missing] = np.arange(len(missing))
+    if artifact is not None:
+        dim = artifact.matrix.shape[1]
+    elif extra is not None:
+        dim = extra.shape[1]
+    else:
+        dim = 0
+
+    def float_vectors(rows: np.ndarray) -> np.ndarray:
+        out = np.empty((len(rows), dim), dtype=np.float32)
+        from_artifact = artifact_rows[rows] >= 0
+        if from_artifact.any():
+            out[from_artifact] = artifact.matrix[artifact_rows[rows[from_artifact]]]
+        if (~from_artifact).any():
+            out[~from_artifact] = extra[extra_rows[rows[~from_artifact]]]
+        return out
+
+    codes = np.empty((len(ids), dim), dtype=np.int8)
+    scales = np.empty(len(ids), dtype=np.float32)
+    sq_norms = np.empty(len(ids), dtype=np.float32)
+    for start in range(0, len(ids), SCAN_CHUNK):
+        rows = np.arange(start, min(start + SCAN_CHUNK, len(ids)))
+        vectors = float_vectors(rows)
+        codes[rows], scales[rows] = quantize(vectors)
+        sq_norms[rows] = np.einsum("ij,ij->i", vectors, vectors)
+
+    return QuantizedIndex(ids, codes, scales, sq_norms, float_vectors)
+
+
+def recall_benchmark(
+    matrix: np.ndarray,
+    n_queries: int = 200,
+    ks: Sequence[int] = (10, 50, 500),
+    seed: int = 0,
+) -> Dict[str, Dict[int, float]]:
+    """
+    recall@k of the int8 index (with and without float re-scoring) against exact float32
+    search. Queries are catalog vectors with the query course itself excluded, which is
+    what "courses like this one" searches look like.
+    """
+    matrix = np.asarray(matrix, dtype=np.float32)
+    ids = [str(i) for i in range(len(matrix))]
+    index = QuantizedIndex.from_matrix(ids, matrix)
+    rng = np.random.default_rng(seed)
+    queries = rng.choice(len(matrix), size=min(n_queries, len(matrix)), replace=False)
+    sq_norms = np.einsum("ij,ij->i", matrix, matrix)
+
+    results = {"int8": {k: 0.0 for k in ks}, "int8 + rescore": {k: 0.0 for k in ks}}
+    timings = {"float32": 0.0, "int8": 0.0, "int8 + rescore": 0.0}
+    for q in queries:
+        query = matrix[q]
+        others = np.array([i for i in range(len(matrix)) if i != q])
+        other_ids = [ids[i] for i in others]
+
+        t0 = time.perf_counter()
+        exact = sq_norms[others] - 2 * (matrix[others] @ query)
+        exact_order = others[np.argsort(exact)]
+        timings["float32"] += time.perf_counter() - t0
+
+        for name, factor in (("int8", 0), ("int8 + rescore", 4)):
+            t0 = time.perf_counter()
+            found = index.search(query, max(ks), other_ids, rescore_factor=factor)
+            timings[name] += time.perf_counter() - t0
+            found_ids = [cid for cid, _ in found]
+            for k in ks:
+                truth = {ids[i] for i in exact_order[:k]}
+                results[name][k] += len(truth & set(found_ids[:k])) / len(truth)
+
+    print(
+        f"{len(matrix)} vectors, float32 {matrix.nbytes / (1 << 20):.1f} MiB, "
+        f"int8 index {index.nbytes / (1 << 20):.1f} MiB, {len(queries)} queries"
+    )
+    print(
+        f"{'method':<16}"
+        + "".join(f"{'recall@' + str(k):>12}" for k in ks)
+        + f"{'ms/query':>10}"
+    )
+    print(
+        f"{'float32':<16}"
+        + "".join(f"{1.0:>12.3f}" for _ in ks)
+        + f"{1000 * timings['float32'] / len(queries):>10.2f}"
+    )
+    for name, recalls in results.items():
+        for k in ks:
+            recalls[k] /= len(queries)
+        print(
+            f"{name:<16}"
+            + "".join(f"{recalls[k]:>12.3f}" for k in ks)
+            + f"{1000 * timings[name] / len(queries):>10.2f}"
+        )
+    return results
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="recall@k of the int8 course index against float32 on the embeddings artifact."
+    )
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    artifact = load_course_embeddings()
+    if artifact is None:
+        raise SystemExit(
+            "No embeddings artifact, build it with python -m backend.embeddings"
+        )
+    recall_benchmark(np.asarray(artifact.matrix), args.queries, seed=args.seed)